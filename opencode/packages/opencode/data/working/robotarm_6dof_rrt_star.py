@@ -1,8 +1,19 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
-import time
 import os
+import sys
+from pathlib import Path
+
+# Planner building blocks live in research-harness/python-tools.
+_project_root = Path(os.environ.get("PROJECT_ROOT", Path(__file__).resolve().parents[5]))
+sys.path.insert(0, str(_project_root / "python-tools"))
+
+from tools.planning.anytime import anytime_rrt_star
+from tools.planning.kinematics import dh_transforms
+from tools.planning.obstacles import Obstacles
+from tools.planning.problem import Budget, Problem
+from tools.planning.robots import DHArm
 
 # --- 1. Simulation Setup & Constants ---
 
@@ -37,11 +48,10 @@ STEP_SIZE = 0.25
 SEARCH_RADIUS = 0.8
 GOAL_BIAS = 0.1
 
-class Node:
-    def __init__(self, coord):
-        self.coord = np.array(coord)
-        self.parent = None
-        self.cost = 0.0
+# Anytime mode: set RRT_TIME_BUDGET (seconds, default 5) to refine until the
+# budget, or until the cost plateaus for RRT_PLATEAU_ITERS iterations.
+TIME_BUDGET = os.environ.get("RRT_TIME_BUDGET")
+PLATEAU_ITERS = os.environ.get("RRT_PLATEAU_ITERS")
 
 # --- 2. Helper Functions (Kinematics & Collision) ---
 
@@ -49,159 +59,68 @@ def forward_kinematics_chain(q, L):
     """
     Returns a list of 4x4 transformation matrices for each link.
     """
-    T_all = []
-    T_curr = np.eye(4)
-    
-    for i in range(6):
-        a, alpha, d, theta_off = L[i]
-        theta = q[i] + theta_off
-        
-        ct, st = np.cos(theta), np.sin(theta)
-        ca, sa = np.cos(alpha), np.sin(alpha)
-        
-        Ti = np.array([
-            [ct, -st*ca,  st*sa, a*ct],
-            [st,  ct*ca, -ct*sa, a*st],
-            [0,   sa,     ca,    d],
-            [0,   0,      0,     1]
-        ])
-        
-        T_curr = T_curr @ Ti
-        T_all.append(T_curr)
-        
-    return T_all
+    return list(dh_transforms(q, L)[0])
 
-def check_collision(q1, q2, L, obstacles, steps=3):
+# Links are capsules with a 5cm safety radius; edges are subdivided so
+# no joint moves more than 0.05 rad between checked configurations.
+ARM = DHArm(L, radius=0.05, max_joint_step=0.05, low=Q_MIN, high=Q_MAX)
+
+# --- 3. RRT* Algorithm ---
+
+# Cost: cumulative squared displacement (energy proxy); nodes within one
+# step of the goal reach it.
+PROBLEM = Problem.for_robot(ARM, Obstacles(OBSTACLES), Q_START, Q_GOAL, goal_tol=STEP_SIZE, cost_exponent=2)
+
+def _run(rng, budget, verbose):
+    report = (lambda t, it, c: print(f"{t:7.2f}s  iter {it:5d}  cost {c:.4f}")) if verbose else None
+    result = anytime_rrt_star(
+        PROBLEM, budget, rng, STEP_SIZE, SEARCH_RADIUS, GOAL_BIAS, on_improve=report,
+    )
+    return {**result.metrics(), "path": result.path, "tree": result.tree, "curve": result.curve}
+
+def plan(rng, max_iter=MAX_ITER, verbose=False):
     """
-    Checks collision for a path segment between q1 and q2.
-    Simplified: Checks if any link end-point is inside an obstacle.
+    Runs one fixed-iteration RRT* attempt, drawing all samples from `rng`
+    (a numpy Generator, or the np.random module for the legacy global
+    stream). Returns metrics for tools.planning.runner plus the path (or None).
     """
-    for s in range(steps + 1):
-        alpha = s / steps
-        q = q1 * (1 - alpha) + q2 * alpha
-        
-        T_all = forward_kinematics_chain(q, L)
-        
-        for obs in obstacles:
-            ox, oy, oz, r = obs
-            obs_center = np.array([ox, oy, oz])
-            
-            # Check each link origin/end
-            # Add base position (0,0,0) check if needed, but usually fixed.
-            # We check the end position of each of the 6 links.
-            for T in T_all:
-                pos = T[:3, 3]
-                if np.linalg.norm(pos - obs_center) < (r + 0.05): # 5cm safety margin
-                    return True
-    return False
+    return _run(rng, Budget(iterations=max_iter), verbose)
 
-# --- 3. RRT* Algorithm ---
+def plan_anytime(rng, time_budget=5.0, max_iter=None, plateau_iters=None, verbose=False):
+    """
+    Anytime RRT*: refines the best solution until the first exhausted
+    budget. Returns the same metrics as plan() plus the cost-vs-time curve.
+    """
+    return _run(rng, Budget(time_budget, max_iter, plateau_iters), verbose)
 
 def main():
     np.random.seed(42)
     print("Starting 6-DOF RRT* Optimization (Python Port)...")
-    start_time = time.time()
-    
-    nodes = [Node(Q_START)]
     
-    goal_reached_idx = -1
-    min_dist_to_goal = float('inf')
+    if TIME_BUDGET or PLATEAU_ITERS:
+        result = plan_anytime(
+            np.random,
+            time_budget=float(TIME_BUDGET) if TIME_BUDGET else 5.0,
+            plateau_iters=int(PLATEAU_ITERS) if PLATEAU_ITERS else None,
+            verbose=True,
+        )
+        print(f"Stopped on {result['stop_reason']} after {result['iterations']} iterations")
+        curve_path = os.path.join("data/outputs", "robotarm_6dof_cost_curve_py.txt")
+        os.makedirs("data/outputs", exist_ok=True)
+        np.savetxt(curve_path, result["curve"], header="elapsed_s iteration best_cost")
+        print(f"Cost curve saved to {curve_path}")
+    else:
+        result = plan(np.random, verbose=True)
     
-    for i in range(MAX_ITER):
-        # 3.1 Sampling
-        if np.random.rand() < GOAL_BIAS:
-            q_rand = Q_GOAL
-        else:
-            q_rand = Q_MIN + (Q_MAX - Q_MIN) * np.random.rand(6)
-            
-        # 3.2 Nearest Node
-        dists = [np.linalg.norm(n.coord - q_rand) for n in nodes]
-        nearest_idx = np.argmin(dists)
-        q_near = nodes[nearest_idx].coord
-        
-        # 3.3 Steer
-        direction = q_rand - q_near
-        dist = np.linalg.norm(direction)
-        
-        if dist > STEP_SIZE:
-            q_new = q_near + (direction / dist) * STEP_SIZE
-        else:
-            q_new = q_rand
-            
-        # Joint Limits
-        q_new = np.clip(q_new, Q_MIN, Q_MAX)
-        
-        # 3.4 Collision Check
-        if not check_collision(q_new, q_near, L, OBSTACLES):
-            
-            # 3.5 Choose Parent
-            # Cost: Cumulative displacement (energy proxy)
-            edge_cost = np.linalg.norm(q_new - q_near)**2
-            min_cost = nodes[nearest_idx].cost + edge_cost
-            best_parent_idx = nearest_idx
-            
-            # Find neighbors
-            dists_new = [np.linalg.norm(n.coord - q_new) for n in nodes]
-            neighbor_idxs = [idx for idx, d in enumerate(dists_new) if d <= SEARCH_RADIUS]
-            
-            for idx in neighbor_idxs:
-                pot_edge_cost = np.linalg.norm(q_new - nodes[idx].coord)**2
-                cost_via_neighbor = nodes[idx].cost + pot_edge_cost
-                
-                if cost_via_neighbor < min_cost:
-                    if not check_collision(q_new, nodes[idx].coord, L, OBSTACLES):
-                        min_cost = cost_via_neighbor
-                        best_parent_idx = idx
-            
-            # Add Node
-            new_node = Node(q_new)
-            new_node.parent = nodes[best_parent_idx]
-            new_node.cost = min_cost
-            nodes.append(new_node)
-            new_idx = len(nodes) - 1
-            
-            # 3.6 Rewire
-            for idx in neighbor_idxs:
-                pot_edge_cost = np.linalg.norm(nodes[idx].coord - q_new)**2
-                cost_via_new = new_node.cost + pot_edge_cost
-                
-                if cost_via_new < nodes[idx].cost:
-                    if not check_collision(q_new, nodes[idx].coord, L, OBSTACLES):
-                        nodes[idx].parent = new_node
-                        nodes[idx].cost = cost_via_new
-            
-            # Check Goal
-            d_goal = np.linalg.norm(q_new - Q_GOAL)
-            if d_goal < STEP_SIZE and d_goal < min_dist_to_goal:
-                min_dist_to_goal = d_goal
-                goal_reached_idx = new_idx
-                # We don't break immediately in RRT* to allow further optimization,
-                # but for this demo, if we are very close, we can note it.
-                
-        if (i+1) % 100 == 0:
-            print(f"Iteration {i+1}/{MAX_ITER}, Nodes: {len(nodes)}, Best Dist: {min_dist_to_goal:.4f}")
-
-    # --- 4. Extract Path ---
-    if goal_reached_idx != -1:
+    if result["success"]:
         print("Path Found!")
-        path_nodes = []
-        curr = nodes[goal_reached_idx]
-        while curr is not None:
-            path_nodes.append(curr.coord)
-            curr = curr.parent
-        path_nodes.reverse() # Start to Goal
-        
-        # Add exact goal
-        path_nodes.append(Q_GOAL)
-        path = np.array(path_nodes)
-        
         # Save results
-        save_results(path, nodes)
+        save_results(result["path"], result["tree"])
         
     else:
         print("Path NOT found within iteration limit.")
 
-def save_results(path, nodes):
+def save_results(path, tree):
     # Ensure output dir
     out_dir = "data/outputs"
     os.makedirs(out_dir, exist_ok=True)
@@ -2,7 +2,17 @@ import numpy as np
 import matplotlib.pyplot as plt
 import math
 import os
-import time
+import sys
+from pathlib import Path
+
+# Planner building blocks live in research-harness/python-tools.
+_project_root = Path(os.environ.get("PROJECT_ROOT", Path(__file__).resolve().parents[5]))
+sys.path.insert(0, str(_project_root / "python-tools"))
+
+from tools.planning.anytime import anytime_rrt_star
+from tools.planning.obstacles import Obstacles
+from tools.planning.problem import Budget, Problem
+from tools.planning.robots import PlanarArm
 
 # --- Parameters ---
 L1 = 1.0  # Link 1 length
@@ -35,151 +45,43 @@ def forward_kinematics(q):
     ye = y_elbow + L2 * np.sin(q[0] + q[1])
     return xe, ye, x_elbow, y_elbow
 
-def check_line_collision(p1, p2, obstacles):
-    """Check if line segment p1-p2 intersects with any circular obstacle"""
-    p1 = np.array(p1)
-    p2 = np.array(p2)
-    v = p2 - p1
-    
-    for ox, oy, r in obstacles:
-        center = np.array([ox, oy])
-        w = center - p1
-        
-        c1 = np.dot(w, v)
-        c2 = np.dot(v, v)
-        
-        if c2 == 0:
-            dist = np.linalg.norm(center - p1)
-        elif c1 <= 0:
-            dist = np.linalg.norm(center - p1)
-        elif c2 <= c1:
-            dist = np.linalg.norm(center - p2)
-        else:
-            b = c1 / c2
-            pb = p1 + b * v
-            dist = np.linalg.norm(center - pb)
-            
-        if dist <= r:
-            return True
-    return False
+# Links are segments (zero-radius capsules); edges are subdivided so no
+# joint moves more than 0.05 rad between checked configurations.
+ARM = PlanarArm([L1, L2], max_joint_step=0.05)
+OBSTACLE_SET = Obstacles(OBSTACLES)
 
-def check_collision(q_start, q_end, obstacles):
-    """Check collision for robot arm moving from q_start to q_end"""
-    steps = 5
-    for s in range(steps + 1):
-        alpha = s / steps
-        q = q_start * (1 - alpha) + q_end * alpha
-        xe, ye, x_elbow, y_elbow = forward_kinematics(q)
-        
-        # Link 1: (0,0) to (x_elbow, y_elbow)
-        if check_line_collision([0, 0], [x_elbow, y_elbow], obstacles):
-            return True
-        # Link 2: (x_elbow, y_elbow) to (xe, ye)
-        if check_line_collision([x_elbow, y_elbow], [xe, ye], obstacles):
-            return True
-    return False
-
-# --- RRT* Class ---
-
-class Node:
-    def __init__(self, coord, parent=None, cost=0.0):
-        self.coord = coord
-        self.parent = parent
-        self.cost = cost
+# --- RRT* ---
 
 def main():
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
         
     print(f"Starting RRT* Optimization (Python)...")
-    start_time = time.time()
     
-    nodes = [Node(Q_START, None, 0.0)]
-    
-    for i in range(MAX_ITER):
-        # 1. Sample
-        if np.random.rand() < GOAL_BIAS:
-            q_rand = Q_GOAL
-        else:
-            q_rand = np.random.uniform(-np.pi, np.pi, 2)
-            
-        # 2. Nearest
-        dists = [np.linalg.norm(n.coord - q_rand) for n in nodes]
-        nearest_idx = np.argmin(dists)
-        nearest_node = nodes[nearest_idx]
-        
-        # 3. Steer
-        direction = q_rand - nearest_node.coord
-        dist = np.linalg.norm(direction)
-        
-        if dist > STEP_SIZE:
-            q_new = nearest_node.coord + (direction / dist) * STEP_SIZE
-        else:
-            q_new = q_rand
-            
-        # 4. Collision Check
-        if not check_collision(nearest_node.coord, q_new, OBSTACLES):
-            
-            # 5. Choose Parent (Cost Optimization)
-            new_cost = nearest_node.cost + np.linalg.norm(q_new - nearest_node.coord)
-            best_node = nearest_node
-            min_cost = new_cost
-            
-            # Find neighbors
-            neighbor_idxs = [idx for idx, n in enumerate(nodes) if np.linalg.norm(n.coord - q_new) <= SEARCH_RADIUS]
-            
-            for idx in neighbor_idxs:
-                neighbor = nodes[idx]
-                cost_via_neighbor = neighbor.cost + np.linalg.norm(q_new - neighbor.coord)
-                
-                if cost_via_neighbor < min_cost:
-                    if not check_collision(neighbor.coord, q_new, OBSTACLES):
-                        min_cost = cost_via_neighbor
-                        best_node = neighbor
-                        
-            # Add Node
-            new_node = Node(q_new, best_node, min_cost)
-            nodes.append(new_node)
-            
-            # 6. Rewire
-            for idx in neighbor_idxs:
-                neighbor = nodes[idx]
-                cost_via_new = new_node.cost + np.linalg.norm(new_node.coord - neighbor.coord)
-                
-                if cost_via_new < neighbor.cost:
-                    if not check_collision(new_node.coord, neighbor.coord, OBSTACLES):
-                        neighbor.parent = new_node
-                        neighbor.cost = cost_via_new
-                        
-        if (i+1) % 500 == 0:
-            print(f"Iteration {i+1}/{MAX_ITER}...")
-
-    elapsed_time = time.time() - start_time
+    problem = Problem.for_robot(ARM, OBSTACLE_SET, Q_START, Q_GOAL, GOAL_TOL)
+    result = anytime_rrt_star(
+        problem, Budget(iterations=MAX_ITER), np.random,
+        STEP_SIZE, SEARCH_RADIUS, GOAL_BIAS,
+    )
+    tree = result.tree
+    elapsed_time = result.elapsed
     
     # --- Extract Path ---
-    dists_to_goal = [np.linalg.norm(n.coord - Q_GOAL) for n in nodes]
-    best_goal_idx = np.argmin(dists_to_goal)
-    best_goal_node = nodes[best_goal_idx]
-    
-    if dists_to_goal[best_goal_idx] <= GOAL_TOL:
-        print(f"Goal Reached! Cost: {best_goal_node.cost:.4f}")
-        path = []
-        curr = best_goal_node
-        while curr is not None:
-            path.append(curr.coord)
-            curr = curr.parent
-        path = np.array(path[::-1]) # Reverse to start->goal
-        success = True
+    success = result.success
+    best_goal_cost = result.cost
+    if success:
+        print(f"Goal Reached! Cost: {best_goal_cost:.4f}")
+        path = result.path # start->goal
     else:
         print("Failed to reach goal.")
+        if ARM.config_hits(Q_GOAL, OBSTACLE_SET)[0]:
+            print("(The goal configuration itself is in collision.)")
         path = None
-        success = False
 
-    # --- Visualization ---
     fig, ax = plt.subplots(1, 2, figsize=(12, 6))
     
     # 1. Workspace
-    ax[0].set_title(f"Workspace (Cost: {best_goal_node.cost:.2f})")
+    ax[0].set_title(f"Workspace (Cost: {best_goal_cost:.2f})")
     ax[0].set_xlim(-2.5, 2.5)
     ax[0].set_ylim(-2.5, 2.5)
     ax[0].set_aspect('equal')
@@ -213,9 +115,8 @@ def main():
     ax[1].set_ylabel("Theta 2")
     
     # Tree (Sampling)
-    # for n in nodes:
-    #     if n.parent:
-    #         ax[1].plot([n.parent.coord[0], n.coord[0]], [n.parent.coord[1], n.coord[1]], 'k-', alpha=0.1, linewidth=0.5)
+    # from matplotlib.collections import LineCollection
+    # ax[1].add_collection(LineCollection(tree.edges(), colors='k', alpha=0.1, linewidths=0.5))
             
     if success:
         ax[1].plot(path[:,0], path[:,1], 'r-', linewidth=2)
@@ -229,10 +130,10 @@ def main():
     # --- Save Data ---
     with open(OUTPUT_DATA, "w") as f:
         f.write(f"Success: {success}\n")
-        f.write(f"Cost: {best_goal_node.cost if success else 'inf'}\n")
+        f.write(f"Cost: {best_goal_cost if success else 'inf'}\n")
         f.write(f"Time: {elapsed_time:.4f}\n")
         f.write(f"Iterations: {MAX_ITER}\n")
-        f.write(f"Nodes: {len(nodes)}\n")
+        f.write(f"Nodes: {len(tree)}\n")
         if success:
             f.write("Path:\n")
             np.savetxt(f, path)
@@ -1,15 +1,24 @@
-import pandas as pd
+import os
 import sys
+from pathlib import Path
+
+# Read sheets through the research-harness columnar sidecar cache.
+_project_root = Path(os.environ.get("PROJECT_ROOT", Path(__file__).resolve().parents[3]))
+os.environ.setdefault("PROJECT_ROOT", str(_project_root))
+sys.path.insert(0, str(_project_root / "python-tools"))
+
+from tools.analysis import load_dataframe
+from tools.columnar import sheet_names
 
 file_path = "/Users/minseongkim/Desktop/research-harness/data/uploads/1772255736584_2026_________________________2_.xlsx"
 
 try:
-    xls = pd.ExcelFile(file_path)
-    print(f"Sheet names: {xls.sheet_names}\n")
+    names = sheet_names(file_path)
+    print(f"Sheet names: {names}\n")
 
-    for sheet_name in xls.sheet_names:
+    for sheet_name in names:
         print(f"--- Sheet: {sheet_name} ---")
-        df = pd.read_excel(xls, sheet_name=sheet_name)
+        df = load_dataframe(file_path, sheet=sheet_name)
 
         if df.empty:
             print("Sheet is empty.\n")
@@ -0,0 +1,81 @@
+"""Benchmark: memory and build time of ArrayTree vs. per-node objects.
+
+The "objects" baseline is the planner scripts' original ``Node`` class
+(coordinate array, parent reference and cost per node).
+
+Usage:
+    python benchmarks/bench_array_tree.py [--dim 6] [--nodes 100000 1000000]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.planning.tree import ArrayTree
+
+
+class Node:
+    def __init__(self, coord, parent=None, cost=0.0):
+        self.coord = np.array(coord)
+        self.parent = parent
+        self.cost = cost
+
+
+def _measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dim", type=int, default=6)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'nodes':>9} {'objects B/node':>15} {'array B/node':>13} {'array build':>12} {'nearest':>10}")
+    for n in args.nodes:
+        coords = rng.uniform(-np.pi, np.pi, (n, args.dim))
+        parents = np.maximum(np.arange(n) - 1, -1)
+
+        def build_objects():
+            nodes = [Node(coords[0])]
+            for i in range(1, n):
+                nodes.append(Node(coords[i], nodes[parents[i]], float(i)))
+            return nodes
+
+        def build_array():
+            tree = ArrayTree(args.dim, capacity=n)
+            tree.add(coords[0])
+            for i in range(1, n):
+                tree.add(coords[i], parents[i], float(i))
+            return tree
+
+        nodes, _, obj_bytes = _measure(build_objects)
+        del nodes
+        tree, elapsed, arr_bytes = _measure(build_array)
+
+        queries = rng.uniform(-np.pi, np.pi, (args.queries, args.dim))
+        start = time.perf_counter()
+        for q in queries:
+            tree.nearest(q)
+        nearest = (time.perf_counter() - start) / args.queries
+
+        print(f"{n:>9} {obj_bytes / n:>15.0f} {arr_bytes / n:>13.0f} {elapsed:>11.2f}s {nearest * 1e6:>8.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark: planner throughput on the experiment scripts' scenarios.
+
+Runs every planner on every `tools.planning.harness` scenario (2-DOF arm,
+6-DOF arm, 2-D map) for a few seeds and records, per pair:
+
+- iterations/s and collision checks/s (median over seeds),
+- time to first solution (median over successful seeds) and success rate,
+- peak traced memory of one run (a separate ``tracemalloc`` pass, so the
+  tracing overhead does not distort the timings).
+
+Results are written as JSON. With ``--baseline`` they are compared with
+a stored run, and any metric that is worse by more than ``--tolerance``
+is flagged; the exit status is 1 if anything regressed. Baselines are
+machine-specific: regenerate one with ``--out`` on the machine that
+checks against it.
+
+Usage:
+    python benchmarks/bench_planners.py --out benchmarks/baselines/planners.json
+    python benchmarks/bench_planners.py --baseline benchmarks/baselines/planners.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.planning.harness import SCENARIOS, run
+from tools.planning.planners import PLANNERS
+
+# Metric -> (higher is better, tolerance multiplier). Time to first
+# solution depends on which seeds succeed early, so it gets more slack.
+METRICS = {
+    "iterations_per_s": (True, 1.0),
+    "checks_per_s": (True, 1.0),
+    "time_to_first_s": (False, 2.0),
+    "peak_memory_mb": (False, 1.0),
+}
+
+
+def measure(scenario: str, planner: str, seeds: int) -> dict:
+    """Benchmark one scenario/planner pair."""
+    runs = [run(np.random.default_rng(seed), scenario, planner) for seed in range(seeds)]
+    firsts = [r["time_to_first"] for r in runs if r["success"]]
+
+    tracemalloc.start()
+    run(np.random.default_rng(0), scenario, planner)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "iterations_per_s": float(np.median([r["iterations_per_s"] for r in runs])),
+        "checks_per_s": float(np.median([r["checks_per_s"] for r in runs])),
+        "time_to_first_s": float(np.median(firsts)) if firsts else None,
+        "success_rate": len(firsts) / seeds,
+        "peak_memory_mb": peak / 2**20,
+        "iterations": int(np.median([r["iterations"] for r in runs])),
+        "checks": int(np.median([r["checks"] for r in runs])),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of ``current`` against ``baseline`` (both ``results`` dicts)."""
+    regressions = []
+    for key, base in baseline.items():
+        if key not in current:
+            continue
+        for metric, (higher_is_better, scale) in METRICS.items():
+            old, new = base.get(metric), current[key].get(metric)
+            if old is None or new is None or old <= 0:
+                continue
+            change = new / old - 1
+            if (change < -tolerance * scale) if higher_is_better else (change > tolerance * scale):
+                regressions.append(f"{key} {metric}: {old:.4g} -> {new:.4g} ({change:+.0%})")
+        if current[key]["success_rate"] < base["success_rate"]:
+            regressions.append(f"{key} success_rate: {base['success_rate']:.2f} -> {current[key]['success_rate']:.2f}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--planners", nargs="+", default=list(PLANNERS), choices=list(PLANNERS))
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare with this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (default 0.25)")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'scenario/planner':>16} {'iter/s':>10} {'checks/s':>11} {'first (s)':>10} {'success':>8} {'peak MB':>8}")
+    for scenario in args.scenarios:
+        for planner in args.planners:
+            key = f"{scenario}/{planner}"
+            m = results[key] = measure(scenario, planner, args.seeds)
+            first = f"{m['time_to_first_s']:.3f}" if m["time_to_first_s"] is not None else "-"
+            print(f"{key:>16} {m['iterations_per_s']:>10,.0f} {m['checks_per_s']:>11,.0f} {first:>10} "
+                  f"{m['success_rate']:>8.0%} {m['peak_memory_mb']:>8.1f}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "seeds": args.seeds,
+        },
+        "results": results,
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"wrote {args.out}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline["meta"]["seeds"] != args.seeds:
+            print(f"warning: baseline used {baseline['meta']['seeds']} seeds, this run {args.seeds}")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"no regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
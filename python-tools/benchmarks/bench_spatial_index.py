@@ -0,0 +1,75 @@
+"""Benchmark: incremental SpatialIndex vs. the planners' linear scans.
+
+Mimics an RRT* iteration at each tree size: one insertion, one nearest
+query and one radius query. The "list" baseline is the scripts' original
+``[np.linalg.norm(n.coord - q) for n in nodes]``; "numpy" is the same scan
+vectorized over a coordinate array.
+
+Usage:
+    python benchmarks/bench_spatial_index.py [--dim 6] [--queries 200]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.planning.spatial import SpatialIndex
+
+
+def _per_query(fn, queries) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dim", type=int, default=6)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=0.8)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    low, high = -np.pi, np.pi
+    print(f"{'nodes':>8} {'build/pt':>10} {'nearest':>10} {'radius':>10} "
+          f"{'numpy scan':>11} {'list scan':>11}  (per call, dim={args.dim})")
+
+    for n in args.sizes:
+        points = rng.uniform(low, high, (n, args.dim))
+        queries = rng.uniform(low, high, (args.queries, args.dim))
+
+        index = SpatialIndex(args.dim)
+        start = time.perf_counter()
+        index.extend(points)
+        build = (time.perf_counter() - start) / n
+
+        nearest = _per_query(index.nearest, queries)
+        radius = _per_query(lambda q: index.within(q, args.radius), queries)
+
+        def numpy_scan(q):
+            d = np.linalg.norm(points - q, axis=1)
+            return int(np.argmin(d)), np.flatnonzero(d <= args.radius)
+        scan = _per_query(numpy_scan, queries)
+
+        # The list-of-objects scan is slow enough to sample fewer queries.
+        coords = list(points)
+        list_scan = _per_query(
+            lambda q: int(np.argmin([np.linalg.norm(c - q) for c in coords])),
+            queries[: max(5, args.queries // 20)],
+        )
+
+        print(f"{n:>8} {build * 1e6:>8.1f}us {nearest * 1e6:>8.1f}us {radius * 1e6:>8.1f}us "
+              f"{scan * 1e6:>9.1f}us {list_scan * 1e6:>9.1f}us  "
+              f"({list_scan / nearest:.0f}x vs list)")
+
+
+if __name__ == "__main__":
+    main()
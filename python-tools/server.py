@@ -1,6 +1,7 @@
 """MCP Server entry point — registers all tools and runs the server."""
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import sys
@@ -19,9 +20,25 @@ if _server_dir not in sys.path:
 _project_root = os.environ.get("PROJECT_ROOT", str(Path(__file__).resolve().parent.parent))
 os.chdir(_project_root)
 
-from tools.excel import excel_read, excel_write, mat_to_excel
+from tools.excel import (
+    DEFAULT_PAGE_SIZE,
+    excel_read,
+    excel_read_page,
+    excel_write,
+    mat_to_excel,
+)
+from tools.executor import ToolExecutor
+from tools.jobs import get_job_manager
 from tools.docx_tool import docx_read, docx_write, manuscript_generate
-from tools.analysis import pandas_analyze, plot_create
+from tools.analysis import (
+    dataframe_cache_stats,
+    expand_plot_specs,
+    pandas_analyze,
+    pandas_query,
+    plot_create,
+    plot_spec,
+    query_cache_stats,
+)
 from tools.matlab import (
     matlab_open,
     matlab_generate_script,
@@ -29,52 +46,94 @@ from tools.matlab import (
     matlab_run_with_gui,
     matlab_check_convergence,
     matlab_get_figures,
+    matlab_cache_stats,
+    matlab_pool_stats,
 )
 
 mcp = FastMCP("research-harness")
 
+# CPU-bound tools run in a process pool, cache-backed tools in a thread pool
+# and MATLAB runs in a pool of their own, so no single call blocks the event
+# loop and long MATLAB runs cannot starve the other thread tools. Per-tool limits come
+# from MCP_TOOL_LIMITS (e.g. "run_matlab=2,read_excel=4").
+executor = ToolExecutor.from_env()
+
 
 # ── Excel tools ──────────────────────────────────────────────────────
 
 @mcp.tool()
-def read_excel(file_path: str, sheet: str | None = None) -> str:
+async def read_excel(
+    file_path: str,
+    sheet: str | None = None,
+    offset: int | None = None,
+    limit: int | None = None,
+    columns: list[str] | None = None,
+    cursor: str | None = None,
+) -> str:
     """Read an Excel (.xlsx) file and return its contents as JSON.
 
+    For large sheets, pass `limit` (and optionally `offset`/`columns`) to
+    read one page at a time. Paged responses are an object with `rows` and
+    `next_cursor`; pass `next_cursor` back as `cursor` to read the next page.
+
     Args:
         file_path: Path to the Excel file.
         sheet: Optional sheet name. Defaults to the active sheet.
+        offset: Optional number of data rows to skip.
+        limit: Optional maximum number of rows to return.
+        columns: Optional list of column headers to include.
+        cursor: Optional cursor token from a previous paged response.
     """
-    rows = excel_read(file_path, sheet)
-    return json.dumps(rows, ensure_ascii=False, default=str)
+    if offset is None and limit is None and columns is None and cursor is None:
+        rows = await executor.run("read_excel", "process", excel_read, file_path, sheet)
+        return json.dumps(rows, ensure_ascii=False, default=str)
+
+    page = await executor.run(
+        "read_excel", "process", excel_read_page,
+        file_path, sheet,
+        offset=offset or 0,
+        limit=DEFAULT_PAGE_SIZE if limit is None else limit,
+        columns=columns,
+        cursor=cursor,
+    )
+    return json.dumps(page, ensure_ascii=False, default=str)
 
 
 @mcp.tool()
-def write_excel(file_path: str, data: list[dict[str, Any]], sheet: str | None = None) -> str:
+async def write_excel(
+    file_path: str,
+    data: list[dict[str, Any]],
+    sheet: str | None = None,
+    mode: str = "overwrite",
+) -> str:
     """Write data to an Excel (.xlsx) file.
 
     Args:
         file_path: Destination path for the Excel file.
         data: List of row objects. Keys become column headers.
         sheet: Optional sheet name.
+        mode: "overwrite" (default) replaces the file; "append" adds the rows
+            below the last row of an existing sheet, matching keys to its
+            header row.
     """
-    path = excel_write(file_path, data, sheet)
+    path = await executor.run("write_excel", "process", excel_write, file_path, data, sheet, mode)
     return f"Written to {path}"
 
 
 # ── DOCX tools ───────────────────────────────────────────────────────
 
 @mcp.tool()
-def read_docx(file_path: str) -> str:
+async def read_docx(file_path: str) -> str:
     """Read a Word (.docx) file and return its text content.
 
     Args:
         file_path: Path to the DOCX file.
     """
-    return docx_read(file_path)
+    return await executor.run("read_docx", "process", docx_read, file_path)
 
 
 @mcp.tool()
-def write_docx(file_path: str, content: str, template: str | None = None) -> str:
+async def write_docx(file_path: str, content: str, template: str | None = None) -> str:
     """Create or overwrite a Word (.docx) file.
 
     Args:
@@ -82,63 +141,176 @@ def write_docx(file_path: str, content: str, template: str | None = None) -> str
         content: Text content. Each line becomes a paragraph.
         template: Optional path to a .docx template.
     """
-    path = docx_write(file_path, content, template)
+    path = await executor.run("write_docx", "process", docx_write, file_path, content, template)
     return f"Written to {path}"
 
 
 # ── Analysis tools ───────────────────────────────────────────────────
 
 @mcp.tool()
-def analyze_data(file_path: str, query: str) -> str:
+async def analyze_data(
+    file_path: str,
+    query: str,
+    chunked: bool | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> str:
     """Run a pandas query on a data file (.csv, .xlsx, .json).
 
     The DataFrame is available as `df` in the query expression.
     Examples: "df.describe()", "df.groupby('col').mean()", "df.shape"
+    For repeated or paged queries prefer query_data, whose results are cached.
+
+    Large CSV files are streamed in chunks instead of loaded whole; that
+    mode supports shape, head, describe, value_counts, sum/count/min/max/
+    mean/std/var (also via groupby(...).agg), after element-wise row
+    filters and column selections.
+
+    Long results are paginated: pass offset to see later rows.
 
     Args:
         file_path: Path to the data file.
         query: A pandas expression to evaluate.
+        chunked: Force (true) or disable (false) chunked evaluation; by
+            default it is used for CSV files above ANALYSIS_CHUNKED_BYTES.
+        offset: First result row to show.
+        limit: Rows per page (default ANALYSIS_MAX_ROWS, 200).
     """
-    return pandas_analyze(file_path, query)
+    # Threads rather than processes, so repeated queries share one DataFrame cache.
+    return await executor.run(
+        "analyze_data", "thread", pandas_analyze, file_path, query, chunked, offset, limit
+    )
 
 
 @mcp.tool()
-def create_plot(
-    data: list[dict[str, Any]],
+async def query_data(
+    file_path: str,
+    filter: str | None = None,
+    select: list[str] | None = None,
+    groupby: list[str] | None = None,
+    agg: str | list[str] | dict[str, str | list[str]] | None = None,
+    sort: list[str] | None = None,
+    head: int | None = None,
+    sheet: str | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> str:
+    """Run a structured query on a data file (.csv, .xlsx, .json).
+
+    Steps run in the order filter -> select -> groupby/agg -> sort -> head.
+    Results are cached until the file changes, so paging with offset or
+    repeating a query is cheap.
+    Example: filter="trial > 2", groupby=["method"],
+    agg={"error": ["mean", "std"]}, sort=["-error_mean"], head=10
+
+    Args:
+        file_path: Path to the data file.
+        filter: Row filter as a DataFrame.query expression, e.g. "speed > 0.5 and trial == 3".
+        select: Columns to keep.
+        groupby: Columns to group by (requires agg).
+        agg: sum, count, min, max, mean, std, var, median or nunique; a list
+            of them; or a {column: function(s)} dict. List aggregations name
+            columns "<column>_<function>".
+        sort: Columns to sort by; prefix with "-" for descending.
+        head: Keep only the first rows of the result.
+        sheet: Sheet name for Excel files (default: first sheet).
+        offset: First result row to show.
+        limit: Rows per page (default ANALYSIS_MAX_ROWS, 200).
+    """
+    return await executor.run(
+        "query_data", "thread", pandas_query, file_path, sheet, filter, select, groupby, agg, sort,
+        head, offset, limit,
+    )
+
+
+@mcp.tool()
+async def data_cache_stats() -> str:
+    """Report hit/miss counters and memory usage of the parsed-data cache
+    used by analyze_data and query_data, and of query_data's result cache."""
+    return json.dumps({**dataframe_cache_stats(), "results": query_cache_stats()})
+
+
+@mcp.tool()
+async def create_plot(
     chart_type: str,
     output_path: str,
+    data: list[dict[str, Any]] | None = None,
     title: str = "",
     x_col: str | None = None,
     y_col: str | None = None,
+    file_path: str | None = None,
+    sheet: str | None = None,
+    columns: list[str] | None = None,
+    filter: str | None = None,
 ) -> str:
     """Create a chart and save it as a PNG image.
 
+    Prefer file_path over data for tables already on disk: the file is read
+    server-side, so rows do not have to be fetched and sent back.
+
     Args:
-        data: List of row objects to plot.
         chart_type: One of "bar", "line", "scatter", "hist", "pie".
         output_path: Destination PNG path.
+        data: List of row objects to plot (omit when using file_path).
         title: Optional chart title.
         x_col: Column name for x-axis.
         y_col: Column name for y-axis.
+        file_path: Data file (.csv, .xlsx, .json) to plot.
+        sheet: Optional sheet name for Excel files.
+        columns: Optional columns to load from the file.
+        filter: Optional pandas query selecting rows, e.g. "trial == 3 and error < 0.01".
     """
-    path = plot_create(data, chart_type, output_path, title, x_col, y_col)
+    path = await executor.run(
+        "create_plot", "process", plot_create,
+        data, chart_type, output_path, title, x_col, y_col, file_path, sheet, columns, filter,
+    )
     return f"Chart saved to {path}"
 
 
+@mcp.tool()
+async def create_plots(
+    charts: list[dict[str, Any]],
+    file_path: str | None = None,
+    sheet: str | None = None,
+) -> str:
+    """Create many charts from data files in one call.
+
+    Charts are rendered in parallel by the worker processes, which read
+    the data files themselves, so no rows pass through the call. Returns a
+    JSON list with one {"output_path": ...} or {"error": ...} per chart.
+
+    Args:
+        charts: One object per chart with "chart_type", "output_path" and
+            optionally "title", "x_col", "y_col", "columns", a pandas query
+            "filter", and its own "file_path" and "sheet".
+        file_path: Data file (.csv, .xlsx, .json) for charts without one.
+        sheet: Excel sheet for those charts.
+    """
+    specs = expand_plot_specs(charts, file_path, sheet)
+    results = await asyncio.gather(
+        *(executor.run("create_plots", "process", plot_spec, spec) for spec in specs),
+        return_exceptions=True,
+    )
+    return json.dumps([
+        {"error": f"{type(r).__name__}: {r}"} if isinstance(r, BaseException) else {"output_path": r}
+        for r in results
+    ], ensure_ascii=False)
+
+
 # ── MATLAB tools ─────────────────────────────────────────────────────
 
 @mcp.tool()
-def open_matlab() -> str:
+async def open_matlab() -> str:
     """Open the MATLAB GUI application on the user's computer.
 
     Use this when the user asks to open, launch, or start MATLAB.
     """
-    result = matlab_open()
+    result = await executor.run("open_matlab", "thread", matlab_open)
     return json.dumps(result, ensure_ascii=False)
 
 
 @mcp.tool()
-def generate_matlab_script(experiment_type: str, parameters: dict[str, Any]) -> str:
+async def generate_matlab_script(experiment_type: str, parameters: dict[str, Any]) -> str:
     """Generate a MATLAB .m script from a template.
 
     Args:
@@ -149,19 +321,37 @@ def generate_matlab_script(experiment_type: str, parameters: dict[str, Any]) ->
 
 
 @mcp.tool()
-def run_matlab(script: str, work_dir: str | None = None) -> str:
+async def run_matlab(
+    script: str,
+    work_dir: str | None = None,
+    warm: bool = True,
+    cache: bool = False,
+) -> str:
     """Run a MATLAB script and return the result.
 
+    Scripts run on a warm, pooled MATLAB session by default; the workspace
+    is cleared after each run.
+
     Args:
         script: MATLAB script content or path to .m file.
         work_dir: Optional working directory.
+        warm: Set to false to start a fresh MATLAB process for this run.
+        cache: Set to true for deterministic scripts: a previous successful
+            run with the same script and input files is returned instantly
+            (output files are restored into work_dir).
     """
-    result = matlab_run(script, work_dir)
+    result = await executor.run(
+        "run_matlab", "matlab", matlab_run, script, work_dir, warm, cache=cache,
+    )
     return json.dumps(result, ensure_ascii=False)
 
 
 @mcp.tool()
-def run_matlab_gui(script: str, work_dir: str | None = None) -> str:
+async def run_matlab_gui(
+    script: str,
+    work_dir: str | None = None,
+    timeout: float | None = None,
+) -> str:
     """Run a MATLAB script with GUI enabled (figure windows visible on screen).
 
     Use this when the user wants to see MATLAB figure windows, animations,
@@ -171,25 +361,27 @@ def run_matlab_gui(script: str, work_dir: str | None = None) -> str:
     Args:
         script: MATLAB script content to execute.
         work_dir: Optional working directory for execution.
+        timeout: Optional seconds to wait before stopping MATLAB
+            (default 1800; 0 waits indefinitely).
     """
-    result = matlab_run_with_gui(script, work_dir)
+    result = await executor.run("run_matlab_gui", "matlab", matlab_run_with_gui, script, work_dir, timeout)
     return json.dumps(result, ensure_ascii=False)
 
 
 @mcp.tool()
-def check_convergence(mat_file: str, threshold: float = 0.01) -> str:
+async def check_convergence(mat_file: str, threshold: float = 0.01) -> str:
     """Check if simulation results in a .mat file have converged.
 
     Args:
         mat_file: Path to the .mat results file.
         threshold: Convergence threshold (default 0.01).
     """
-    result = matlab_check_convergence(mat_file, threshold)
+    result = await executor.run("check_convergence", "process", matlab_check_convergence, mat_file, threshold)
     return json.dumps(result)
 
 
 @mcp.tool()
-def get_figures(work_dir: str = ".") -> str:
+async def get_figures(work_dir: str = ".") -> str:
     """List all figure files (.png, .fig, .jpg, .svg) in a directory.
 
     Args:
@@ -199,19 +391,19 @@ def get_figures(work_dir: str = ".") -> str:
 
 
 @mcp.tool()
-def convert_mat_to_excel(mat_file: str, output_path: str) -> str:
+async def convert_mat_to_excel(mat_file: str, output_path: str) -> str:
     """Convert a MATLAB .mat file to Excel (.xlsx).
 
     Args:
         mat_file: Path to the .mat file.
         output_path: Destination .xlsx path.
     """
-    path = mat_to_excel(mat_file, output_path)
+    path = await executor.run("convert_mat_to_excel", "process", mat_to_excel, mat_file, output_path)
     return f"Converted to {path}"
 
 
 @mcp.tool()
-def generate_manuscript(
+async def generate_manuscript(
     output_path: str = "manuscript.docx",
     excel_path: str | None = None,
     figures: list[str] | None = None,
@@ -229,9 +421,74 @@ def generate_manuscript(
         template: Optional .docx template path.
         journal_style: Optional journal style name.
     """
-    path = manuscript_generate(excel_path, figures, sections, template, journal_style, output_path)
+    path = await executor.run(
+        "generate_manuscript", "process", manuscript_generate,
+        excel_path, figures, sections, template, journal_style, output_path,
+    )
     return f"Manuscript generated at {path}"
 
 
+# ── Background jobs ──────────────────────────────────────────────────
+
+@mcp.tool()
+async def submit_job(tool: str, arguments: dict[str, Any]) -> str:
+    """Start a long-running tool in the background and return its job id.
+
+    Use this instead of calling the tool directly for long simulations,
+    then poll `job_status` and fetch the output with `job_result`.
+
+    Args:
+        tool: One of "run_matlab", "run_matlab_gui", "convert_mat_to_excel".
+        arguments: The arguments the tool itself takes, e.g.
+            {"script": "...", "work_dir": "..."}.
+    """
+    return json.dumps(get_job_manager().submit(tool, arguments), ensure_ascii=False)
+
+
+@mcp.tool()
+async def job_status(job_id: str) -> str:
+    """Report a job's status ("queued", "running", "succeeded", "failed",
+    "cancelled" or "interrupted"), elapsed time and latest output lines.
+
+    Args:
+        job_id: Id returned by submit_job.
+    """
+    return json.dumps(get_job_manager().status(job_id), ensure_ascii=False)
+
+
+@mcp.tool()
+async def job_result(job_id: str) -> str:
+    """Return a job's record including its result (null until finished).
+
+    Args:
+        job_id: Id returned by submit_job.
+    """
+    return json.dumps(get_job_manager().result(job_id), ensure_ascii=False)
+
+
+@mcp.tool()
+async def cancel_job(job_id: str) -> str:
+    """Cancel a queued or running job. Running MATLAB processes are stopped.
+
+    Args:
+        job_id: Id returned by submit_job.
+    """
+    return json.dumps(get_job_manager().cancel(job_id), ensure_ascii=False)
+
+
+# ── Server tools ─────────────────────────────────────────────────────
+
+@mcp.tool()
+async def server_metrics() -> str:
+    """Report per-tool queue depth, running calls and timings, plus MATLAB
+    session pool and result cache stats."""
+    metrics = executor.metrics()
+    metrics["matlab_pool"] = matlab_pool_stats()
+    metrics["matlab_cache"] = matlab_cache_stats()
+    return json.dumps(metrics)
+
+
 if __name__ == "__main__":
+    executor.prewarm()
+    get_job_manager()  # marks jobs orphaned by a previous run as interrupted
     mcp.run()
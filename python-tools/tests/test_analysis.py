@@ -1,10 +1,19 @@
 """Tests for analysis tools."""
 
+import asyncio
 import csv
 import tempfile
 from pathlib import Path
 
-from tools.analysis import pandas_analyze, plot_create
+from tools.analysis import (
+    dataframe_cache_stats,
+    expand_plot_specs,
+    pandas_analyze,
+    plot_create,
+    plot_spec,
+    select_dataframe,
+)
+from tools.executor import ToolExecutor
 
 
 def test_pandas_analyze():
@@ -28,6 +37,29 @@ def test_pandas_analyze():
     print("pandas_analyze test PASSED")
 
 
+def test_pandas_analyze_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = Path(tmpdir) / "cached.csv"
+        csv_path.write_text("a,b\n1,2\n3,4\n")
+
+        before = dataframe_cache_stats()
+        assert "(2, 2)" in pandas_analyze(str(csv_path), "df.shape")
+        assert "4" in pandas_analyze(str(csv_path), "df['a'].sum()")
+        after = dataframe_cache_stats()
+        assert after["misses"] == before["misses"] + 1
+        assert after["hits"] == before["hits"] + 1
+
+        # Queries that assign to df must not leak into the cache
+        pandas_analyze(str(csv_path), "df.insert(0, 'c', 0)")
+        assert "(2, 2)" in pandas_analyze(str(csv_path), "df.shape")
+
+        # Rewriting the file (new size) invalidates the cached frame
+        csv_path.write_text("a,b\n1,2\n3,4\n5,6\n")
+        assert "(3, 2)" in pandas_analyze(str(csv_path), "df.shape")
+
+    print("pandas_analyze cache test PASSED")
+
+
 def test_plot_create():
     data = [
         {"x": 1, "y": 10},
@@ -44,6 +76,80 @@ def test_plot_create():
     print("plot_create test PASSED")
 
 
+
+def test_plot_create_from_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = Path(tmpdir) / "trials.csv"
+        csv_path.write_text("trial,t,error,note\n" + "".join(f"{i % 3},{i},{1 / (i + 1)},x\n" for i in range(30)))
+
+        df = select_dataframe(str(csv_path), columns=["t", "error"], filter="trial == 1 and error < 0.2")
+        assert list(df.columns) == ["t", "error"] and len(df) == 8
+
+        before = dataframe_cache_stats()
+        out = plot_create(
+            None, "line", str(Path(tmpdir) / "trial1.png"), x_col="t", y_col="error",
+            file_path=str(csv_path), columns=["t", "error"], filter="trial == 1",
+        )
+        assert Path(out).stat().st_size > 0
+        assert dataframe_cache_stats()["hits"] == before["hits"] + 1
+
+        bad_filters = ({"filter": "error > @limit"}, {"filter": "t.__class__ == t"})
+        for kwargs in ({"columns": ["t", "missing"]}, {"data": [{"t": 1}]}, *bad_filters):
+            try:
+                plot_create(kwargs.pop("data", None), "line", str(Path(tmpdir) / "bad.png"), file_path=str(csv_path), **kwargs)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"accepted {kwargs}")
+
+    print("plot_create from file PASSED")
+
+
+def test_plot_batch():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        csv_path = Path(tmpdir) / "series.csv"
+        csv_path.write_text("t,a,b\n" + "".join(f"{i},{i * i},{10 - i}\n" for i in range(10)))
+        charts = [
+            {"chart_type": "line", "output_path": f"{tmpdir}/line.png", "x_col": "t", "y_col": "a", "filter": "t > 2"},
+            {"chart_type": "scatter", "output_path": f"{tmpdir}/scatter.png", "x_col": "a", "y_col": "b"},
+            {"chart_type": "bar", "output_path": f"{tmpdir}/bar.png", "y_col": "missing"},
+        ]
+        specs = expand_plot_specs(charts, str(csv_path))
+        assert [s["file_path"] for s in specs] == [str(csv_path)] * 3
+
+        for bad in (
+            [{"chart_type": "line", "output_path": "x.png", "colour": "red"}],
+            [{"chart_type": "area", "output_path": "x.png"}],
+            [{"chart_type": "line", "output_path": "x.png"}, {"chart_type": "bar", "output_path": "./x.png"}],
+        ):
+            try:
+                expand_plot_specs(bad, str(csv_path))
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"accepted {bad}")
+
+        ex = ToolExecutor(process_workers=2)
+
+        async def main():
+            return await asyncio.gather(
+                *(ex.run("create_plots", "process", plot_spec, spec) for spec in specs), return_exceptions=True,
+            )
+
+        try:
+            results = asyncio.run(main())
+        finally:
+            ex.shutdown()
+        assert results[:2] == [f"{tmpdir}/line.png", f"{tmpdir}/scatter.png"]
+        assert all(Path(r).stat().st_size > 0 for r in results[:2])
+        assert isinstance(results[2], KeyError)
+
+    print("plot batch PASSED")
+
+
 if __name__ == "__main__":
     test_pandas_analyze()
+    test_pandas_analyze_cache()
     test_plot_create()
+    test_plot_create_from_file()
+    test_plot_batch()
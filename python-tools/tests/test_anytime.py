@@ -0,0 +1,79 @@
+"""Tests for the anytime RRT* planner."""
+
+import numpy as np
+import pytest
+
+from tools.planning.anytime import anytime_rrt_star
+from tools.planning.collision import as_spheres, segment_sphere_distance
+from tools.planning.problem import Budget, Problem
+
+OBSTACLE = as_spheres([(5.0, 5.0, 2.0)])
+
+
+def _edges_hit(q_from, q_to):
+    q_from, q_to = np.broadcast_arrays(np.atleast_2d(q_from), np.atleast_2d(q_to))
+    return (segment_sphere_distance(q_from, q_to, OBSTACLE) <= OBSTACLE[:, -1]).any(axis=-1)
+
+
+PROBLEM = Problem(
+    start=np.array([1.0, 1.0]),
+    goal=np.array([9.0, 9.0]),
+    sample=lambda rng: rng.uniform(0, 10, 2),
+    edges_hit=_edges_hit,
+    goal_tol=0.5,
+    low=np.zeros(2),
+    high=np.full(2, 10.0),
+)
+
+
+def _run(budget, seed=0):
+    return anytime_rrt_star(PROBLEM, budget, np.random.default_rng(seed), step_size=0.5, radius=1.5)
+
+
+def test_costs_consistent_and_best_tracked():
+    res = _run(Budget(iterations=3000))
+    assert res.stop_reason == "iterations" and res.iterations == 3000
+    assert res.success and res.metrics()["improvements"] > 1
+
+    # Rewires propagated: every cost-to-come matches its parent link.
+    tree = res.tree
+    child = np.flatnonzero(tree.parent >= 0)
+    edge = np.linalg.norm(tree.coords[child] - tree.coords[tree.parent[child]], axis=1)
+    np.testing.assert_allclose(tree.cost[child], tree.cost[tree.parent[child]] + edge)
+
+    # The incrementally tracked best equals a brute-force scan.
+    d_goal = np.linalg.norm(tree.coords - PROBLEM.goal, axis=1)
+    goal = d_goal <= PROBLEM.goal_tol
+    assert res.cost == pytest.approx((tree.cost[goal] + d_goal[goal]).min())
+    assert res.cost == pytest.approx(np.linalg.norm(np.diff(res.path, axis=0), axis=1).sum())
+    np.testing.assert_array_equal(res.path[-1], PROBLEM.goal)
+
+    # The curve is monotone and ends at the stop.
+    t, it, cost = res.curve.T
+    assert np.all(np.diff(t) >= 0) and np.all(np.diff(cost) <= 0)
+    assert it[0] == res.first_solution_iteration and it[-1] == res.iterations
+    print("costs consistent / best tracked PASSED")
+
+
+def test_plateau_and_time_budgets():
+    res = _run(Budget(iterations=50_000, plateau_iterations=300, plateau_tol=0.01))
+    assert res.stop_reason == "plateau" and res.iterations < 50_000
+    # The last improvement of more than 1% came exactly 300 iterations before the stop.
+    ref, last = np.inf, None
+    for _, it, cost in res.curve[:-1]:
+        if cost < ref * 0.99:
+            ref, last = cost, it
+    assert res.iterations - last == 300
+
+    res = _run(Budget(time=0.2))
+    assert res.stop_reason == "time" and 0.2 <= res.elapsed < 2.0
+
+    for bad in [{}, {"plateau_iterations": 100}]:
+        with pytest.raises(ValueError):
+            Budget(**bad)
+    print("plateau and time budgets PASSED")
+
+
+if __name__ == "__main__":
+    test_costs_consistent_and_best_tracked()
+    test_plateau_and_time_budgets()
@@ -0,0 +1,194 @@
+"""Tests for out-of-core query evaluation on large CSV files."""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tools import chunked
+from tools.analysis import dataframe_cache_stats, pandas_analyze
+
+QUERIES = [
+    "df.shape",
+    "df[(df.x > 5) & df.g.isin(['a', 'b'])].shape",
+    "df.describe()",
+    "df['x'].describe()",
+    "df.g.value_counts()",
+    "df[['g', 'h']].value_counts(normalize=True)",
+    "df.groupby('g')['x'].mean()",
+    "df.groupby('g').y.sum()",
+    "df.groupby('g').count()",
+    "df.groupby('g').size()",
+    "df.groupby(['g', 'h']).agg({'x': ['mean', 'std'], 'y': 'max'})",
+    "df.groupby('g')[['x', 'y']].agg(['sum', 'var', 'count'])",
+    "df[['x', 'y']].agg(['min', 'max', 'std'])",
+    "df.x.std()",
+    "df.query('y > 50 and g == \"a\"').head(7)",
+    "df.loc[df.s.str.contains('ba') & df.y.between(10, 20), ['g', 'y']]",
+    "df[df.h == 1]",
+]
+
+
+def _write_csv(path, n=5000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "g": rng.choice(list("abcd"), n),
+        "h": rng.integers(0, 3, n),
+        "x": rng.normal(5, 10, n),
+        "y": rng.integers(0, 100, n),
+        "s": rng.choice(["foo", "bar", "baz"], n),
+    })
+    df.loc[::17, "x"] = np.nan
+    df.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+def test_chunked_matches_pandas():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "data.csv"
+        df = _write_csv(path)
+        for query in QUERIES:
+            expected = eval(query, {"__builtins__": {}}, {"df": df, "pd": pd})
+            result, notes = chunked.plan_query(query).run(path, chunksize=700, offset=3, limit=50)
+            assert notes[0].startswith("out-of-core: scanned")
+            if isinstance(result, chunked.Page):
+                # Row results keep only the requested page.
+                assert result.offset == 3 and result.total == len(expected)
+                pd.testing.assert_frame_equal(result.rows, expected.iloc[3:53], check_dtype=False)
+            elif isinstance(expected, pd.DataFrame):
+                pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_index_type=False,
+                                              check_column_type=False, check_names=False)
+            elif isinstance(expected, pd.Series):
+                pd.testing.assert_series_equal(result, expected, check_dtype=False, check_index_type=False,
+                                               check_names=False)
+            else:
+                assert np.isclose(result, expected) if isinstance(expected, float) else result == expected
+    print("chunked matches pandas PASSED")
+
+
+def test_chunked_keeps_integer_dtypes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "data.csv"
+        n = 2000
+        big = pd.DataFrame({"k": np.arange(n) % 3, "v": np.arange(n) + 2**53, "w": np.arange(n, dtype=float)})
+        big.loc[1900, "w"] = np.nan  # integral in the first chunks only
+        big.to_csv(path, index=False)
+        df = pd.read_csv(path)
+        for query in ["df.v.min()", "df.v.max()", "df.groupby('k').v.sum()", "df.groupby('k').max()",
+                      "df.groupby('k').w.min()", "df[['v', 'w']].min()"]:
+            expected = eval(query, {"__builtins__": {}}, {"df": df, "pd": pd})
+            result, _ = chunked.plan_query(query).run(path, chunksize=500)
+            if isinstance(expected, (pd.Series, pd.DataFrame)):
+                assert result.equals(expected), query
+            else:
+                assert type(result) is type(expected) and result == expected, query
+    print("chunked keeps integer dtypes PASSED")
+
+
+def test_chunked_empty_filter():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "data.csv"
+        df = _write_csv(path, n=1000)
+        # No chunk has a matching row: reductions give pandas' empty results.
+        for query in ["df[df.y > 500].x.sum()", "df[df.y > 500].y.sum()", "df[df.y > 500].x.mean()",
+                      "df[df.y > 500].describe()", "df[df.y > 500][['x', 'y']].agg(['sum', 'min', 'std'])",
+                      "df[df.y > 500].g.value_counts()", "df[df.y > 500].groupby('g').x.sum()"]:
+            expected = eval(query, {"__builtins__": {}}, {"df": df, "pd": pd})
+            result, _ = chunked.plan_query(query).run(path, chunksize=333)
+            if isinstance(expected, pd.DataFrame):
+                pd.testing.assert_frame_equal(result, expected, check_index_type=False)
+            elif isinstance(expected, pd.Series):
+                assert result.empty and expected.empty, query
+            else:
+                assert result == expected or (np.isnan(result) and np.isnan(expected)), query
+    print("chunked empty filter PASSED")
+
+
+def test_chunked_rejects_unsupported():
+    for query in ["df.x.cumsum()", "df[df.x > df.x.mean()]", "df.sort_values('x')", "df.groupby('g').median()"]:
+        try:
+            chunked.plan_query(query)
+        except chunked.UnsupportedQuery:
+            continue
+        raise AssertionError(f"{query} should be rejected")
+    try:
+        chunked.plan_query("df[df.x > 0]").run("unused.csv")
+    except chunked.UnsupportedQuery:
+        pass
+    else:
+        raise AssertionError("row results need a page limit")
+    # query() steps get the same checks as pandas_query filters.
+    for query in ["df.query('x > @limit').shape", "df.query('x.__class__ == x').shape"]:
+        try:
+            chunked.plan_query(query)
+        except ValueError:
+            continue
+        raise AssertionError(f"{query} should be rejected")
+    print("chunked rejects unsupported PASSED")
+
+
+def test_chunked_describe_samples_quartiles():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "data.csv"
+        df = _write_csv(path)
+        old = chunked.SAMPLE_SIZE
+        chunked.SAMPLE_SIZE = 1000
+        try:
+            result, notes = chunked.plan_query("df.describe()").run(path, chunksize=700)
+        finally:
+            chunked.SAMPLE_SIZE = old
+        expected = df.describe()
+        # Moments are exact, quartiles approximate.
+        pd.testing.assert_frame_equal(result.loc[["count", "mean", "std", "min", "max"]],
+                                      expected.loc[["count", "mean", "std", "min", "max"]], check_dtype=False)
+        spread = expected.loc["75%"] - expected.loc["25%"]
+        assert ((result.loc["50%"] - expected.loc["50%"]).abs() < 0.15 * spread).all()
+        assert any("sample" in note for note in notes)
+    print("chunked describe samples quartiles PASSED")
+
+
+def test_pandas_analyze_switches_by_size():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "data.csv"
+        _write_csv(path)
+        old = chunked.CHUNKED_MIN_BYTES
+        chunked.CHUNKED_MIN_BYTES = path.stat().st_size
+        try:
+            entries = dataframe_cache_stats()["entries"]
+            result = pandas_analyze(str(path), "df.groupby('g')['y'].max()")
+            assert "out-of-core" in result and "99" in result
+            # Row results come one page at a time, with the total count.
+            result = pandas_analyze(str(path), "df[df.h == 1]", offset=10, limit=5)
+            assert "[rows 10-14 of " in result and "pass offset=15 for more" in result
+            # The file was never loaded whole.
+            assert dataframe_cache_stats()["entries"] == entries
+            try:
+                pandas_analyze(str(path), "df.sort_values('x')")
+            except chunked.UnsupportedQuery as e:
+                assert "too large" in str(e)
+            else:
+                raise AssertionError("unsupported query on a large file should fail")
+            assert "out-of-core" not in pandas_analyze(str(path), "df.shape", chunked_mode=False)
+        finally:
+            chunked.CHUNKED_MIN_BYTES = old
+        assert "out-of-core" not in pandas_analyze(str(path), "df.shape")
+
+        xlsx = Path(tmpdir) / "data.xlsx"
+        pd.DataFrame({"a": [1]}).to_excel(xlsx, index=False)
+        try:
+            pandas_analyze(str(xlsx), "df.shape", chunked_mode=True)
+        except ValueError as e:
+            assert ".csv" in str(e)
+        else:
+            raise AssertionError("chunked mode should reject non-CSV files")
+    print("pandas_analyze switches by size PASSED")
+
+
+if __name__ == "__main__":
+    test_chunked_matches_pandas()
+    test_chunked_keeps_integer_dtypes()
+    test_chunked_empty_filter()
+    test_chunked_rejects_unsupported()
+    test_chunked_describe_samples_quartiles()
+    test_pandas_analyze_switches_by_size()
@@ -0,0 +1,138 @@
+"""Tests for the columnar sidecar cache."""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+from tools import columnar
+from tools.analysis import load_dataframe, pandas_analyze
+from tools.excel import excel_read, excel_read_page, excel_write
+
+
+def _with_dirs(tmpdir: str) -> tuple[Path, Path]:
+    uploads = Path(tmpdir) / "uploads"
+    cache = Path(tmpdir) / "cache"
+    uploads.mkdir()
+    os.environ["UPLOADS_DIR"] = str(uploads)
+    os.environ["COLUMNAR_CACHE_DIR"] = str(cache)
+    return uploads, cache
+
+
+def _restore_env() -> None:
+    os.environ.pop("UPLOADS_DIR", None)
+    os.environ.pop("COLUMNAR_CACHE_DIR", None)
+
+
+def test_sidecar_roundtrip():
+    data = [{"id": i, "name": f"s{i}", "force": i * 0.5} for i in range(30)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        uploads, cache = _with_dirs(tmpdir)
+        try:
+            path = str(uploads / "tensile.xlsx")
+            excel_write(path, data, sheet="Data")
+            assert columnar.is_cacheable(path)
+
+            rows = excel_read(path, sheet="Data")
+            assert rows == data
+
+            # The first access left a sidecar keyed by content hash
+            entry = cache / columnar.content_hash(path)
+            assert list(entry.glob("*.feather"))
+
+            page = excel_read_page(path, offset=10, limit=5, columns=["force"])
+            assert page["sheet"] == "Data"
+            assert page["rows"] == [{"force": i * 0.5} for i in range(10, 15)]
+
+            assert "(30, 3)" in pandas_analyze(path, "df.shape")
+        finally:
+            _restore_env()
+    print("columnar sidecar roundtrip PASSED")
+
+
+def test_sidecar_fallbacks():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        uploads, cache = _with_dirs(tmpdir)
+        try:
+            # Files outside the uploads dir are read directly
+            outside = str(Path(tmpdir) / "out.xlsx")
+            excel_write(outside, [{"a": 1}])
+            assert not columnar.is_cacheable(outside)
+            assert columnar.sheet_table(outside) is None
+
+            # Mixed-type columns are not converted, but still readable
+            mixed = str(uploads / "mixed.xlsx")
+            excel_write(mixed, [{"a": 1}, {"a": "n/a"}])
+            assert columnar.sheet_table(mixed) is None
+            assert excel_read(mixed) == [{"a": 1}, {"a": "n/a"}]
+        finally:
+            _restore_env()
+    print("columnar sidecar fallbacks PASSED")
+
+
+def test_sidecar_cache_evicts_old_versions():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        uploads, cache = _with_dirs(tmpdir)
+        os.environ["COLUMNAR_CACHE_BYTES"] = "1"
+        try:
+            path = str(uploads / "log.xlsx")
+            hashes = []
+            for n in (10, 20, 30):
+                # Each edit is a new content hash, so a new sidecar.
+                excel_write(path, [{"i": i} for i in range(n)])
+                assert len(excel_read(path)) == n
+                hashes.append(columnar.content_hash(path))
+            # Over budget: only the workbook in use keeps its sidecar.
+            assert [p.name for p in cache.iterdir()] == [hashes[-1]]
+            assert list((cache / hashes[-1]).glob("*.feather"))
+
+            del os.environ["COLUMNAR_CACHE_BYTES"]
+            excel_write(path, [{"i": 0}])
+            excel_read(path)
+            assert columnar.evict() == 0 and len(list(cache.iterdir())) == 2
+        finally:
+            os.environ.pop("COLUMNAR_CACHE_BYTES", None)
+            _restore_env()
+    print("columnar sidecar eviction PASSED")
+
+
+def test_sidecar_frame_matches_read_excel():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        uploads, cache = _with_dirs(tmpdir)
+        try:
+            wb = openpyxl.Workbook()
+            ws = wb.active
+            ws.title = "First"
+            # Blank, numeric and (after renaming) duplicate headers, a
+            # trailing empty column and a trailing empty row.
+            ws.append(["Unnamed: 1", None, 2024, 2.5, "name", None])
+            ws.append(["a", 1, 2.5, 7, "x"])
+            ws.append(["b", 2, 3.5, 8, "y"])
+            ws.append([None] * 6)
+            wb.create_sheet("Second").append(["other"])
+            wb.active = 1
+            outside = Path(tmpdir) / "book.xlsx"
+            wb.save(outside)
+            inside = uploads / "book.xlsx"
+            shutil.copy(outside, inside)
+
+            direct = load_dataframe(str(outside))
+            sidecar = load_dataframe(str(inside))
+            assert list(cache.rglob("*.feather"))
+            assert list(direct.columns) == ["Unnamed: 1", "Unnamed: 1.1", 2024, 2.5, "name"]
+            pd.testing.assert_frame_equal(sidecar, direct)
+            assert pandas_analyze(str(inside), "df[2024].sum()") == pandas_analyze(str(outside), "df[2024].sum()")
+        finally:
+            _restore_env()
+    print("columnar sidecar frame matches read_excel PASSED")
+
+
+if __name__ == "__main__":
+    test_sidecar_roundtrip()
+    test_sidecar_fallbacks()
+    test_sidecar_cache_evicts_old_versions()
+    test_sidecar_frame_matches_read_excel()
@@ -0,0 +1,71 @@
+"""Tests for the precomputed configuration-space grid."""
+
+import os
+import tempfile
+
+import numpy as np
+
+from tools.planning.anytime import anytime_rrt_star
+from tools.planning.collision import edges_hit
+from tools.planning.cspace import CSpaceGrid, GridRobot, grid_key
+from tools.planning.harness import SCENARIOS
+from tools.planning.kinematics import planar_joint_positions
+from tools.planning.problem import Budget, Problem
+
+SCENARIO = SCENARIOS["2dof"]
+
+
+def test_grid_is_conservative():
+    arm = SCENARIO.robot()
+    grid = CSpaceGrid.rasterize(arm, SCENARIO.obstacles, 128)
+    assert grid.occupied.shape == (128, 128) and 0.3 < grid.free_fraction < 0.9
+
+    rng = np.random.default_rng(0)
+    q_from = rng.uniform(-np.pi, np.pi, (500, 2))
+    q_to = np.clip(q_from + rng.normal(0, 0.4, (500, 2)), -np.pi, np.pi)
+    fk = lambda q: planar_joint_positions(q, [1.0, 1.0])  # noqa: E731
+    dense = edges_hit(q_from, q_to, fk, SCENARIO.obstacles.spheres, steps=400)
+    hits = grid.edges_hit(q_from, q_to)
+    assert not np.any(dense & ~hits)
+    assert hits.mean() < dense.mean() + 0.15
+    np.testing.assert_array_equal(grid.config_hits(q_from), grid.edges_hit(q_from, q_from))
+    # Outside the joint limits counts as a collision.
+    assert grid.config_hits([[0.0, 3.5]])[0]
+    print("grid is conservative PASSED")
+
+
+def test_grid_cache_and_image():
+    arm = SCENARIO.robot()
+    with tempfile.TemporaryDirectory() as tmp:
+        first = CSpaceGrid.cached(arm, SCENARIO.obstacles, 64, tmp)
+        assert len(os.listdir(tmp)) == 1
+        second = CSpaceGrid.cached(arm, SCENARIO.obstacles, 64, tmp)
+        np.testing.assert_array_equal(first.occupied, second.occupied)
+        np.testing.assert_array_equal(second.low, arm.low)
+
+        # Different obstacles or resolution: a different entry.
+        CSpaceGrid.cached(arm, SCENARIO.obstacles.inflated(0.1), 64, tmp)
+        assert len(os.listdir(tmp)) == 2
+        assert grid_key(arm, SCENARIO.obstacles, (64, 64)) != grid_key(arm, SCENARIO.obstacles, (128, 128))
+
+        out = first.save_image(os.path.join(tmp, "cspace.png"), [np.array([[0, 0], [0.5, -1]])], {"start": (0, 0)})
+        assert out.stat().st_size > 0
+    print("grid cache and image PASSED")
+
+
+def test_planning_on_grid():
+    grid = CSpaceGrid.rasterize(SCENARIO.robot(), SCENARIO.obstacles, 512)
+    robot = GridRobot(grid)
+    problem = Problem.for_robot(robot, None, SCENARIO.start, SCENARIO.goal, SCENARIO.goal_tol)
+    res = anytime_rrt_star(problem, Budget(iterations=2000), np.random.default_rng(3), step_size=0.15, radius=0.6)
+    assert res.success and robot.checks > 0
+    # The path is collision-free for the exact arm too.
+    arm = SCENARIO.robot()
+    assert not arm.edges_hit(res.path[:-1], res.path[1:], SCENARIO.obstacles).any()
+    print("planning on grid PASSED")
+
+
+if __name__ == "__main__":
+    test_grid_is_conservative()
+    test_grid_cache_and_image()
+    test_planning_on_grid()
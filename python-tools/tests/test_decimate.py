@@ -0,0 +1,86 @@
+"""Tests for plot decimation."""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from tools import decimate
+from tools.analysis import _render_plot
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 100, n)
+    return pd.DataFrame({"t": t, "a": np.sin(t) + rng.normal(0, 0.3, n), "b": np.cumsum(rng.normal(0, 0.01, n))})
+
+
+def test_m4_keeps_bucket_extremes():
+    df = _series(10_000)
+    x, ys = df["t"].to_numpy(), df[["a", "b"]].to_numpy()
+    idx = decimate.m4_indices(x, ys, 50)
+    assert len(idx) <= 50 * 6 and np.all(np.diff(idx) > 0)
+    bucket = np.minimum((x - x[0]) / (x[-1] - x[0]) * 50, 49).astype(int)
+    kept = np.isin(np.arange(len(x)), idx)
+    for b in range(50):
+        rows = np.flatnonzero(bucket == b)
+        assert kept[rows[0]] and kept[rows[-1]]
+        for y in ys.T:
+            assert y[rows].min() in y[idx] and y[rows].max() in y[idx]
+    print("m4 keeps bucket extremes PASSED")
+
+
+def test_decimate_line_fallbacks():
+    small = _series(100)
+    assert decimate.decimate_line(small, "t", ["a"], 1000) is small
+    big = _series(50_000)
+    assert len(decimate.decimate_line(big, "t", ["a", "b"], 500)) < 50_000 // 2
+    # Unsorted x, NaN gaps and text x are drawn as they are.
+    for df in (big.iloc[::-1], big.assign(a=big["a"].where(big.index % 997 != 0)), big.assign(t=big["t"].astype(str))):
+        assert decimate.decimate_line(df, "t", ["a"], 500) is df
+    # A datetime index works like a numeric x.
+    dated = big.set_index(pd.date_range("2026-01-01", periods=len(big), freq="s"))
+    assert len(decimate.decimate_line(dated, None, ["a"], 500)) < len(dated)
+    print("decimate line fallbacks PASSED")
+
+
+def test_decimated_plot_looks_the_same():
+    df = _series(60_000)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        full, reduced = Path(tmpdir) / "full.png", Path(tmpdir) / "reduced.png"
+        threshold = decimate.LINE_POINTS_THRESHOLD
+        try:
+            decimate.LINE_POINTS_THRESHOLD = len(df)
+            _render_plot(df, "line", str(full), x_col="t")
+            decimate.LINE_POINTS_THRESHOLD = 1_000
+            _render_plot(df, "line", str(reduced), x_col="t")
+        finally:
+            decimate.LINE_POINTS_THRESHOLD = threshold
+        a = np.asarray(Image.open(full).convert("L"), dtype=int)
+        b = np.asarray(Image.open(reduced).convert("L"), dtype=int)
+    assert a.shape == b.shape
+    # Only antialiasing at the stroke edges differs.
+    assert np.mean(np.abs(a - b) > 64) < 0.002
+    print("decimated plot looks the same PASSED")
+
+
+def test_large_scatter_uses_hexbin():
+    df = _series(5_000)
+    threshold = decimate.SCATTER_POINTS_THRESHOLD
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            decimate.SCATTER_POINTS_THRESHOLD = 1_000
+            out = _render_plot(df, "scatter", f"{tmpdir}/density.png", x_col="a", y_col="b")
+        finally:
+            decimate.SCATTER_POINTS_THRESHOLD = threshold
+        assert Path(out).stat().st_size > 0
+    print("large scatter uses hexbin PASSED")
+
+
+if __name__ == "__main__":
+    test_m4_keeps_bucket_extremes()
+    test_decimate_line_fallbacks()
+    test_decimated_plot_looks_the_same()
+    test_large_scatter_uses_hexbin()
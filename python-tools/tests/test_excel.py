@@ -3,7 +3,13 @@
 import tempfile
 from pathlib import Path
 
-from tools.excel import excel_read, excel_write
+import numpy as np
+import openpyxl
+import pandas as pd
+from scipy.io import savemat
+
+import tools.excel as excel_tools
+from tools.excel import excel_read, excel_read_page, excel_write, mat_to_excel
 
 
 def test_roundtrip():
@@ -30,5 +36,149 @@ def test_roundtrip():
     print("Excel roundtrip test PASSED")
 
 
+def test_read_page():
+    data = [{"id": i, "name": f"row{i}", "value": i * 1.5} for i in range(25)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = str(Path(tmpdir) / "paged.xlsx")
+        excel_write(path, data, sheet="Data")
+
+        page = excel_read_page(path, sheet="Data", offset=0, limit=10, columns=["id", "value"])
+        assert page["columns"] == ["id", "value"]
+        assert len(page["rows"]) == 10
+        assert page["rows"][0] == {"id": 0, "value": 0.0}
+        assert page["next_cursor"]
+
+        # Follow cursors to the end of the sheet
+        seen = [r["id"] for r in page["rows"]]
+        while page["next_cursor"]:
+            page = excel_read_page(path, limit=10, cursor=page["next_cursor"])
+            assert page["columns"] == ["id", "value"]
+            seen.extend(r["id"] for r in page["rows"])
+        assert seen == list(range(25))
+
+        # Offset past the end yields an empty final page
+        page = excel_read_page(path, sheet="Data", offset=100, limit=10)
+        assert page["rows"] == []
+        assert page["next_cursor"] is None
+
+        try:
+            excel_read_page(path, sheet="Data", columns=["missing"])
+            raise AssertionError("expected ValueError for unknown column")
+        except ValueError:
+            pass
+
+    print("Excel paged read test PASSED")
+
+
+def test_mat_to_excel_bulk():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mat_path = str(Path(tmpdir) / "sim.mat")
+        savemat(mat_path, {
+            "trace": np.arange(25, dtype=float),
+            "gains": np.array([[1, 2, 3], [4, 5, 6]]),
+            "label": "run-7",
+        })
+
+        xlsx_path = str(Path(tmpdir) / "sim.xlsx")
+        original = excel_tools.EXCEL_MAX_ROWS
+        excel_tools.EXCEL_MAX_ROWS = 10  # force the trace to span sheets
+        try:
+            mat_to_excel(mat_path, xlsx_path)
+        finally:
+            excel_tools.EXCEL_MAX_ROWS = original
+
+        wb = openpyxl.load_workbook(xlsx_path, read_only=True)
+        try:
+            assert wb.sheetnames == ["trace", "trace_2", "trace_3", "gains", "label"]
+            trace = [
+                row[0]
+                for name in ("trace", "trace_2", "trace_3")
+                for row in wb[name].iter_rows(values_only=True)
+            ]
+            assert trace == list(range(25))
+            assert [list(r) for r in wb["gains"].iter_rows(values_only=True)] == [[1, 2, 3], [4, 5, 6]]
+            assert next(wb["label"].iter_rows(values_only=True))[0] == "run-7"
+        finally:
+            wb.close()
+
+    print("mat_to_excel bulk test PASSED")
+
+
+def test_write_stream_and_append():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = str(Path(tmpdir) / "log.xlsx")
+
+        # Generator input, streamed in write-only mode
+        rows = ({"trial": i, "load": i * 10.0} for i in range(5))
+        excel_write(path, rows, sheet="Log")
+
+        # Append dict rows (matched to the header), sequences and a DataFrame
+        excel_write(path, [{"load": 50.0, "trial": 5}], sheet="Log", mode="append")
+        excel_write(path, [[6, 60.0]], sheet="Log", mode="append")
+        excel_write(path, pd.DataFrame({"load": [70.0], "trial": [7]}), sheet="Log", mode="append")
+
+        rows = excel_read(path, sheet="Log")
+        assert [r["trial"] for r in rows] == list(range(8))
+        assert rows[-1] == {"trial": 7, "load": 70.0}
+
+        try:
+            excel_write(path, [{"unknown": 1}], sheet="Log", mode="append")
+            raise AssertionError("expected ValueError for unknown column")
+        except ValueError:
+            pass
+        assert len(excel_read(path, sheet="Log")) == 8
+
+        # Other sheets survive an append untouched
+        wb = openpyxl.load_workbook(path)
+        wb.create_sheet("Notes").append(["keep me"])
+        wb.save(path)
+        excel_write(path, [[8, 80.0]], sheet="Log", mode="append")
+        assert excel_read(path, sheet="Notes") == []
+        assert openpyxl.load_workbook(path)["Notes"]["A1"].value == "keep me"
+        assert len(excel_read(path, sheet="Log")) == 9
+
+    print("Excel streaming write/append test PASSED")
+
+
+def test_append_after_stream_export():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # mat_to_excel writes rows without explicit row numbers.
+        mat_path = str(Path(tmpdir) / "sim.mat")
+        savemat(mat_path, {"trace": np.array([1.0, 2.0])})
+        xlsx_path = str(Path(tmpdir) / "sim.xlsx")
+        mat_to_excel(mat_path, xlsx_path)
+        excel_write(xlsx_path, [[99]], sheet="trace", mode="append")
+        wb = openpyxl.load_workbook(xlsx_path)
+        assert [r for r in wb["trace"].iter_rows(values_only=True)] == [(1.0,), (2.0,), (99,)]
+
+        # Trailing rows that are only formatted are replaced, as with
+        # appending after the last row with content.
+        path = str(Path(tmpdir) / "styled.xlsx")
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.append(["a", "b"])
+        ws.append([1, 2])
+        for row in range(3, 6):
+            ws.cell(row=row, column=1).font = openpyxl.styles.Font(bold=True)
+        wb.save(path)
+        excel_write(path, [[3, 4]], mode="append")
+        ws = openpyxl.load_workbook(path).active
+        assert [r for r in ws.iter_rows(values_only=True)] == [("a", "b"), (1, 2), (3, 4)]
+
+        # Dict rows appended to a blank sheet get a header row.
+        path = str(Path(tmpdir) / "blank.xlsx")
+        openpyxl.Workbook().save(path)
+        excel_write(path, [{"x": 1, "y": 2}], mode="append")
+        excel_write(path, [{"y": 4, "x": 3}], mode="append")
+        assert excel_read(path) == [{"x": 1, "y": 2}, {"x": 3, "y": 4}]
+
+    print("append after stream export test PASSED")
+
+
 if __name__ == "__main__":
     test_roundtrip()
+    test_read_page()
+    test_mat_to_excel_bulk()
+    test_write_stream_and_append()
+    test_append_after_stream_export()
@@ -0,0 +1,99 @@
+"""Tests for the bounded tool executor."""
+
+import asyncio
+import os
+import time
+
+from tools.executor import ToolExecutor, parse_limits
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def test_parse_limits():
+    assert parse_limits("run_matlab=2, read_excel=4,") == {"run_matlab": 2, "read_excel": 4}
+    assert parse_limits("") == {}
+    print("parse_limits PASSED")
+
+
+def test_thread_limit_queues_calls():
+    ex = ToolExecutor(thread_workers=4, limits={"slow": 1})
+
+    async def main():
+        tasks = [asyncio.create_task(ex.run("slow", "thread", _sleep, 0.1)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        during = ex.metrics()["tools"]["slow"]
+        # Another tool is not held up by the queued "slow" calls.
+        start = time.perf_counter()
+        await ex.run("fast", "thread", _sleep, 0)
+        fast_elapsed = time.perf_counter() - start
+        await asyncio.gather(*tasks)
+        return during, fast_elapsed
+
+    try:
+        during, fast_elapsed = asyncio.run(main())
+        assert during["running"] == 1 and during["queued"] == 2
+        assert fast_elapsed < 0.1
+        after = ex.metrics()["tools"]["slow"]
+        assert after["completed"] == 3 and after["queued"] == 0 and after["running"] == 0
+        assert after["max_queued"] == 2
+        assert after["avg_wait_ms"] > 0
+    finally:
+        ex.shutdown()
+    print("thread limit PASSED")
+
+
+def test_matlab_runs_do_not_starve_thread_tools():
+    ex = ToolExecutor(thread_workers=2, matlab_workers=2)
+
+    async def main():
+        runs = [asyncio.create_task(ex.run("run_matlab", "matlab", _sleep, 0.3)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        await ex.run("analyze_data", "thread", _sleep, 0)
+        elapsed = time.perf_counter() - start
+        await asyncio.gather(*runs)
+        return elapsed
+
+    try:
+        assert asyncio.run(main()) < 0.2
+        metrics = ex.metrics()
+        assert metrics["matlab_workers"] == 2
+        assert metrics["tools"]["run_matlab"]["limit"] == 2
+        assert metrics["tools"]["run_matlab"]["max_queued"] == 2
+    finally:
+        ex.shutdown()
+    print("matlab pool isolation PASSED")
+
+
+def test_process_pool_and_failures():
+    ex = ToolExecutor(process_workers=1)
+
+    async def main():
+        pid = await ex.run("pid", "process", os.getpid)
+        try:
+            await ex.run("bad", "thread", int, "not a number")
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
+        return pid
+
+    try:
+        pid = asyncio.run(main())
+        assert pid != os.getpid()
+        tools = ex.metrics()["tools"]
+        assert tools["pid"]["completed"] == 1
+        assert tools["bad"]["failed"] == 1
+    finally:
+        ex.shutdown()
+    print("process pool PASSED")
+
+
+if __name__ == "__main__":
+    test_parse_limits()
+    test_thread_limit_queues_calls()
+    test_matlab_runs_do_not_starve_thread_tools()
+    test_process_pool_and_failures()
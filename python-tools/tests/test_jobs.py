@@ -0,0 +1,157 @@
+"""Tests for the background job subsystem."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ["MATLAB_MOCK"] = "true"
+
+from tools.jobs import JobContext, JobManager, JobStore
+
+
+def _wait(manager: JobManager, job_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.status(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_submit_and_result():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = JobManager(JobStore(Path(tmpdir) / "jobs.sqlite3"))
+        try:
+            job = manager.submit("run_matlab", {"script": "disp(1)", "work_dir": tmpdir, "warm": False})
+            assert job["status"] in ("queued", "running")
+            job = _wait(manager, job["id"])
+            assert job["status"] == "succeeded"
+            assert "[MOCK]" in job["progress"]
+            result = manager.result(job["id"])["result"]
+            assert any(f.endswith("results.mat") for f in result["files"])
+        finally:
+            manager.shutdown()
+    print("submit and result PASSED")
+
+
+def test_failure_and_unknown_tool():
+    def boom(params, ctx):
+        raise ValueError("bad input")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = JobManager(JobStore(Path(tmpdir) / "jobs.sqlite3"), runners={"boom": boom})
+        try:
+            job = _wait(manager, manager.submit("boom", {})["id"])
+            assert job["status"] == "failed"
+            assert job["error"] == "ValueError: bad input"
+            try:
+                manager.submit("nope", {})
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("expected ValueError")
+        finally:
+            manager.shutdown()
+    print("failure PASSED")
+
+
+def test_cancel_running_and_queued():
+    def slow(params, ctx):
+        ctx.progress("started")
+        ctx.cancel.wait(5)
+        return {"cancelled": ctx.cancel.is_set()}
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = JobManager(JobStore(Path(tmpdir) / "jobs.sqlite3"), runners={"slow": slow}, workers=1)
+        try:
+            running = manager.submit("slow", {})["id"]
+            queued = manager.submit("slow", {})["id"]
+            while manager.status(running)["status"] != "running":
+                time.sleep(0.01)
+            assert manager.cancel(queued)["status"] == "cancelled"
+            manager.cancel(running)
+            job = _wait(manager, running)
+            assert job["status"] == "cancelled"
+            assert job["progress"] == "started"
+            assert manager.status(queued)["started"] is None
+        finally:
+            manager.shutdown()
+    print("cancel PASSED")
+
+
+def test_cancel_after_worker_pickup():
+    calls = []
+
+    def noop(params, ctx):
+        calls.append(params)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        manager = JobManager(JobStore(Path(tmpdir) / "jobs.sqlite3"), runners={"noop": noop}, workers=1)
+        try:
+            # A worker that picks the job up after cancel() records the
+            # cancellation itself instead of running it.
+            job_id = manager.store.create("noop", {})
+            ctx = JobContext(manager.store, job_id)
+            ctx.cancel.set()
+            manager._execute(noop, {}, ctx)
+            job = manager.status(job_id)
+            assert job["status"] == "cancelled" and job["started"] is None
+            assert calls == []
+        finally:
+            manager.shutdown()
+    print("cancel after pickup PASSED")
+
+
+def test_restart_marks_interrupted():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Path(tmpdir) / "jobs.sqlite3"
+        store = JobStore(db)
+        job_id = store.create("run_matlab", {"script": "x"})
+        store.update(job_id, status="running", started=time.time())
+        store.close()
+
+        manager = JobManager(JobStore(db))
+        try:
+            assert manager.interrupted == 1
+            assert manager.status(job_id)["status"] == "interrupted"
+        finally:
+            manager.shutdown()
+    print("restart PASSED")
+
+
+def test_restart_keeps_jobs_of_live_servers():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = Path(tmpdir) / "jobs.sqlite3"
+        store = JobStore(db)
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        owners = {"live": f"{os.getppid()}:other", "dead": f"{exited.pid}:other", "legacy": None}
+        jobs = {}
+        for name, owner in owners.items():
+            jobs[name] = store.create("run_matlab", {})
+            store.update(jobs[name], status="running", owner=owner)
+        store.close()
+
+        # A second server on the same table only sweeps jobs whose owner is gone.
+        manager = JobManager(JobStore(db))
+        try:
+            assert manager.interrupted == 2
+            assert manager.status(jobs["live"])["status"] == "running"
+            assert manager.status(jobs["dead"])["status"] == "interrupted"
+            assert manager.status(jobs["legacy"])["status"] == "interrupted"
+        finally:
+            manager.shutdown()
+    print("restart keeps live jobs PASSED")
+
+
+if __name__ == "__main__":
+    test_submit_and_result()
+    test_failure_and_unknown_tool()
+    test_cancel_running_and_queued()
+    test_cancel_after_worker_pickup()
+    test_restart_marks_interrupted()
+    test_restart_keeps_jobs_of_live_servers()
@@ -0,0 +1,198 @@
+"""Tests for batched kinematics and vectorized collision checks.
+
+The reference functions are the per-configuration implementations from
+the robot-arm planner scripts in data/working.
+"""
+
+import numpy as np
+
+from tools.planning.collision import (
+    CapsuleModel,
+    as_spheres,
+    edges_hit,
+    segment_sphere_distance,
+    segments_hit,
+    tapered_segment_distance,
+)
+from tools.planning.kinematics import dh_joint_positions, dh_transforms, planar_joint_positions
+
+DH = np.array([
+    [0, np.pi / 2, 0.5, 0],
+    [0.5, 0, 0, 0],
+    [0.1, np.pi / 2, 0, 0],
+    [0, -np.pi / 2, 0.4, 0],
+    [0, np.pi / 2, 0, 0],
+    [0, 0, 0.1, 0],
+])
+SPHERES = np.array([[0.8, 0.5, 0.4, 0.20], [-0.5, 0.5, 0.6, 0.20]])
+CIRCLES = [(1.0, 1.0, 0.4), (-0.5, 1.5, 0.3), (0.5, -0.5, 0.3)]
+
+
+def _ref_fk_chain(q, L):
+    T_all, T_curr = [], np.eye(4)
+    for i in range(6):
+        a, alpha, d, theta_off = L[i]
+        theta = q[i] + theta_off
+        ct, st = np.cos(theta), np.sin(theta)
+        ca, sa = np.cos(alpha), np.sin(alpha)
+        Ti = np.array([
+            [ct, -st * ca, st * sa, a * ct],
+            [st, ct * ca, -ct * sa, a * st],
+            [0, sa, ca, d],
+            [0, 0, 0, 1],
+        ])
+        T_curr = T_curr @ Ti
+        T_all.append(T_curr)
+    return T_all
+
+
+def _ref_6dof_collision(q1, q2, L, obstacles, steps=3):
+    for s in range(steps + 1):
+        alpha = s / steps
+        q = q1 * (1 - alpha) + q2 * alpha
+        for ox, oy, oz, r in obstacles:
+            for T in _ref_fk_chain(q, L):
+                if np.linalg.norm(T[:3, 3] - np.array([ox, oy, oz])) < r + 0.05:
+                    return True
+    return False
+
+
+def _ref_line_collision(p1, p2, obstacles):
+    p1, p2 = np.array(p1), np.array(p2)
+    v = p2 - p1
+    for ox, oy, r in obstacles:
+        center = np.array([ox, oy])
+        w = center - p1
+        c1, c2 = np.dot(w, v), np.dot(v, v)
+        if c2 == 0 or c1 <= 0:
+            dist = np.linalg.norm(center - p1)
+        elif c2 <= c1:
+            dist = np.linalg.norm(center - p2)
+        else:
+            dist = np.linalg.norm(center - (p1 + c1 / c2 * v))
+        if dist <= r:
+            return True
+    return False
+
+
+def _ref_2link_collision(q_start, q_end, obstacles, steps=5):
+    for s in range(steps + 1):
+        alpha = s / steps
+        q = q_start * (1 - alpha) + q_end * alpha
+        x_elbow, y_elbow = np.cos(q[0]), np.sin(q[0])
+        xe, ye = x_elbow + np.cos(q[0] + q[1]), y_elbow + np.sin(q[0] + q[1])
+        if _ref_line_collision([0, 0], [x_elbow, y_elbow], obstacles):
+            return True
+        if _ref_line_collision([x_elbow, y_elbow], [xe, ye], obstacles):
+            return True
+    return False
+
+
+def test_dh_transforms_match_reference():
+    rng = np.random.default_rng(0)
+    qs = rng.uniform(-np.pi, np.pi, (50, 6))
+    T = dh_transforms(qs, DH)
+    assert T.shape == (50, 6, 4, 4)
+    for q, Tb in zip(qs, T):
+        np.testing.assert_allclose(Tb, np.array(_ref_fk_chain(q, DH)), atol=1e-12)
+    joints = dh_joint_positions(qs, DH)
+    assert joints.shape == (50, 7, 3)
+    np.testing.assert_array_equal(joints[:, 0], 0)
+    print("dh_transforms PASSED")
+
+
+def test_6dof_edges_match_reference():
+    rng = np.random.default_rng(1)
+    q_from = rng.uniform(-np.pi, np.pi, (400, 6))
+    q_to = q_from + rng.normal(0, 0.3, (400, 6))
+    hits = edges_hit(
+        q_from, q_to, lambda q: dh_joint_positions(q, DH), SPHERES,
+        steps=3, margin=0.05, links=False,
+    )
+    expected = [_ref_6dof_collision(a, b, DH, SPHERES) for a, b in zip(q_from, q_to)]
+    np.testing.assert_array_equal(hits, expected)
+    assert 0 < hits.sum() < len(hits)
+    print("6-DOF edge check PASSED")
+
+
+def test_2link_edges_match_reference():
+    rng = np.random.default_rng(2)
+    q_from = rng.uniform(-np.pi, np.pi, (500, 2))
+    q_to = q_from + rng.normal(0, 0.15, (500, 2))
+    hits = edges_hit(
+        q_from, q_to, lambda q: planar_joint_positions(q, [1.0, 1.0]), as_spheres(CIRCLES), steps=5,
+    )
+    expected = [_ref_2link_collision(a, b, CIRCLES) for a, b in zip(q_from, q_to)]
+    np.testing.assert_array_equal(hits, expected)
+    assert 0 < hits.sum() < len(hits)
+    print("2-link edge check PASSED")
+
+
+def test_capsule_model_never_misses():
+    arm = CapsuleModel.planar([1.0, 1.0], max_joint_step=0.1)
+    spheres = as_spheres(CIRCLES)
+    rng = np.random.default_rng(3)
+    q_from = rng.uniform(-np.pi, np.pi, (300, 2))
+    q_to = q_from + rng.normal(0, 0.6, (300, 2))
+    hits = arm.edges_hit(q_from, q_to, spheres)
+    dense = edges_hit(q_from, q_to, lambda q: planar_joint_positions(q, [1.0, 1.0]), spheres, steps=400)
+    assert not np.any(dense & ~hits)
+    # Single configurations agree with the plain segment test.
+    joints = planar_joint_positions(q_from, [1.0, 1.0])
+    np.testing.assert_array_equal(arm.config_hits(q_from, spheres), segments_hit(joints, spheres))
+    print("capsule model never misses PASSED")
+
+
+def test_capsule_model_adaptive_steps():
+    thin = as_spheres([(1.5 * np.cos(0.3), 1.5 * np.sin(0.3), 0.05)])
+    q_from, q_to = np.array([0.0, 0.0]), np.array([np.pi, 0.0])
+    # Five fixed steps jump straight over a thin obstacle.
+    assert not edges_hit(q_from, q_to, lambda q: planar_joint_positions(q, [1.0, 1.0]), thin, steps=5)[0]
+    arm = CapsuleModel.planar([1.0, 1.0], max_joint_step=0.05)
+    assert arm.edges_hit(q_from, q_to, thin)[0]
+    # The edge is split into 63 intervals, but checking stops early.
+    assert arm.checks < 64
+
+    arm.checks = 0
+    assert not arm.edges_hit(q_from, q_from + 0.01, thin)[0]
+    assert arm.checks == 2
+    print("capsule model adaptive steps PASSED")
+
+
+def test_capsule_radius():
+    arm = CapsuleModel.dh(DH, radius=0.05)
+    q = np.zeros((1, 6))
+    near = np.array([[*dh_joint_positions(q, DH)[0, -1], 0.0]])
+    assert arm.config_hits(q, near + [[0.04, 0, 0, 0]])[0]
+    assert not arm.config_hits(q, near + [[0.06, 0, 0, 0]])[0]
+    print("capsule radius PASSED")
+
+
+
+def test_tapered_segment_distance():
+    rng = np.random.default_rng(5)
+    p0 = rng.normal(size=(200, 3))
+    p1 = p0 + rng.normal(size=(200, 3))
+    p1[0] = p0[0]  # degenerate segment
+    spheres = np.c_[rng.normal(size=(4, 3)), np.full(4, 0.1)]
+    m0, m1 = rng.uniform(0, 0.8, 200), rng.uniform(0, 0.8, 200)
+    d = tapered_segment_distance(p0, p1, spheres, m0, m1)
+    t = np.linspace(0, 1, 5001)[:, None, None]
+    pts = p0 + t * (p1 - p0)
+    brute = np.linalg.norm(pts[..., None, :] - spheres[:, :-1], axis=-1) - (m0 + t[..., 0] * (m1 - m0))[..., None]
+    np.testing.assert_allclose(d, brute.min(axis=0), atol=1e-6)
+    # Uniform radius: the plain capsule distance.
+    np.testing.assert_allclose(
+        tapered_segment_distance(p0, p1, spheres, m0, m0), segment_sphere_distance(p0, p1, spheres) - m0[:, None]
+    )
+    print("tapered segment distance PASSED")
+
+
+if __name__ == "__main__":
+    test_dh_transforms_match_reference()
+    test_6dof_edges_match_reference()
+    test_2link_edges_match_reference()
+    test_capsule_model_never_misses()
+    test_capsule_model_adaptive_steps()
+    test_capsule_radius()
+    test_tapered_segment_distance()
@@ -6,6 +6,7 @@ from pathlib import Path
 
 os.environ["MATLAB_MOCK"] = "true"
 
+import tools.matlab as matlab_tools
 from tools.matlab import (
     matlab_generate_script,
     matlab_run,
@@ -39,6 +40,51 @@ def test_run():
     print("matlab_run PASSED")
 
 
+def test_run_cache():
+    script = matlab_generate_script("analysis", {"input_mat": "data.mat"})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["MATLAB_CACHE_DIR"] = str(Path(tmpdir) / "cache")
+        matlab_tools._cache = None
+        try:
+            runs = [Path(tmpdir) / f"run{i}" for i in range(3)]
+            for wd in runs:
+                wd.mkdir()
+                (wd / "data.mat").write_bytes(b"input-a")
+            (runs[2] / "data.mat").write_bytes(b"input-b")
+
+            first = matlab_run(script, work_dir=str(runs[0]), cache=True)
+            assert first["cached"] is False
+
+            lines = []
+            second = matlab_run(script, work_dir=str(runs[1]), cache=True, on_output=lines.append)
+            assert second["cached"] is True
+            assert second["output"] == first["output"] and lines
+            assert (runs[1] / "results.mat").read_bytes() == (runs[0] / "results.mat").read_bytes()
+            assert sorted(Path(f).name for f in second["files"]) == ["data.mat", "figure.png", "results.mat"]
+
+            # A changed input file is a different key.
+            assert matlab_run(script, work_dir=str(runs[2]), cache=True)["cached"] is False
+            stats = matlab_tools.matlab_cache_stats()
+            assert stats["entries"] == 2 and stats["hits"] == 1 and stats["misses"] == 2
+
+            # Rerunning in the same work_dir hits, even when the previous
+            # run's outputs have changed since.
+            (runs[0] / "results.mat").write_bytes(b"other output")
+            for _ in range(2):
+                assert matlab_run(script, work_dir=str(runs[0]), cache=True)["cached"] is True
+            assert (runs[0] / "results.mat").read_bytes() == (runs[1] / "results.mat").read_bytes()
+            assert matlab_tools.matlab_cache_stats()["entries"] == 2
+
+            # Entries are evicted once the cache is over its size budget.
+            matlab_tools._cache.max_bytes = 1
+            matlab_tools._cache.evict()
+            assert matlab_tools.matlab_cache_stats()["entries"] == 0
+        finally:
+            del os.environ["MATLAB_CACHE_DIR"]
+            matlab_tools._cache = None
+    print("matlab_run cache PASSED")
+
+
 def test_check_convergence():
     result = matlab_check_convergence("dummy.mat", threshold=0.01)
     assert result["converged"] is True
@@ -87,6 +133,7 @@ def test_manuscript_generate():
 if __name__ == "__main__":
     test_generate_script()
     test_run()
+    test_run_cache()
     test_check_convergence()
     test_get_figures()
     test_mat_to_excel()
@@ -0,0 +1,83 @@
+"""Tests for event-driven MATLAB GUI completion."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from tools.filewatch import DirectoryWatcher
+from tools.matlab import _await_gui_result
+
+
+def _sleeper(seconds: float) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-c", f"import time; time.sleep({seconds})"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+
+
+def test_watcher_wakes_on_write():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with DirectoryWatcher(tmpdir) as watcher:
+            threading.Timer(0.1, lambda: (Path(tmpdir) / "a.txt").write_text("x")).start()
+            start = time.monotonic()
+            assert watcher.wait(5.0)
+            assert time.monotonic() - start < 2.0
+    print(f"watcher wake PASSED ({watcher.backend})")
+
+
+def test_result_returned_before_exit():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wd = Path(tmpdir)
+        result_file = wd / "experiment_result.json"
+        proc = _sleeper(30)
+        try:
+            written = {}
+
+            def _write():
+                result_file.write_text(json.dumps({"cost": 1.5}))
+                written["at"] = time.monotonic()
+            threading.Timer(0.2, _write).start()
+
+            result = _await_gui_result(proc, wd, result_file, timeout=10)
+            latency = time.monotonic() - written["at"]
+            assert result["experiment_result"] == {"cost": 1.5}
+            assert latency < 0.5
+        finally:
+            proc.kill()
+            proc.wait()
+    print("GUI result latency PASSED")
+
+
+def test_exit_timeout_and_cancel():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wd = Path(tmpdir)
+        result_file = wd / "experiment_result.json"
+
+        result = _await_gui_result(_sleeper(0.1), wd, result_file, timeout=10)
+        assert result["returncode"] == 0
+        assert "without result JSON" in result["output"]
+
+        proc = _sleeper(30)
+        result = _await_gui_result(proc, wd, result_file, timeout=0.3)
+        assert result["timed_out"] is True
+        assert proc.poll() is not None
+
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        proc = _sleeper(30)
+        start = time.monotonic()
+        result = _await_gui_result(proc, wd, result_file, timeout=None, cancel=cancel)
+        assert result["cancelled"] is True
+        assert time.monotonic() - start < 5
+        assert proc.poll() is not None
+    print("GUI exit/timeout/cancel PASSED")
+
+
+if __name__ == "__main__":
+    test_watcher_wakes_on_write()
+    test_result_returned_before_exit()
+    test_exit_timeout_and_cancel()
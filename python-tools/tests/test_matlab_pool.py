@@ -0,0 +1,150 @@
+"""Tests for the warm MATLAB session pool (local stand-in executable)."""
+
+import os
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+os.environ["MATLAB_MOCK"] = "true"
+
+import tools.matlab as matlab_tools
+from tools.matlab_pool import MatlabPool
+
+# Minimal stand-in for `matlab -nodesktop`: executes `disp('...')` literals
+# outside catch blocks, and raises for scripts containing `error(`.
+_STUB = textwrap.dedent(r'''
+    import os, re, sys
+    cwd = os.getcwd()
+    for line in sys.stdin:
+        line = line.strip()
+        if line in ("exit", "quit"):
+            break
+        m = re.search(r"cd\('((?:[^']|'')*)'\)", line)
+        if m:
+            cwd = m.group(1).replace("''", "'")
+        body, _, rest = line.partition(", catch ")
+        handler, _, tail = rest.partition(" end;")
+        failed = False
+        if re.search(r"\bmcp_run$", body.split(", ", 1)[-1].strip()):
+            script = open(os.path.join(cwd, "mcp_run.m")).read()
+            if "error(" in script:
+                failed = True
+            else:
+                print(f"ran mcp_run pid={os.getpid()}")
+        for part in (body, handler if failed else "", tail):
+            for lit in re.findall(r"disp\('((?:[^']|'')*)'\)", part):
+                print(lit.replace("''", "'"))
+            if failed and part is handler:
+                print("Error using mcp_run")
+        sys.stdout.flush()
+''')
+
+
+def _stub_command(tmpdir: str) -> list[str]:
+    stub = Path(tmpdir) / "matlab_stub.py"
+    stub.write_text(_STUB)
+    return [sys.executable, "-u", str(stub)]
+
+
+def test_pool_reuses_warm_session():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pool = MatlabPool(_stub_command(tmpdir), size=1)
+        try:
+            wd = Path(tmpdir) / "work"
+            wd.mkdir()
+            (wd / "mcp_run.m").write_text("disp('hello');")
+
+            first = pool.run(wd)
+            second = pool.run(wd)
+            assert first["returncode"] == 0
+            assert "ran mcp_run" in first["output"]
+            assert first["session"]["pid"] == second["session"]["pid"]
+            assert second["session"]["runs"] == 2
+
+            stats = pool.stats()
+            assert stats["started"] == 1
+            assert stats["reused"] == 1
+            assert stats["idle"] == 1
+        finally:
+            pool.close()
+    print("pool reuse PASSED")
+
+
+def test_pool_reports_script_errors():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pool = MatlabPool(_stub_command(tmpdir), size=1)
+        try:
+            (Path(tmpdir) / "mcp_run.m").write_text("error('boom');")
+            result = pool.run(tmpdir)
+            assert result["returncode"] == 1
+            assert "Error using mcp_run" in result["errors"]
+            # The session survives a script error and is reused.
+            assert pool.stats()["idle"] == 1
+        finally:
+            pool.close()
+    print("pool errors PASSED")
+
+
+def test_pool_health_check_and_idle_eviction():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "mcp_run.m").write_text("x = 1;")
+        pool = MatlabPool(_stub_command(tmpdir), size=1, idle_timeout=0.2, health_interval=0)
+        try:
+            pid = pool.run(tmpdir)["session"]["pid"]
+
+            # A crashed session is replaced on the next call.
+            pool._idle[0].proc.kill()
+            pool._idle[0].proc.wait()
+            assert pool.run(tmpdir)["session"]["pid"] != pid
+
+            time.sleep(0.3)
+            assert pool.evict_idle() == 1
+            assert pool.stats()["idle"] == 0
+        finally:
+            pool.close()
+    print("pool health/eviction PASSED")
+
+
+def test_pool_reaps_idle_sessions():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "mcp_run.m").write_text("x = 1;")
+        pool = MatlabPool(_stub_command(tmpdir), size=1, idle_timeout=0.2, health_interval=0.05)
+        try:
+            pool.run(tmpdir)
+            session = pool._idle[0]
+            # Closed by the reaper without another acquire or evict_idle().
+            deadline = time.monotonic() + 5
+            while pool.stats()["idle"] and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert pool.stats()["idle"] == 0 and pool.stats()["evicted"] == 1
+            assert session.proc.wait(timeout=5) is not None
+        finally:
+            pool.close()
+    print("pool idle reaper PASSED")
+
+
+def test_matlab_run_uses_pool_command():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.environ["MATLAB_POOL_COMMAND"] = " ".join(_stub_command(tmpdir))
+        try:
+            wd = str(Path(tmpdir) / "run")
+            result = [matlab_tools.matlab_run("disp('x');", wd) for _ in range(2)]
+            assert all(r["returncode"] == 0 for r in result)
+            assert result[0]["session"]["pid"] == result[1]["session"]["pid"]
+            assert matlab_tools.matlab_pool_stats()["started"] == 1
+        finally:
+            del os.environ["MATLAB_POOL_COMMAND"]
+            if matlab_tools._pool is not None:
+                matlab_tools._pool.close()
+                matlab_tools._pool = None
+    print("matlab_run warm pool PASSED")
+
+
+if __name__ == "__main__":
+    test_pool_reuses_warm_session()
+    test_pool_reports_script_errors()
+    test_pool_health_check_and_idle_eviction()
+    test_pool_reaps_idle_sessions()
+    test_matlab_run_uses_pool_command()
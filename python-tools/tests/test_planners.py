@@ -0,0 +1,128 @@
+"""Tests for the robot models, obstacle sets, planners and benchmark harness."""
+
+from functools import partial
+
+import numpy as np
+import pytest
+
+from tools.planning.harness import SCENARIOS, Scenario, run
+from tools.planning.obstacles import Obstacles
+from tools.planning.planners import PLANNERS, rrt
+from tools.planning.problem import Budget, Problem
+from tools.planning.recording import EdgeLog
+from tools.planning.robots import DHArm, PlanarArm, PointRobot
+from tools.planning.runner import run_seeds
+
+MAP = Obstacles([(5.0, 5.0, 2.0)])
+ROBOT = PointRobot([0, 0], [10, 10])
+
+
+def test_obstacles():
+    obs = Obstacles([(0, 0, 1), (3, 0, 0.5)])
+    assert len(obs) == 2 and obs.dim == 2
+    np.testing.assert_array_equal(obs.contains([[0.5, 0], [2, 0], [3.5, 0]]), [True, False, True])
+    assert obs.inflated(0.6).contains([[2, 0]])[0]
+    assert obs.radii[0] == 1  # inflated() copies
+    with pytest.raises(ValueError):
+        obs.spheres[0, 0] = 1
+    with pytest.raises(ValueError):
+        Obstacles([])
+    assert Obstacles([], dim=3).dim == 3
+    print("obstacles PASSED")
+
+
+def test_point_robot():
+    robot = PointRobot([0, 0], [10, 10])
+    hits = robot.edges_hit([[1, 1], [1, 1], [1, 1]], [[2, 2], [9, 9], [1, 11]], MAP)
+    np.testing.assert_array_equal(hits, [False, True, True])
+    np.testing.assert_array_equal(robot.config_hits([[5, 6], [1, 1], [-1, 1]], MAP), [True, False, True])
+    assert robot.checks == 6
+    print("point robot PASSED")
+
+
+def test_arm_models():
+    arm = PlanarArm([1.0, 1.0])
+    obs = Obstacles([(1.0, 1.0, 0.4), (-0.5, 1.5, 0.3), (0.5, -0.5, 0.3)])
+    # The scripts' goal puts the elbow link inside the second obstacle.
+    assert arm.config_hits([np.pi / 2, np.pi / 4], obs)[0]
+    assert not arm.config_hits([np.pi / 2, -np.pi / 4], obs)[0]
+    np.testing.assert_allclose(arm.joint_positions([0, np.pi / 2])[0], [[0, 0], [1, 0], [1, 1]], atol=1e-12)
+    assert arm.checks == 2
+
+    six = SCENARIOS["6dof"]
+    puma = six.robot()
+    assert isinstance(puma, DHArm) and puma.dof == 6
+    np.testing.assert_array_equal(puma.high, [np.pi, np.pi / 2, np.pi, np.pi, np.pi, np.pi])
+    rng = np.random.default_rng(0)
+    samples = np.array([puma.sample(rng) for _ in range(200)])
+    assert np.all((samples >= puma.low) & (samples <= puma.high))
+    print("arm models PASSED")
+
+
+def test_rrt_stops_at_goal_and_logs_edges():
+    problem = Problem.for_robot(ROBOT, MAP, [1, 1], [9, 9], goal_tol=0.5)
+    log = EdgeLog(2)
+    res = rrt(problem, Budget(iterations=5000), np.random.default_rng(0), step_size=0.5, on_edge=log.add)
+    assert res.success and res.stop_reason == "goal"
+    assert res.first_solution_iteration == res.iterations
+    assert len(log) == len(res.tree) - 1
+    assert log.iterations.max() == res.iterations - 1
+    np.testing.assert_array_equal(res.path[0], [1, 1])
+    np.testing.assert_array_equal(res.path[-1], [9, 9])
+    # The path is collision-free and its cost is its length.
+    assert not ROBOT.edges_hit(res.path[:-1], res.path[1:], MAP).any()
+    assert res.cost == pytest.approx(np.linalg.norm(np.diff(res.path, axis=0), axis=1).sum())
+
+    res = rrt(problem, Budget(iterations=300), np.random.default_rng(0), step_size=0.5, stop_at_goal=False)
+    assert res.iterations == 300 and res.stop_reason == "iterations"
+    print("rrt stops at goal PASSED")
+
+
+def test_planners_share_interface():
+    problem = Problem.for_robot(ROBOT, MAP, [1, 1], [9, 9], goal_tol=0.5)
+    params = {"rrt": {}, "rrt_star": {"radius": 1.5}}
+    for name, planner in PLANNERS.items():
+        res = planner(problem, Budget(iterations=2000), np.random.default_rng(1), step_size=0.5, **params[name])
+        assert res.success, name
+        assert set(res.metrics()) >= {"success", "cost", "iterations", "time_to_first", "nodes"}
+    print("planners share interface PASSED")
+
+
+def test_harness_scenarios():
+    for name in SCENARIOS:
+        for planner in PLANNERS:
+            m = run(np.random.default_rng(2), name, planner, iterations=150)
+            assert m["planner"] == planner and m["iterations"] <= 150
+            assert m["checks"] > 0 and m["checks_per_s"] > 0 and m["iterations_per_s"] > 0
+    # Solvable within the default budget, reproducibly.
+    a, b = run(np.random.default_rng(3), "2dof"), run(np.random.default_rng(3), "2dof")
+    assert a["success"] and a["cost"] == b["cost"] and a["checks"] == b["checks"]
+
+    custom = Scenario(
+        robot=partial(PointRobot, [0, 0], [10, 10]),
+        obstacles=MAP,
+        start=np.array([1.0, 1.0]),
+        goal=np.array([9.0, 9.0]),
+        goal_tol=0.5,
+        planner="rrt",
+        params={"rrt": {"step_size": 0.5}},
+    )
+    assert run(np.random.default_rng(0), custom)["success"]
+    print("harness scenarios PASSED")
+
+
+def test_harness_as_runner_target():
+    df = run_seeds("tools.planning.harness:run", 3, params={"scenario": "map2d", "iterations": 400}, workers=1)
+    assert df["error"].isna().all()
+    assert {"checks", "iterations_per_s", "checks_per_s", "scenario"} <= set(df.columns)
+    print("harness as runner target PASSED")
+
+
+if __name__ == "__main__":
+    test_obstacles()
+    test_point_robot()
+    test_arm_models()
+    test_rrt_stops_at_goal_and_logs_edges()
+    test_planners_share_interface()
+    test_harness_scenarios()
+    test_harness_as_runner_target()
@@ -0,0 +1,153 @@
+"""Tests for structured queries, result caching and paginated output."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from tools import chunked
+from tools.analysis import pandas_analyze, pandas_query, query_cache_stats
+from tools.query import compile_query, render
+
+
+def _write_csv(path, n=3000):
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        "method": rng.choice(["rrt", "rrt_star", "prm"], n),
+        "trial": rng.integers(0, 10, n),
+        "error": rng.gamma(2.0, 0.5, n),
+        "label": rng.choice(["ok", "fail"], n),
+    }).to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+def test_compile_query_normalizes_and_validates():
+    a = compile_query(groupby="method", agg={"error": "mean", "trial": ["min", "max"]})
+    b = compile_query(groupby=["method"], agg={"trial": ["min", "max"], "error": "mean"})
+    assert a is b
+    assert compile_query(groupby="method", agg="mean").key != a.key
+
+    for bad in [
+        {"groupby": "method"},
+        {"agg": "cumsum"},
+        {"filter": "error.__class__"},
+        {"filter": "error > @limit"},
+        {"filter": "error >"},
+        {"head": -1},
+        {"select": []},
+    ]:
+        try:
+            compile_query(**bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} should be rejected")
+    print("compile_query normalizes and validates PASSED")
+
+
+def test_plan_matches_pandas():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "runs.csv"
+        df = _write_csv(path)
+
+        plan = compile_query(filter="trial > 2", groupby="method", agg={"error": ["mean", "std"]}, sort="-error_mean")
+        expected = df[df.trial > 2].groupby("method")["error"].agg(["mean", "std"])
+        expected.columns = ["error_mean", "error_std"]
+        expected = expected.sort_values("error_mean", ascending=False)
+        pd.testing.assert_frame_equal(plan.execute(df), expected)
+
+        plan = compile_query(filter="label == 'fail'", select=["method", "error"], sort=["-error"], head=5)
+        expected = df[df.label == "fail"][["method", "error"]].sort_values("error", ascending=False).head(5)
+        pd.testing.assert_frame_equal(plan.execute(df), expected)
+
+        # The out-of-core path gives the same answers.
+        for plan in [
+            compile_query(filter="trial > 2", groupby="method", agg={"error": ["mean", "std"]}, sort="-error_mean"),
+            compile_query(groupby=["method", "trial"], agg="count"),
+            compile_query(select=["error", "trial"], agg=["mean", "max"]),
+            compile_query(filter="label == 'fail'", select=["method", "error"], head=5),
+            compile_query(filter="label == 'fail'", select=["method", "error"], sort=["-error"], head=5),
+        ]:
+            result, notes = plan.run_chunked(path, chunksize=400)
+            if isinstance(result, chunked.Page):
+                result = result.rows
+            pd.testing.assert_frame_equal(result, plan.execute(df), check_dtype=False, check_index_type=False,
+                                          check_column_type=False)
+            assert notes[0].startswith("out-of-core")
+
+        # Row results are computed one page at a time, sorted ones included.
+        for plan in [compile_query(select=["error"]), compile_query(sort=["trial", "-error"])]:
+            page, _ = plan.run_chunked(path, chunksize=400, offset=1000, limit=30)
+            assert page.total == len(df) and page.offset == 1000
+            pd.testing.assert_frame_equal(page.rows, plan.execute(df).iloc[1000:1030])
+        try:
+            compile_query(groupby="method", agg="median").run_chunked(path)
+        except chunked.UnsupportedQuery:
+            pass
+        else:
+            raise AssertionError("median should not run out of core")
+    print("plan matches pandas PASSED")
+
+
+def test_pandas_query_caches_results():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "runs.csv"
+        _write_csv(path)
+        before = query_cache_stats()
+        first = pandas_query(str(path), groupby="method", agg="mean", select=["error"])
+        again = pandas_query(str(path), groupby=["method"], agg="mean", select="error")
+        after = query_cache_stats()
+        assert first == again and "rrt_star" in first
+        assert after["misses"] == before["misses"] + 1 and after["hits"] == before["hits"] + 1
+
+        # Rewriting the file invalidates the cached result.
+        _write_csv(path, n=100)
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        pandas_query(str(path), groupby="method", agg="mean", select=["error"])
+        assert query_cache_stats()["misses"] == after["misses"] + 1
+
+        # Out-of-core results keep their notes when served from the cache.
+        old = chunked.CHUNKED_MIN_BYTES
+        chunked.CHUNKED_MIN_BYTES = 0
+        try:
+            for _ in range(2):
+                text = pandas_query(str(path), groupby="method", agg="max", select=["trial"])
+                assert "[out-of-core: scanned 100 rows" in text
+            assert "[rows 10-14 of 100; pass offset=15" in pandas_query(str(path), sort="error", offset=10, limit=5)
+        finally:
+            chunked.CHUNKED_MIN_BYTES = old
+    print("pandas_query caches results PASSED")
+
+
+def test_output_is_paginated():
+    frame = pd.DataFrame({"x": np.arange(1000)})
+    text = render(frame, limit=10)
+    assert len(text.splitlines()) == 12 and "[rows 0-9 of 1000; pass offset=10 for more]" in text
+    text = render(frame, offset=995, limit=10)
+    assert "999" in text and "[rows 995-999 of 1000]" in text
+    assert len(render("y" * 1000, max_chars=100)) < 200
+    assert render(3.5) == "3.5"
+    for offset, limit in [(-1, 10), (0, 0)]:
+        try:
+            render(frame, offset=offset, limit=limit)
+        except ValueError:
+            continue
+        raise AssertionError(f"offset={offset}, limit={limit} should be rejected")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "runs.csv"
+        _write_csv(path)
+        text = pandas_analyze(str(path), "df", limit=20)
+        assert "of 3000; pass offset=20" in text and len(text.splitlines()) == 22
+        text = pandas_query(str(path), sort="error", offset=2990, limit=20)
+        assert "[rows 2990-2999 of 3000]" in text
+    print("output is paginated PASSED")
+
+
+if __name__ == "__main__":
+    test_compile_query_normalizes_and_validates()
+    test_plan_matches_pandas()
+    test_pandas_query_caches_results()
+    test_output_is_paginated()
@@ -0,0 +1,70 @@
+"""Tests for the parallel multi-seed planner runner."""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from tools.planning.runner import load_target, run_seeds, save_table, summarize
+
+TARGET = "tests.test_runner:toy_plan"
+
+
+def toy_plan(rng, max_iter=100, fail_on=None):
+    """Random search for a point near 0.9; stands in for a planner."""
+    samples = rng.random(max_iter)
+    if fail_on is not None and samples[0] < fail_on:
+        raise RuntimeError("unlucky seed")
+    hits = np.flatnonzero(samples > 0.9)
+    return {
+        "success": bool(len(hits)),
+        "cost": float(samples.min()),
+        "iterations_to_first": int(hits[0]) + 1 if len(hits) else None,
+        "path": samples,  # non-scalar: dropped from the table
+    }
+
+
+def test_reproducible_across_workers():
+    serial = run_seeds(TARGET, 8, seed=7, params={"max_iter": 50}, workers=1)
+    parallel = run_seeds(TARGET, 8, seed=7, params={"max_iter": 50}, workers=2)
+    assert list(serial.columns) == [
+        "run", "seed", "max_iter", "success", "cost", "iterations_to_first", "wall_time", "error",
+    ]
+    cols = ["run", "cost", "iterations_to_first"]
+    pd.testing.assert_frame_equal(serial[cols], parallel[cols])
+    # Independent streams: every run drew different samples.
+    assert serial["cost"].nunique() == 8
+    assert not serial.equals(run_seeds(TARGET, 8, seed=8, params={"max_iter": 50}, workers=1))
+    print("reproducible across workers PASSED")
+
+
+def test_errors_are_recorded():
+    df = run_seeds(TARGET, 20, params={"fail_on": 0.3}, workers=1)
+    failed = df["error"].notna()
+    assert 0 < failed.sum() < 20
+    assert df.loc[failed, "error"].str.contains("unlucky seed").all()
+    print("errors recorded PASSED")
+
+
+def test_script_target_and_tables():
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "planner.py")
+        with open(script, "w") as f:
+            f.write("def plan(rng, n=3):\n    return {'success': True, 'cost': float(rng.random(n).sum())}\n")
+        assert load_target(f"{script}:plan")(np.random.default_rng(0))["success"]
+
+        df = run_seeds(f"{script}:plan", 4, workers=1)
+        assert df["success"].all() and len(df) == 4
+        assert summarize(df)["successes"] == 4
+
+        for suffix, reader in ((".xlsx", pd.read_excel), (".parquet", pd.read_parquet), (".csv", pd.read_csv)):
+            path = save_table(df, os.path.join(tmp, "out", "runs" + suffix))
+            np.testing.assert_allclose(reader(path)["cost"], df["cost"])
+    print("script target and tables PASSED")
+
+
+if __name__ == "__main__":
+    test_reproducible_across_workers()
+    test_errors_are_recorded()
+    test_script_target_and_tables()
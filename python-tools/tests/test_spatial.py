@@ -0,0 +1,67 @@
+"""Tests for the incremental nearest-neighbour index."""
+
+import numpy as np
+
+from tools.planning.spatial import SpatialIndex
+
+
+def _brute(points, q):
+    return np.linalg.norm(points - q, axis=1)
+
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(0)
+    index = SpatialIndex(3, buffer_size=8)
+    points = rng.uniform(-1, 1, (500, 3))
+    for i, p in enumerate(points):
+        assert index.insert(p) == i
+        q = rng.uniform(-1, 1, 3)
+        d = _brute(points[: i + 1], q)
+        j, dist = index.nearest(q)
+        assert np.isclose(dist, d.min()) and np.isclose(d[j], d.min())
+        np.testing.assert_array_equal(index.within(q, 0.4), np.flatnonzero(d <= 0.4))
+    assert len(index) == 500
+    np.testing.assert_array_equal(index.points, points)
+    print("brute-force agreement PASSED")
+
+
+def test_periodic_dimensions():
+    rng = np.random.default_rng(1)
+    index = SpatialIndex(2, period=[2 * np.pi, None], low=[-np.pi, 0.0], buffer_size=4)
+    points = np.column_stack([rng.uniform(-np.pi, np.pi, 200), rng.uniform(0, 1, 200)])
+    index.extend(points)
+    for q in [np.array([np.pi - 0.01, 0.5]), np.array([-np.pi, 0.1]), np.array([0.0, 0.9])]:
+        d = np.linalg.norm(
+            np.column_stack([
+                np.mod(points[:, 0] - q[0] + np.pi, 2 * np.pi) - np.pi,
+                points[:, 1] - q[1],
+            ]),
+            axis=1,
+        )
+        j, dist = index.nearest(q)
+        assert np.isclose(dist, d.min()) and j == np.argmin(d)
+        np.testing.assert_array_equal(index.within(q, 0.5), np.flatnonzero(d <= 0.5))
+    # Points just either side of the seam are neighbours.
+    seam = SpatialIndex(1, period=[2 * np.pi], low=-np.pi)
+    seam.extend([[np.pi - 0.05], [0.0]])
+    assert seam.nearest([-np.pi + 0.05])[0] == 0
+    assert np.isclose(seam.nearest([-np.pi + 0.05])[1], 0.1)
+    print("periodic dimensions PASSED")
+
+
+def test_empty_index():
+    index = SpatialIndex(2)
+    assert len(index.within([0, 0], 1.0)) == 0
+    try:
+        index.nearest([0, 0])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    print("empty index PASSED")
+
+
+if __name__ == "__main__":
+    test_matches_brute_force()
+    test_periodic_dimensions()
+    test_empty_index()
@@ -0,0 +1,75 @@
+"""Tests for the array-backed planner tree."""
+
+import numpy as np
+
+from tools.planning.tree import NO_PARENT, ArrayTree
+
+
+def test_add_grow_and_path():
+    tree = ArrayTree(3, capacity=2)
+    root = tree.add([0, 0, 0])
+    prev = root
+    for i in range(1, 100):
+        prev = tree.add([i, 0, 0], parent=prev, cost=float(i))
+    assert len(tree) == 100
+    assert tree.parent[0] == NO_PARENT and tree.parent.dtype == np.int32
+    np.testing.assert_array_equal(tree.cost, np.arange(100.0))
+    np.testing.assert_array_equal(tree.path_indices(5), np.arange(6))
+    np.testing.assert_array_equal(tree.path(3)[:, 0], [0, 1, 2, 3])
+    assert tree.nearest([41.2, 0, 0])[0] == 41
+    np.testing.assert_array_equal(tree.within([10, 0, 0], 1.5), [9, 10, 11])
+    assert tree.nbytes == 100 * (3 * 8 + 4 + 8 + 3 * 4)
+    print("add/grow/path PASSED")
+
+
+def test_rewire_and_edges():
+    tree = ArrayTree(2)
+    tree.add([0, 0])
+    a = tree.add([1, 0], 0, 1.0)
+    b = tree.add([2, 0], a, 2.0)
+    c = tree.add([0, 1], 0, 1.0)
+    tree.set_parent(np.array([b]), c, 1.5)
+    np.testing.assert_array_equal(tree.path_indices(b), [0, c, b])
+    assert tree.cost[b] == 1.5
+    edges = tree.edges()
+    assert edges.shape == (3, 2, 2)
+    np.testing.assert_array_equal(edges[1], [[0, 1], [2, 0]])
+    np.testing.assert_allclose(tree.distances(np.array([a, b]), [0, 0]), [1, 2])
+    np.testing.assert_array_equal(tree.children(c), [b])
+    assert len(tree.children(a)) == 0
+    print("rewire/edges PASSED")
+
+
+def test_rewire_propagates_costs():
+    # A random tree with consistent costs (edge cost = Euclidean length).
+    rng = np.random.default_rng(0)
+    tree = ArrayTree(2, capacity=4)
+    tree.add([0, 0])
+    for _ in range(300):
+        q = rng.uniform(0, 10, 2)
+        p = tree.nearest(q)[0]
+        tree.add(q, p, tree.cost[p] + tree.distances(np.array([p]), q)[0])
+
+    def check():
+        child = np.flatnonzero(tree.parent != NO_PARENT)
+        edge = np.linalg.norm(tree.coords[child] - tree.coords[tree.parent[child]], axis=1)
+        np.testing.assert_allclose(tree.cost[child], tree.cost[tree.parent[child]] + edge)
+
+    for node in rng.choice(np.arange(1, 301), 40, replace=False):
+        sub = tree.subtree(node)
+        # Never attach a node below itself.
+        candidates = np.setdiff1d(np.arange(len(tree)), sub)
+        new_parent = int(rng.choice(candidates))
+        cost = tree.cost[new_parent] + tree.distances(np.array([new_parent]), tree.coords[node])[0]
+        changed = tree.rewire(node, new_parent, cost)
+        np.testing.assert_array_equal(np.sort(changed), np.sort(sub))
+        assert tree.parent[node] == new_parent and node in tree.children(new_parent)
+        check()
+    assert len(tree.subtree(0)) == len(tree)
+    print("rewire propagates costs PASSED")
+
+
+if __name__ == "__main__":
+    test_add_grow_and_path()
+    test_rewire_and_edges()
+    test_rewire_propagates_costs()
@@ -2,6 +2,9 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+from collections import OrderedDict
 from io import StringIO
 from pathlib import Path
 from typing import Any
@@ -11,95 +14,435 @@ matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from tools import chunked, columnar, decimate
+from tools.query import check_filter, compile_query, page_window, render
 
-def pandas_analyze(file_path: str, query: str) -> str:
+
+# ── DataFrame cache ──────────────────────────────────────────────────
+
+_CacheKey = tuple[Any, ...]
+
+
+class _FrameCache:
+    """LRU cache of parsed DataFrames bounded by total memory usage.
+
+    Entries are keyed by resolved path and validated against the file's
+    mtime and size, so edits to the file invalidate the cached frame.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[_CacheKey, tuple[tuple[int, int], Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: _CacheKey, fingerprint: tuple[int, int]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != fingerprint:
+                self.misses += 1
+                if entry is not None:
+                    self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: _CacheKey, fingerprint: tuple[int, int], value: Any, size: int | None = None) -> None:
+        """Store a DataFrame, or any other ``value`` with its ``size`` in bytes."""
+        if size is None:
+            size = int(value.memory_usage(deep=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (fingerprint, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def _drop(self, key: _CacheKey) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_frame_cache = _FrameCache(int(os.environ.get("ANALYSIS_CACHE_BYTES", str(512 * 1024 * 1024))))
+# (result, notes) of structured queries, keyed by (path, sheet, plan key)
+# plus the page for out-of-core row results.
+_result_cache = _FrameCache(int(os.environ.get("ANALYSIS_RESULT_CACHE_BYTES", str(64 * 1024 * 1024))))
+
+
+def dataframe_cache_stats() -> dict[str, int]:
+    """Return hit/miss/eviction counters and memory usage of the DataFrame cache."""
+    return _frame_cache.stats()
+
+
+def query_cache_stats() -> dict[str, int]:
+    """Return hit/miss/eviction counters and memory usage of the query result cache."""
+    return _result_cache.stats()
+
+
+def _read_file(p: Path, sheet: str | None = None) -> pd.DataFrame:
+    ext = p.suffix.lower()
+    if ext == ".csv":
+        return pd.read_csv(p)
+    elif ext in (".xlsx", ".xls"):
+        df = columnar.sheet_frame(p, sheet)
+        if df is not None:
+            return df
+        return pd.read_excel(p, sheet_name=sheet if sheet is not None else 0)
+    elif ext == ".json":
+        return pd.read_json(p)
+    raise ValueError(f"Unsupported file type: {ext}")
+
+
+def load_dataframe(file_path: str, sheet: str | None = None) -> pd.DataFrame:
+    """Load a data file as a DataFrame, reusing a cached parse when possible.
+
+    Args:
+        file_path: Path to a .csv, .xlsx/.xls or .json file.
+        sheet: Optional sheet name for Excel files. Defaults to the first sheet.
+
+    Returns:
+        The DataFrame, as a shallow copy of the cached frame (with pandas
+        copy-on-write, changes made by the caller do not reach the cache).
+    """
+    p = Path(file_path)
+    st = p.stat()
+    key = (str(p.resolve()), sheet)
+    fingerprint = (st.st_mtime_ns, st.st_size)
+
+    df = _frame_cache.get(key, fingerprint)
+    if df is None:
+        df = _read_file(p, sheet)
+        _frame_cache.put(key, fingerprint, df)
+    return df.copy(deep=False)
+
+
+# ── Analysis ─────────────────────────────────────────────────────────
+
+def pandas_analyze(
+    file_path: str,
+    query: str,
+    chunked_mode: bool | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> str:
     """Run a pandas query/expression on a data file and return the result.
 
-    Supported file types: .csv, .xlsx, .json
+    Supported file types: .csv, .xlsx, .json. Parsed files are kept in an
+    in-process cache, so repeated queries on an unchanged file skip parsing.
+
+    CSV files of at least ``chunked.CHUNKED_MIN_BYTES`` (env
+    ``ANALYSIS_CHUNKED_BYTES``) are never loaded whole: the query is
+    evaluated chunk by chunk instead (see `tools.chunked` for the supported
+    query shapes), and a query that cannot be is rejected.
 
     Args:
         file_path: Path to the data file.
         query: A pandas expression to evaluate. The DataFrame is available as `df`.
                Examples: "df.describe()", "df.groupby('col').mean()", "df.shape"
+        chunked_mode: Force (True) or disable (False) out-of-core evaluation;
+            by default it follows the file size.
+        offset: First result row to show.
+        limit: Number of result rows to show (default ``tools.query.MAX_ROWS``).
+
+    Returns:
+        String representation of one page of the query result (see
+        `tools.query.render`).
+    """
+    offset, limit = page_window(offset, limit)
+    if chunked_mode is None:
+        chunked_mode = chunked.should_chunk(file_path)
+    notes: list[str] = []
+    if chunked_mode:
+        if Path(file_path).suffix.lower() != ".csv":
+            raise ValueError(f"Chunked evaluation needs a .csv file, got {file_path}")
+        try:
+            plan = chunked.plan_query(query)
+        except chunked.UnsupportedQuery as e:
+            size_mb = Path(file_path).stat().st_size / 2**20
+            raise chunked.UnsupportedQuery(
+                f"{file_path} ({size_mb:.0f} MB) is too large to load whole, and {e}"
+            ) from e
+        result, notes = plan.run(file_path, offset=offset, limit=limit)
+    else:
+        df = load_dataframe(file_path)
+        result = eval(query, {"__builtins__": {}}, {"df": df, "pd": pd})
+    return "\n".join([render(result, offset, limit), *(f"[{note}]" for note in notes)])
+
+
+def pandas_query(
+    file_path: str,
+    sheet: str | None = None,
+    filter: str | None = None,
+    select: str | list[str] | None = None,
+    groupby: str | list[str] | None = None,
+    agg: str | list[str] | dict[str, str | list[str]] | None = None,
+    sort: str | list[str] | None = None,
+    head: int | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> str:
+    """Run a structured query (see `tools.query.compile_query`) on a data file.
+
+    Results are memoized per (file, sheet, normalized query) and
+    invalidated when the file changes, so paging through a result or
+    repeating a query does not recompute it. Large CSV files are streamed
+    as in `pandas_analyze`.
+
+    Args:
+        file_path: Path to a .csv, .xlsx/.xls or .json file.
+        sheet: Optional sheet name for Excel files.
+        filter, select, groupby, agg, sort, head: The query.
+        offset: First result row to show.
+        limit: Number of result rows to show (default ``tools.query.MAX_ROWS``).
 
     Returns:
-        String representation of the query result.
+        One page of the result as text.
     """
+    plan = compile_query(filter, select, groupby, agg, sort, head)
+    offset, limit = page_window(offset, limit)
     p = Path(file_path)
-    ext = p.suffix.lower()
+    st = p.stat()
+    chunk = chunked.should_chunk(p)
+    # Out of core, row results are computed one page at a time.
+    window = (offset, limit) if chunk and plan.agg is None else ()
+    key = (str(p.resolve()), sheet, plan.key, *window)
+    fingerprint = (st.st_mtime_ns, st.st_size)
 
-    if ext == ".csv":
-        df = pd.read_csv(p)
-    elif ext in (".xlsx", ".xls"):
-        df = pd.read_excel(p)
-    elif ext == ".json":
-        df = pd.read_json(p)
-    else:
-        raise ValueError(f"Unsupported file type: {ext}")
+    entry = _result_cache.get(key, fingerprint)
+    if entry is None:
+        if chunk:
+            result, notes = plan.run_chunked(p, offset=offset, limit=limit)
+        else:
+            result, notes = plan.execute(load_dataframe(file_path, sheet)), []
+        frame = result.rows if isinstance(result, chunked.Page) else result
+        entry = (result, notes)
+        _result_cache.put(key, fingerprint, entry, int(frame.memory_usage(deep=True).sum()))
+    result, notes = entry
+    return "\n".join([render(result, offset, limit), *(f"[{note}]" for note in notes)])
+
+
+# ── Plotting ─────────────────────────────────────────────────────────
+
+CHART_TYPES = ("bar", "line", "scatter", "hist", "pie")
+
+_SPEC_KEYS = {"file_path", "sheet", "columns", "filter", "chart_type", "output_path", "title", "x_col", "y_col"}
+
+
+def select_dataframe(
+    file_path: str,
+    sheet: str | None = None,
+    columns: list[str] | None = None,
+    filter: str | None = None,
+) -> pd.DataFrame:
+    """Load a data file with `load_dataframe`, then filter rows and pick columns.
+
+    Args:
+        file_path: Path to a .csv, .xlsx/.xls or .json file.
+        sheet: Optional sheet name for Excel files.
+        columns: Columns to keep (default: all).
+        filter: Optional `DataFrame.query` expression selecting rows, e.g.
+            ``"speed > 0.5 and trial == 3"``; it may use any column, not
+            just the kept ones. Checked like `pandas_query` filters: no
+            ``@`` or dunder references.
 
-    result = eval(query, {"__builtins__": {}}, {"df": df, "pd": pd})
+    Raises:
+        ValueError: If the filter is invalid or a column is unknown.
+    """
+    filter = check_filter(filter) if filter else None
+    df = load_dataframe(file_path, sheet)
+    if filter:
+        df = df.query(filter)
+    if columns:
+        missing = [c for c in columns if c not in df.columns]
+        if missing:
+            raise ValueError(f"Unknown columns {missing}; available: {list(df.columns)}")
+        df = df[list(columns)]
+    return df
 
-    if isinstance(result, pd.DataFrame):
-        return result.to_string()
-    elif isinstance(result, pd.Series):
-        return result.to_string()
-    return str(result)
+
+def _render_plot(
+    df: pd.DataFrame,
+    chart_type: str,
+    output_path: str,
+    title: str = "",
+    x_col: str | None = None,
+    y_col: str | None = None,
+) -> str:
+    """Draw ``df`` as a chart and save it as a PNG; see `plot_create`."""
+    if chart_type not in CHART_TYPES:
+        raise ValueError(f"Unsupported chart_type: {chart_type}")
+    if chart_type == "scatter" and (not x_col or not y_col):
+        raise ValueError("scatter requires both x_col and y_col")
+    out = Path(output_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    dpi = 150
+    fig, ax = plt.subplots(figsize=(10, 6))
+    try:
+        plot_kwargs: dict[str, Any] = {"ax": ax}
+        if x_col:
+            plot_kwargs["x"] = x_col
+        if y_col:
+            plot_kwargs["y"] = y_col
+
+        if chart_type == "bar":
+            df.plot.bar(**plot_kwargs)
+        elif chart_type == "line":
+            # Large series: keep only the points that change the picture.
+            y_cols = [y_col] if y_col else [c for c in df.select_dtypes("number").columns if c != x_col]
+            width_px = int(fig.get_figwidth() * dpi)
+            df.pipe(decimate.decimate_line, x_col, y_cols, width_px).plot.line(**plot_kwargs)
+        elif chart_type == "scatter":
+            if len(df) > decimate.SCATTER_POINTS_THRESHOLD:
+                # Too many markers to tell apart: draw the density instead.
+                hb = ax.hexbin(df[x_col], df[y_col], gridsize=200, bins="log", mincnt=1, cmap="viridis")
+                fig.colorbar(hb, ax=ax, label="count")
+                ax.set_xlabel(x_col)
+                ax.set_ylabel(y_col)
+            else:
+                df.plot.scatter(**plot_kwargs)
+        elif chart_type == "hist":
+            df.plot.hist(**plot_kwargs)
+        elif chart_type == "pie":
+            col = y_col or df.columns[0]
+            df[col].plot.pie(ax=ax, autopct="%1.1f%%")
+
+        if title:
+            ax.set_title(title)
+
+        fig.tight_layout()
+        fig.savefig(out, dpi=dpi)
+    finally:
+        plt.close(fig)
+
+    return str(out)
 
 
 def plot_create(
-    data: list[dict[str, Any]],
+    data: list[dict[str, Any]] | None,
     chart_type: str,
     output_path: str,
     title: str = "",
     x_col: str | None = None,
     y_col: str | None = None,
+    file_path: str | None = None,
+    sheet: str | None = None,
+    columns: list[str] | None = None,
+    filter: str | None = None,
 ) -> str:
     """Create a chart and save it as a PNG image.
 
+    The rows come either inline (``data``) or from a data file read here
+    (``file_path``, see `select_dataframe`), which avoids passing large
+    tables through the caller.
+
+    Line charts above ``decimate.LINE_POINTS_THRESHOLD`` rows are reduced
+    to the points visible at the output resolution (M4), and scatter
+    charts above ``decimate.SCATTER_POINTS_THRESHOLD`` rows are drawn as a
+    hexbin density.
+
     Args:
-        data: List of row dicts to plot.
+        data: List of row dicts to plot, or None with ``file_path``.
         chart_type: One of "bar", "line", "scatter", "hist", "pie".
         output_path: Destination PNG path.
         title: Optional chart title.
         x_col: Column name for x-axis.
         y_col: Column name for y-axis.
+        file_path: Data file (.csv, .xlsx, .json) to plot instead of ``data``.
+        sheet: Optional sheet name for Excel files.
+        columns: Optional columns to load from the file.
+        filter: Optional `DataFrame.query` expression selecting rows.
 
     Returns:
         The path of the saved PNG.
     """
-    df = pd.DataFrame(data)
-    out = Path(output_path)
-    out.parent.mkdir(parents=True, exist_ok=True)
+    if (data is None) == (file_path is None):
+        raise ValueError("pass exactly one of data or file_path")
+    if data is not None:
+        df = pd.DataFrame(data)
+    else:
+        df = select_dataframe(file_path, sheet, columns, filter)
+    return _render_plot(df, chart_type, output_path, title, x_col, y_col)
 
-    fig, ax = plt.subplots(figsize=(10, 6))
 
-    plot_kwargs: dict[str, Any] = {"ax": ax}
-    if x_col:
-        plot_kwargs["x"] = x_col
-    if y_col:
-        plot_kwargs["y"] = y_col
-
-    if chart_type == "bar":
-        df.plot.bar(**plot_kwargs)
-    elif chart_type == "line":
-        df.plot.line(**plot_kwargs)
-    elif chart_type == "scatter":
-        if not x_col or not y_col:
-            raise ValueError("scatter requires both x_col and y_col")
-        df.plot.scatter(**plot_kwargs)
-    elif chart_type == "hist":
-        df.plot.hist(**plot_kwargs)
-    elif chart_type == "pie":
-        col = y_col or df.columns[0]
-        df[col].plot.pie(ax=ax, autopct="%1.1f%%")
-    else:
-        raise ValueError(f"Unsupported chart_type: {chart_type}")
+def expand_plot_specs(
+    charts: list[dict[str, Any]],
+    file_path: str | None = None,
+    sheet: str | None = None,
+) -> list[dict[str, Any]]:
+    """Validate the chart specs of a batch and fill in the shared data file.
 
-    if title:
-        ax.set_title(title)
+    Args:
+        charts: One dict per chart with the `plot_create` arguments
+            (``chart_type``, ``output_path``, ``title``, ``x_col``,
+            ``y_col``, ``columns``, ``filter``) and optionally its own
+            ``file_path``/``sheet``.
+        file_path: Data file for charts that do not name one.
+        sheet: Sheet for those charts (Excel files only).
 
-    fig.tight_layout()
-    fig.savefig(out, dpi=150)
-    plt.close(fig)
+    Returns:
+        Complete specs for `plot_spec`, in order.
 
-    return str(out)
+    Raises:
+        ValueError: On unknown keys, a missing data file or output path, an
+            unsupported chart type, or two charts writing the same file.
+    """
+    specs: list[dict[str, Any]] = []
+    outputs: set[str] = set()
+    for i, chart in enumerate(charts):
+        unknown = set(chart) - _SPEC_KEYS
+        if unknown:
+            raise ValueError(f"chart {i}: unknown keys {sorted(unknown)}")
+        spec = {
+            "file_path": file_path, "sheet": sheet, "columns": None, "filter": None,
+            "title": "", "x_col": None, "y_col": None, **chart,
+        }
+        if not spec["file_path"]:
+            raise ValueError(f"chart {i}: no file_path")
+        if not spec.get("output_path"):
+            raise ValueError(f"chart {i}: no output_path")
+        if spec.get("chart_type") not in CHART_TYPES:
+            raise ValueError(f"chart {i}: unsupported chart_type {spec.get('chart_type')!r}")
+        out = str(Path(spec["output_path"]).resolve())
+        if out in outputs:
+            raise ValueError(f"chart {i}: output_path {spec['output_path']} is used twice")
+        outputs.add(out)
+        specs.append(spec)
+    return specs
+
+
+def plot_spec(spec: dict[str, Any]) -> str:
+    """Render one spec from `expand_plot_specs` and return the PNG path.
+
+    The data file is read with `load_dataframe`, so charts of the same file
+    rendered by one worker process share a single parse.
+    """
+    df = select_dataframe(spec["file_path"], spec.get("sheet"), spec.get("columns"), spec.get("filter"))
+    return _render_plot(
+        df, spec["chart_type"], spec["output_path"], spec.get("title", ""), spec.get("x_col"), spec.get("y_col"),
+    )
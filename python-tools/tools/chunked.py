@@ -0,0 +1,643 @@
+"""Out-of-core evaluation of common pandas queries on large CSV files.
+
+`pandas_analyze` normally parses the whole file into one DataFrame, which
+does not fit in memory for multi-GB logs. For the query shapes that can be
+computed from partial results, `plan_query` turns the query string into a
+plan that streams the file with ``pd.read_csv(chunksize=...)`` and merges
+per-chunk results, so memory is bounded by the chunk size (plus the size
+of the answer, or of one page of it for row results):
+
+- row selection: ``df[mask]``, ``df.loc[mask]``, ``df.query("...")`` and
+  column selection ``df['a']``, ``df[['a', 'b']]``, ``df.a``, in any order;
+  masks may only use element-wise operations (comparisons, ``&``/``|``/``~``,
+  arithmetic, ``isin``, ``between``, ``isna``, ``.str.contains`` ...), so a
+  chunk's mask is the full frame's mask restricted to that chunk;
+- ``df.shape``, ``df.head(n)`` and the selected rows themselves, returned
+  one `Page` at a time with the total row count;
+- ``describe()`` (numeric columns; quartiles come from a uniform sample of
+  `SAMPLE_SIZE` values per column, exact below that);
+- ``value_counts()``;
+- ``sum``/``count``/``min``/``max``/``mean``/``std``/``var`` and ``agg`` over
+  them, ungrouped or after ``groupby(keys)[cols]`` (``size()`` too). Means
+  and variances are merged with Chan's parallel update, so they do not
+  lose precision the way running sums of squares do.
+
+Anything else raises `UnsupportedQuery`.
+"""
+from __future__ import annotations
+
+import ast
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+CHUNKED_MIN_BYTES = int(os.environ.get("ANALYSIS_CHUNKED_BYTES", str(256 * 1024 * 1024)))
+CHUNK_ROWS = int(os.environ.get("ANALYSIS_CHUNK_ROWS", "200000"))
+SAMPLE_SIZE = 100_000
+
+REDUCTIONS = ("sum", "count", "min", "max", "mean", "std", "var")
+
+_ELEMENTWISE_METHODS = {
+    "isin", "between", "isna", "notna", "isnull", "notnull", "abs", "round", "astype", "fillna",
+}
+_STR_METHODS = {"contains", "startswith", "endswith", "match", "fullmatch", "len", "lower", "upper", "strip"}
+
+_SUPPORTED = (
+    "df.shape, df.head(n), df.describe(), df['col'].value_counts(), df.mean() and other "
+    "sums/counts/min/max/mean/std/var, df.groupby('key')['col'].agg(['mean', 'max']), each optionally "
+    "after df[mask], df.query('...') or a column selection"
+)
+
+
+class UnsupportedQuery(ValueError):
+    """The query cannot be evaluated chunk by chunk."""
+
+
+def should_chunk(path: str | Path) -> bool:
+    """True for CSV files of at least `CHUNKED_MIN_BYTES`."""
+    p = Path(path)
+    return p.suffix.lower() == ".csv" and p.stat().st_size >= CHUNKED_MIN_BYTES
+
+
+# ── Parsing ──────────────────────────────────────────────────────────
+
+
+@dataclass
+class Step:
+    kind: str  # "mask", "query" or "columns"
+    value: Any
+
+
+@dataclass
+class Page:
+    """Rows ``offset`` to ``offset + len(rows)`` of a row result of ``total`` rows."""
+
+    rows: pd.DataFrame | pd.Series
+    offset: int
+    total: int
+
+
+@dataclass
+class ChunkedQuery:
+    """A query compiled for chunk-by-chunk evaluation; see `plan_query`."""
+
+    steps: list[Step]
+    op: str
+    args: dict[str, Any] = field(default_factory=dict)
+
+    def run(
+        self,
+        path: str | Path,
+        chunksize: int | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> tuple[Any, list[str]]:
+        """Stream ``path`` and return ``(result, notes)``.
+
+        Row results (plain selections, ``head`` and ``top``) are returned as a `Page`
+        of at most ``limit`` rows starting at ``offset``; only that window is
+        kept while streaming. ``notes`` describes the scan and any
+        approximation in the result.
+
+        Raises:
+            UnsupportedQuery: For a row result without ``head`` or ``limit``.
+        """
+        args = dict(self.args)
+        if self.op in ("rows", "head", "top"):
+            args.update(offset=offset, limit=limit)
+        acc = _ACCUMULATORS[self.op](**args)
+        rows = chunks = 0
+        with pd.read_csv(path, chunksize=chunksize or CHUNK_ROWS) as reader:
+            for chunk in reader:
+                rows += len(chunk)
+                chunks += 1
+                acc.update(self._apply(chunk))
+                if acc.done:
+                    break
+        result = acc.result()
+        return result, [f"out-of-core: scanned {rows} rows in {chunks} chunks", *acc.notes]
+
+    def _apply(self, chunk: pd.DataFrame) -> pd.DataFrame | pd.Series:
+        current: pd.DataFrame | pd.Series = chunk
+        for step in self.steps:
+            if step.kind == "mask":
+                current = current[eval(step.value, {"__builtins__": {}}, {"df": chunk, "pd": pd})]
+            elif step.kind == "query":
+                current = current.query(step.value)
+            else:
+                current = current[step.value]
+        return current
+
+
+def plan_query(query: str) -> ChunkedQuery:
+    """Compile a `pandas_analyze` query for out-of-core evaluation.
+
+    Raises:
+        UnsupportedQuery: If the query is not one of the supported shapes.
+    """
+    try:
+        node = ast.parse(query.strip(), mode="eval").body
+    except SyntaxError as e:
+        raise UnsupportedQuery(f"invalid query: {e}") from e
+
+    if isinstance(node, ast.Attribute) and node.attr == "shape":
+        return ChunkedQuery(_chain(node.value), "shape")
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        name, target = node.func.attr, node.func.value
+        if _is_groupby(target):
+            steps, keys, selection = _groupby(target)
+            funcs = _agg_spec(node) if name in ("agg", "aggregate") else _method(node, name)
+            return ChunkedQuery(steps, "groupby", {"keys": keys, "selection": selection, "funcs": funcs})
+        if name == "describe":
+            _no_arguments(node)
+            return ChunkedQuery(_chain(target), "describe")
+        if name == "value_counts":
+            kwargs = _literal_keywords(node, {"normalize", "dropna"})
+            if node.args:
+                raise UnsupportedQuery("value_counts() takes keyword arguments only")
+            return ChunkedQuery(_chain(target), "value_counts", kwargs)
+        if name == "head":
+            n = _literal(node.args[0]) if node.args else _literal_keywords(node, {"n"}).get("n", 5)
+            if not isinstance(n, int) or n < 0:
+                raise UnsupportedQuery("head() needs a non-negative integer")
+            return ChunkedQuery(_chain(target), "head", {"n": n})
+        if name in REDUCTIONS or name in ("agg", "aggregate"):
+            funcs = _agg_spec(node) if name in ("agg", "aggregate") else _method(node, name)
+            return ChunkedQuery(_chain(target), "reduce", {"funcs": funcs})
+    return ChunkedQuery(_chain(node), "rows")
+
+
+def _literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except ValueError as e:
+        raise UnsupportedQuery(f"expected a literal, got {ast.unparse(node)!r}") from e
+
+
+def _no_keywords(node: ast.Call) -> None:
+    if node.keywords:
+        raise UnsupportedQuery(f"unsupported arguments in {ast.unparse(node)!r}")
+
+
+def _no_arguments(node: ast.Call) -> None:
+    if node.args or node.keywords:
+        raise UnsupportedQuery(f"unsupported arguments in {ast.unparse(node)!r}")
+
+
+def _literal_keywords(node: ast.Call, allowed: set[str]) -> dict[str, Any]:
+    kwargs = {}
+    for kw in node.keywords:
+        if kw.arg not in allowed:
+            raise UnsupportedQuery(f"unsupported argument {kw.arg!r} in {ast.unparse(node)!r}")
+        kwargs[kw.arg] = _literal(kw.value)
+    return kwargs
+
+
+def _method(node: ast.Call, name: str) -> str:
+    """A reduction method call like ``.mean()`` (``numeric_only`` is accepted)."""
+    if name not in REDUCTIONS and name != "size":
+        raise UnsupportedQuery(f"{name}() cannot be computed out of core; supported: {_SUPPORTED}")
+    if node.args:
+        raise UnsupportedQuery(f"unsupported arguments in {ast.unparse(node)!r}")
+    _literal_keywords(node, {"numeric_only"})
+    return name
+
+
+def _agg_spec(node: ast.Call) -> str | list[str] | dict[str, str | list[str]]:
+    if len(node.args) != 1:
+        raise UnsupportedQuery("agg() takes one function spec")
+    _no_keywords(node)
+    spec = _literal(node.args[0])
+    funcs = [spec] if isinstance(spec, str) else list(spec) if isinstance(spec, (list, tuple)) else None
+    if isinstance(spec, dict):
+        funcs = [f for v in spec.values() for f in ([v] if isinstance(v, str) else v)]
+    if not funcs or any(f not in REDUCTIONS for f in funcs):
+        raise UnsupportedQuery(f"agg() supports {', '.join(REDUCTIONS)}; got {spec!r}")
+    return list(spec) if isinstance(spec, tuple) else spec
+
+
+def _is_groupby(node: ast.AST) -> bool:
+    """``df.groupby(...)``, optionally followed by ``[cols]`` or ``.col``."""
+    if isinstance(node, ast.Subscript) or (
+        isinstance(node, ast.Attribute) and not hasattr(pd.api.typing.DataFrameGroupBy, node.attr)
+    ):
+        node = node.value
+    return isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "groupby"
+
+
+def _groupby(node: ast.AST) -> tuple[list[Step], list[str], str | list[str] | None]:
+    selection = None
+    if isinstance(node, ast.Subscript):
+        selection = _literal(node.slice)
+        if not isinstance(selection, (str, list)):
+            raise UnsupportedQuery("select groupby columns with a name or a list of names")
+        node = node.value
+    elif isinstance(node, ast.Attribute):
+        selection = node.attr
+        node = node.value
+    _no_keywords(node)
+    if len(node.args) != 1:
+        raise UnsupportedQuery("groupby() takes one key or a list of keys")
+    keys = _literal(node.args[0])
+    keys = [keys] if isinstance(keys, str) else keys
+    if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+        raise UnsupportedQuery("group by column names")
+    return _chain(node.func.value), keys, selection
+
+
+def _chain(node: ast.AST) -> list[Step]:
+    """Steps selecting rows and columns of ``df``."""
+    if isinstance(node, ast.Name) and node.id == "df":
+        return []
+    if isinstance(node, ast.Subscript):
+        if isinstance(node.value, ast.Attribute) and node.value.attr == "loc":
+            steps = _chain(node.value.value)
+            if isinstance(node.slice, ast.Tuple) and len(node.slice.elts) == 2:
+                mask, cols = node.slice.elts
+                return steps + [_mask(mask), _columns(cols)]
+            return steps + [_mask(node.slice)]
+        steps = _chain(node.value)
+        if isinstance(node.slice, ast.Constant) or isinstance(node.slice, ast.List):
+            return steps + [_columns(node.slice)]
+        return steps + [_mask(node.slice)]
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "query":
+        _no_keywords(node)
+        if len(node.args) != 1 or not isinstance(_literal(node.args[0]), str):
+            raise UnsupportedQuery("query() takes one string")
+        from tools.query import check_filter
+        return _chain(node.func.value) + [Step("query", check_filter(_literal(node.args[0])))]
+    if isinstance(node, ast.Attribute) and not hasattr(pd.DataFrame, node.attr):
+        return _chain(node.value) + [Step("columns", node.attr)]
+    raise UnsupportedQuery(f"{ast.unparse(node)!r} cannot be computed out of core; supported: {_SUPPORTED}")
+
+
+def _columns(node: ast.AST) -> Step:
+    cols = _literal(node)
+    if isinstance(cols, str) or (isinstance(cols, list) and all(isinstance(c, str) for c in cols)):
+        return Step("columns", cols)
+    raise UnsupportedQuery(f"unsupported column selection {ast.unparse(node)!r}")
+
+
+def _mask(node: ast.AST) -> Step:
+    _check_elementwise(node)
+    return Step("mask", compile(ast.Expression(node), "<mask>", "eval"))
+
+
+def _check_elementwise(node: ast.AST) -> None:
+    """Reject masks that depend on more than the row itself (e.g. ``df.a.mean()``)."""
+    if isinstance(node, ast.Constant):
+        return
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        for elt in node.elts:
+            _check_elementwise(elt)
+        return
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id == "df":
+        if isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str):
+            return
+    elif isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "df":
+        if not hasattr(pd.DataFrame, node.attr):
+            return
+    elif isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        owner, method = node.func.value, node.func.attr
+        if isinstance(owner, ast.Attribute) and owner.attr == "str" and method in _STR_METHODS:
+            owner = owner.value
+        elif method not in _ELEMENTWISE_METHODS:
+            owner = None
+        if owner is not None:
+            for child in [owner, *node.args, *(kw.value for kw in node.keywords)]:
+                _check_elementwise(child)
+            return
+    elif isinstance(node, ast.Compare):
+        for child in [node.left, *node.comparators]:
+            _check_elementwise(child)
+        return
+    elif isinstance(node, ast.BinOp) and not isinstance(node.op, ast.MatMult):
+        _check_elementwise(node.left)
+        _check_elementwise(node.right)
+        return
+    elif isinstance(node, ast.UnaryOp):
+        _check_elementwise(node.operand)
+        return
+    raise UnsupportedQuery(f"row filter {ast.unparse(node)!r} is not element-wise")
+
+
+# ── Accumulators ─────────────────────────────────────────────────────
+
+
+class _Accumulator:
+    done = False
+
+    def __init__(self):
+        self.notes: list[str] = []
+
+    def update(self, part: pd.DataFrame | pd.Series) -> None:
+        raise NotImplementedError
+
+    def result(self) -> Any:
+        raise NotImplementedError
+
+
+class _Rows(_Accumulator):
+    """The first ``n`` rows (all if None), keeping only ``[offset, offset + limit)``."""
+
+    def __init__(self, n: int | None = None, offset: int = 0, limit: int | None = None):
+        super().__init__()
+        stop = n if limit is None else offset + limit if n is None else min(n, offset + limit)
+        if stop is None:
+            raise UnsupportedQuery("selecting rows out of core needs head(n) or a page limit")
+        self.n = n
+        self.offset = offset
+        self.stop = stop
+        self.parts: list[pd.DataFrame | pd.Series] = []
+        self.total = 0
+
+    def update(self, part):
+        if self.n is not None:
+            part = part.iloc[: self.n - self.total]
+        if not self.parts:
+            self.parts.append(part.iloc[:0])
+        lo, hi = max(self.offset - self.total, 0), max(self.stop - self.total, 0)
+        if hi > lo:
+            self.parts.append(part.iloc[lo:hi])
+        self.total += len(part)
+        self.done = self.n is not None and self.total >= self.n
+
+    def result(self):
+        rows = pd.concat(self.parts) if self.parts else pd.DataFrame()
+        return Page(rows, self.offset, self.total)
+
+
+class _Top(_Accumulator):
+    """Page ``[offset, offset + limit)`` of the rows sorted by ``by``, capped at ``n``.
+
+    Only the first ``offset + limit`` sorted rows can reach the page, so
+    that many are kept: each chunk is merged in and the rest dropped. The
+    sort is stable and earlier rows come first, as in one sort of all rows.
+    """
+
+    def __init__(self, by: list[str], ascending: list[bool], n: int | None = None,
+                 offset: int = 0, limit: int | None = None):
+        super().__init__()
+        if limit is None:
+            raise UnsupportedQuery("sorting rows out of core needs a page limit")
+        self.by = by
+        self.ascending = ascending
+        self.n = n
+        self.offset = offset
+        self.keep = offset + limit if n is None else min(n, offset + limit)
+        self.top: pd.DataFrame | None = None
+        self.total = 0
+
+    def update(self, part):
+        missing = [c for c in self.by if c not in part.columns]
+        if missing:
+            raise ValueError(f"Unknown sort keys {missing}; available: {list(part.columns)}")
+        self.total += len(part)
+        merged = part if self.top is None else pd.concat([self.top, part])
+        self.top = merged.sort_values(self.by, ascending=self.ascending, kind="stable").head(self.keep)
+
+    def result(self):
+        total = self.total if self.n is None else min(self.total, self.n)
+        rows = pd.DataFrame() if self.top is None else self.top.iloc[self.offset:self.keep]
+        return Page(rows, self.offset, total)
+
+
+class _Shape(_Accumulator):
+    def __init__(self):
+        super().__init__()
+        self.rows = 0
+        self.tail: tuple[int, ...] = ()
+
+    def update(self, part):
+        self.rows += len(part)
+        self.tail = part.shape[1:]
+
+    def result(self):
+        return (self.rows, *self.tail)
+
+
+class _ValueCounts(_Accumulator):
+    def __init__(self, normalize: bool = False, dropna: bool = True):
+        super().__init__()
+        self.normalize = normalize
+        self.dropna = dropna
+        self.counts: pd.Series | None = None
+
+    def update(self, part):
+        counts = part.value_counts(dropna=self.dropna, sort=False)
+        self.counts = counts if self.counts is None else self.counts.add(counts, fill_value=0)
+
+    def result(self):
+        counts = self.counts.astype("int64").sort_values(ascending=False, kind="stable")
+        if self.normalize:
+            counts = (counts / counts.sum()).rename("proportion")
+        return counts
+
+
+class _Moments:
+    """Mergeable per-group count, sum, mean, M2, min and max of numeric columns."""
+
+    STATS = ("count", "sum", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.stats: dict[str, pd.DataFrame] | None = None
+        self.counts: pd.DataFrame | None = None  # non-null counts of every column
+        self.size: pd.Series | None = None
+
+    def update(self, frame: pd.DataFrame, keys: list[str]) -> None:
+        by = keys or np.zeros(len(frame), dtype=np.int8)
+        values = frame.drop(columns=keys)
+        g = frame.groupby(by, sort=False)
+        numeric = values.select_dtypes(["number", "bool"]).columns
+        gn = g[list(numeric)]
+        count = gn.count()
+        # Integer sums, minima and maxima stay integers (nullable while
+        # groups are aligned), so they are exact and keep their dtype.
+        ints = {c: "Int64" for c in numeric if pd.api.types.is_integer_dtype(values[c])}
+        stats = {
+            "count": count,
+            "sum": gn.sum().astype(ints),
+            "mean": gn.mean(),
+            "m2": (gn.var(ddof=0) * count).fillna(0),
+            "min": gn.min().astype(ints),
+            "max": gn.max().astype(ints),
+        }
+        counts = g[list(values.columns)].count()
+        size = g.size()
+        if not keys and not len(frame):
+            # An empty frame still reduces to one row, as in pandas: count
+            # and sum 0, the other statistics NaN.
+            zero = {"count": 0, "sum": 0, "m2": 0}
+            stats = {k: v.reindex([0], fill_value=zero.get(k, np.nan)) for k, v in stats.items()}
+            counts, size = counts.reindex([0], fill_value=0), size.reindex([0], fill_value=0)
+        if self.stats is None:
+            self.stats, self.counts, self.size = stats, counts, size
+            return
+        # A column can be numeric in one chunk and not in another (e.g. all
+        # empty), so align columns as well as groups.
+        idx = self.stats["count"].index.union(count.index)
+        cols = self.stats["count"].columns.union(count.columns, sort=False)
+        a = {k: v.reindex(index=idx, columns=cols) for k, v in self.stats.items()}
+        b = {k: v.reindex(index=idx, columns=cols) for k, v in stats.items()}
+        na, nb = a["count"].fillna(0), b["count"].fillna(0)
+        n = na + nb
+        ma, mb = a["mean"].fillna(0), b["mean"].fillna(0)
+        delta = mb - ma
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.stats = {
+                "count": n,
+                "sum": a["sum"].fillna(0) + b["sum"].fillna(0),
+                "mean": (ma * na + mb * nb) / n,
+                "m2": (a["m2"].fillna(0) + b["m2"].fillna(0) + delta**2 * na * nb / n).fillna(0),
+                "min": a["min"].where(a["min"].le(b["min"]).fillna(False) | b["min"].isna(), b["min"]),
+                "max": a["max"].where(a["max"].ge(b["max"]).fillna(False) | b["max"].isna(), b["max"]),
+            }
+        self.counts = self.counts.add(counts, fill_value=0)
+        self.size = self.size.add(size, fill_value=0)
+
+    def get(self, func: str) -> pd.DataFrame | pd.Series:
+        """Per-group values of one reduction (columns: value columns)."""
+        if func == "size":
+            return self.size.astype("int64")
+        if func == "count":
+            return self.counts.astype("int64")
+        s = self.stats
+        if func == "mean":
+            return s[func]
+        if func in ("sum", "min", "max"):
+            ints = [c for c in s[func].columns if s[func][c].dtype == "Int64"]
+            return s[func].astype({c: "int64" if s[func][c].notna().all() else "float64" for c in ints})
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = (s["m2"] / (s["count"] - 1)).where(s["count"] > 1)
+        return np.sqrt(var) if func == "std" else var
+
+
+class _GroupBy(_Accumulator):
+    def __init__(self, keys: list[str], selection: str | list[str] | None, funcs: Any):
+        super().__init__()
+        self.keys = keys
+        self.selection = selection
+        self.funcs = funcs
+        self.moments = _Moments()
+
+    def update(self, part):
+        if self.selection is not None:
+            cols = [self.selection] if isinstance(self.selection, str) else self.selection
+            part = part[self.keys + [c for c in cols if c not in self.keys]]
+        self.moments.update(part, self.keys)
+
+    def _column(self, func: str, col: str) -> pd.Series:
+        return self.moments.get(func)[col].rename(col)
+
+    def result(self):
+        m = self.moments
+        if self.funcs == "size":
+            out = m.get("size")
+        elif isinstance(self.funcs, dict):
+            cols = {}
+            nested = any(not isinstance(f, str) for f in self.funcs.values())
+            for col, fs in self.funcs.items():
+                for f in [fs] if isinstance(fs, str) else fs:
+                    cols[(col, f) if nested else col] = self._column(f, col)
+            out = pd.DataFrame(cols)
+        elif isinstance(self.selection, str):
+            if isinstance(self.funcs, str):
+                out = self._column(self.funcs, self.selection)
+            else:
+                out = pd.DataFrame({f: self._column(f, self.selection) for f in self.funcs})
+        elif isinstance(self.funcs, str):
+            out = m.get(self.funcs)
+        else:
+            columns = m.get("sum").columns
+            out = pd.DataFrame({(c, f): self._column(f, c) for c in columns for f in self.funcs})
+        return out.sort_index()
+
+
+class _Reduce(_Accumulator):
+    def __init__(self, funcs: str | list[str]):
+        super().__init__()
+        self.funcs = funcs
+        self.moments = _Moments()
+        self.series_name: Any = None
+        self.is_series = False
+
+    def update(self, part):
+        if isinstance(part, pd.Series):
+            self.is_series, self.series_name = True, part.name
+            part = part.to_frame(name=0 if part.name is None else part.name)
+        self.moments.update(part, [])
+
+    def _row(self, func: str) -> pd.Series:
+        row = self.moments.get(func).iloc[0]
+        row.name = func
+        return row
+
+    def result(self):
+        if isinstance(self.funcs, str):
+            row = self._row(self.funcs)
+            return row.iloc[0] if self.is_series else row
+        table = pd.DataFrame([self._row(f) for f in self.funcs])
+        if self.is_series:
+            return table.iloc[:, 0].rename(self.series_name)
+        return table
+
+
+class _Describe(_Accumulator):
+    def __init__(self):
+        super().__init__()
+        self.moments = _Moments()
+        self.samples: dict[Any, tuple[np.ndarray, np.ndarray]] = {}
+        self.rng = np.random.default_rng(0)
+        self.is_series = False
+        self.series_name: Any = None
+
+    def update(self, part):
+        if isinstance(part, pd.Series):
+            self.is_series, self.series_name = True, part.name
+            part = part.to_frame(name=0 if part.name is None else part.name)
+        numeric = part.select_dtypes("number")
+        if numeric.shape[1] == 0:
+            raise UnsupportedQuery("out-of-core describe() needs numeric columns")
+        self.moments.update(numeric, [])
+        for col in numeric.columns:
+            # Bottom-k sampling: the SAMPLE_SIZE values with the smallest
+            # random keys are a uniform sample of every value seen so far.
+            values = numeric[col].dropna().to_numpy(dtype=float)
+            keys = self.rng.random(len(values))
+            if col in self.samples:
+                keys = np.concatenate([self.samples[col][0], keys])
+                values = np.concatenate([self.samples[col][1], values])
+            if len(keys) > SAMPLE_SIZE:
+                keep = np.argpartition(keys, SAMPLE_SIZE)[:SAMPLE_SIZE]
+                keys, values = keys[keep], values[keep]
+            self.samples[col] = (keys, values)
+
+    def result(self):
+        m = self.moments
+        rows = {f: m.get(f).iloc[0] for f in ("count", "mean", "std", "min")}
+        for q in (0.25, 0.5, 0.75):
+            rows[f"{q:.0%}"] = pd.Series(
+                {c: np.quantile(v, q) if len(v) else np.nan for c, (_, v) in self.samples.items()}
+            )
+        rows["max"] = m.get("max").iloc[0]
+        approximate = bool((m.get("count").iloc[0] > SAMPLE_SIZE).any())
+        if approximate:
+            self.notes.append(f"quartiles estimated from a uniform sample of {SAMPLE_SIZE} values per column")
+        table = pd.DataFrame(rows).T.astype(float)
+        return table.iloc[:, 0].rename(self.series_name) if self.is_series else table
+
+
+_ACCUMULATORS = {
+    "rows": _Rows,
+    "head": _Rows,
+    "top": _Top,
+    "shape": _Shape,
+    "value_counts": _ValueCounts,
+    "groupby": _GroupBy,
+    "reduce": _Reduce,
+    "describe": _Describe,
+}
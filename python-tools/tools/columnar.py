@@ -0,0 +1,329 @@
+"""Columnar sidecar cache for uploaded spreadsheets.
+
+The first read of a sheet from an upload converts it to an uncompressed
+Arrow/Feather file keyed by the workbook's content hash. Later reads of the
+same sheet memory-map that file instead of re-parsing the XLSX.
+
+Only files under the uploads directory (UPLOADS_DIR, default
+``$PROJECT_ROOT/data/uploads``) are converted; sidecars live in
+COLUMNAR_CACHE_DIR (default ``$PROJECT_ROOT/data/.cache/columnar``); once they
+exceed COLUMNAR_CACHE_BYTES (default 2 GiB) the least recently read
+workbooks' sidecars are removed. When pyarrow is not installed, or a
+sheet cannot be represented as typed columns (e.g. mixed types in one
+column), callers fall back to reading the workbook directly.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+import openpyxl
+
+_EXCEL_EXTS = {".xlsx", ".xlsm"}
+
+_hash_memo: dict[str, tuple[int, int, str]] = {}
+_lock = threading.Lock()
+
+
+def _project_root() -> Path:
+    return Path(os.environ.get("PROJECT_ROOT", "."))
+
+
+def _uploads_dir() -> Path:
+    return Path(os.environ.get("UPLOADS_DIR", _project_root() / "data" / "uploads")).resolve()
+
+
+def _cache_dir() -> Path:
+    return Path(os.environ.get("COLUMNAR_CACHE_DIR", _project_root() / "data" / ".cache" / "columnar"))
+
+
+def _max_bytes() -> int:
+    return int(os.environ.get("COLUMNAR_CACHE_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def is_cacheable(file_path: str | Path) -> bool:
+    """Return True if reads of this file go through the sidecar cache."""
+    p = Path(file_path)
+    if p.suffix.lower() not in _EXCEL_EXTS:
+        return False
+    return p.resolve().is_relative_to(_uploads_dir())
+
+
+def content_hash(file_path: str | Path) -> str:
+    """SHA-256 of the file contents, memoized by (path, mtime, size)."""
+    p = Path(file_path).resolve()
+    st = p.stat()
+    with _lock:
+        memo = _hash_memo.get(str(p))
+    if memo and memo[:2] == (st.st_mtime_ns, st.st_size):
+        return memo[2]
+
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _lock:
+        _hash_memo[str(p)] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def _write_json(path: Path, data: dict[str, Any]) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _manifest(file_path: Path, entry: Path) -> dict[str, Any]:
+    """Load (or create) the manifest listing a workbook's sheets."""
+    manifest_path = entry / "manifest.json"
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text())
+
+    wb = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        manifest = {
+            "source": str(file_path),
+            "sheets": list(wb.sheetnames),
+            "active": wb.active.title,
+            "files": {},
+            "unsupported": [],
+        }
+    finally:
+        wb.close()
+    entry.mkdir(parents=True, exist_ok=True)
+    _write_json(manifest_path, manifest)
+    return manifest
+
+
+def _read_excel_labels(header_row: tuple[Any, ...]) -> list[Any] | None:
+    """Column labels ``pd.read_excel`` gives a header row, or None if they
+    are not JSON values (e.g. dates).
+
+    The sidecar's own column names follow the excel tools (``col_{i}`` for
+    blanks, all strings); DataFrames built from it use these labels instead,
+    so `sheet_frame` and ``pd.read_excel`` agree.
+    """
+    labels: list[Any] = []
+    counts: dict[Any, int] = {}
+    for i, h in enumerate(header_row):
+        if h is None:
+            h = f"Unnamed: {i}"
+        elif isinstance(h, float) and h.is_integer():
+            h = int(h)
+        elif not isinstance(h, (str, int, float)):
+            return None
+        # Same renaming of duplicates as pandas: a, a.1, a.2, ...
+        count = counts.get(h, 0)
+        while count > 0:
+            counts[h] = count + 1
+            h = f"{h}.{count}"
+            count = counts.get(h, 0)
+        labels.append(h)
+        counts[h] = count + 1
+    return labels
+
+
+def _convert_sheet(file_path: Path, sheet: str, dest: Path) -> bool:
+    """Convert one sheet to Feather. Returns False if it has no typed form."""
+    pa = _pyarrow()
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet].iter_rows(values_only=True)
+        header_row = next(rows, None)
+        if header_row is None:
+            headers: list[str] = []
+            labels: list[Any] = []
+            columns: list[list[Any]] = []
+        else:
+            headers = [str(h) if h is not None else f"col_{i}" for i, h in enumerate(header_row)]
+            labels = _read_excel_labels(header_row)
+            if labels is None:
+                return False
+            columns = [[] for _ in headers]
+            for row in rows:
+                for i, col in enumerate(columns):
+                    col.append(row[i] if i < len(row) else None)
+    finally:
+        wb.close()
+
+    if len(set(headers)) != len(headers):
+        return False
+    try:
+        table = pa.table({h: pa.array(col) for h, col in zip(headers, columns)})
+        table = table.replace_schema_metadata({b"labels": json.dumps(labels).encode()})
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, OverflowError):
+        return False
+
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, suffix=".tmp")
+    os.close(fd)
+    # Uncompressed so reads can be memory-mapped without a decode step.
+    pa.feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, dest)
+    return True
+
+
+def _entry_size(entry: Path) -> int:
+    size = 0
+    for f in entry.rglob("*"):
+        try:
+            size += f.stat().st_size if f.is_file() else 0
+        except OSError:
+            continue
+    return size
+
+
+def evict(keep: Path | None = None) -> int:
+    """Remove the least recently read workbooks' sidecars until the cache
+    fits in COLUMNAR_CACHE_BYTES.
+
+    Recency is the mtime of each entry's manifest, touched on every read.
+
+    Args:
+        keep: Entry directory that is never removed (the one in use).
+
+    Returns:
+        The number of entries removed.
+    """
+    root = _cache_dir()
+    entries = []
+    for entry in root.iterdir() if root.exists() else []:
+        try:
+            used = (entry / "manifest.json").stat().st_mtime_ns
+        except OSError:
+            continue
+        entries.append((used, _entry_size(entry), entry))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, entry in sorted(entries):
+        if total <= _max_bytes():
+            break
+        if entry == keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def sheet_names(file_path: str | Path) -> list[str]:
+    """List a workbook's sheet names, from the sidecar manifest when available."""
+    p = Path(file_path)
+    if is_cacheable(p) and _pyarrow() is not None:
+        return list(_manifest(p, _cache_dir() / content_hash(p))["sheets"])
+    wb = openpyxl.load_workbook(p, read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def active_sheet(file_path: str | Path) -> str:
+    """Name of the workbook's active sheet, from the sidecar manifest when available."""
+    p = Path(file_path)
+    if is_cacheable(p) and _pyarrow() is not None:
+        return _manifest(p, _cache_dir() / content_hash(p))["active"]
+    wb = openpyxl.load_workbook(p, read_only=True)
+    try:
+        return wb.active.title
+    finally:
+        wb.close()
+
+
+def sheet_table(file_path: str | Path, sheet: str | None = None):
+    """Return a sheet as a memory-mapped ``pyarrow.Table``, converting on first use.
+
+    Args:
+        file_path: Path to the workbook.
+        sheet: Optional sheet name. Defaults to the active sheet.
+
+    Returns:
+        The table, or None when the file is not cacheable, pyarrow is
+        missing or the sheet cannot be stored as typed columns.
+
+    Raises:
+        KeyError: If the sheet does not exist.
+    """
+    p = Path(file_path)
+    pa = _pyarrow()
+    if pa is None or not is_cacheable(p):
+        return None
+
+    entry = _cache_dir() / content_hash(p)
+    manifest = _manifest(p, entry)
+    try:
+        os.utime(entry / "manifest.json")
+    except OSError:
+        pass
+    name = sheet or manifest["active"]
+    if name not in manifest["sheets"]:
+        raise KeyError(f"Worksheet {name} does not exist.")
+    if name in manifest["unsupported"]:
+        return None
+
+    filename = manifest["files"].get(name)
+    if filename is None or not (entry / filename).exists():
+        filename = f"{manifest['sheets'].index(name)}.feather"
+        ok = _convert_sheet(p, name, entry / filename)
+        with _lock:
+            manifest = _manifest(p, entry)
+            if ok:
+                manifest["files"][name] = filename
+            else:
+                manifest["unsupported"].append(name)
+            _write_json(entry / "manifest.json", manifest)
+        if not ok:
+            return None
+        evict(keep=entry)
+
+    return pa.feather.read_table(entry / filename, memory_map=True)
+
+
+def sheet_frame(file_path: str | Path, sheet: str | None = None):
+    """Return a sheet as a DataFrame read from its sidecar, like ``pd.read_excel``.
+
+    Column labels and the default sheet (the first one) match
+    ``pd.read_excel``, so a workbook gives the same frame whether or not it
+    is under the uploads directory.
+
+    Returns:
+        The DataFrame, or None when `sheet_table` would return None or the
+        sidecar predates stored labels.
+    """
+    if _pyarrow() is None or not is_cacheable(file_path):
+        return None
+    table = sheet_table(file_path, sheet if sheet is not None else sheet_names(file_path)[0])
+    labels = None if table is None else (table.schema.metadata or {}).get(b"labels")
+    if labels is None:
+        return None
+    labels = json.loads(labels)
+    # read_excel ignores trailing empty rows, and trailing columns that are
+    # empty in every row including the header. Trim before converting, so
+    # the empty rows do not turn integer columns into floats.
+    filled = [col.is_valid().to_numpy(zero_copy_only=False) for col in table.columns]
+    width = len(labels)
+    while width and str(labels[width - 1]).startswith("Unnamed: ") and not filled[width - 1].any():
+        width -= 1
+    length = 0
+    for col in filled[:width]:
+        nonzero = col.nonzero()[0]
+        length = max(length, nonzero[-1] + 1 if len(nonzero) else 0)
+    df = table.select(range(width)).slice(0, length).to_pandas()
+    df.columns = labels[:width]
+    return df
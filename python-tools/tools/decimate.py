@@ -0,0 +1,85 @@
+"""Point reduction for plotting large series.
+
+A line chart of a million samples is drawn into at most a few thousand
+pixel columns, so almost all of the work matplotlib does rasterizing it
+is invisible. M4 decimation keeps, for each column-sized bucket of x,
+the first, last, minimum and maximum sample: the line drawn through the
+kept points covers exactly the same pixels in every column as the full
+series, and joins neighbouring columns at the same points. Buckets are
+made several times narrower than a pixel, so the result stays identical
+after ``tight_layout`` shrinks the axes.
+
+Scatter plots have no such exact reduction; above
+`SCATTER_POINTS_THRESHOLD` points they are drawn as a hexbin density
+instead, which is what a saturated scatter conveys anyway.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+LINE_POINTS_THRESHOLD = 20_000
+SCATTER_POINTS_THRESHOLD = 200_000
+OVERSAMPLE = 4
+
+
+def numeric_x(x: pd.Series | pd.Index) -> np.ndarray | None:
+    """``x`` as float64 for bucketing (datetimes as ns), or None if not numeric."""
+    values = np.asarray(x)
+    if np.issubdtype(values.dtype, np.datetime64) or np.issubdtype(values.dtype, np.timedelta64):
+        return values.astype("int64").astype(float)
+    if np.issubdtype(values.dtype, np.number) and not np.issubdtype(values.dtype, np.complexfloating):
+        return values.astype(float)
+    return None
+
+
+def m4_indices(x: np.ndarray, ys: np.ndarray, buckets: int) -> np.ndarray:
+    """Row indices kept by M4 decimation of one or more series over ``x``.
+
+    Args:
+        x: Non-decreasing x values, shape (n,).
+        ys: Series values, shape (n,) or (n, k); NaN-free.
+        buckets: Number of equal-width x buckets.
+
+    Returns:
+        Sorted unique row indices: per bucket and series, the first, last,
+        argmin and argmax rows.
+    """
+    n = len(x)
+    if n == 0 or x[-1] <= x[0]:
+        return np.arange(n)
+    ys = ys.reshape(n, -1)
+    span = x[-1] - x[0]
+    bucket = np.minimum(((x - x[0]) / span * buckets).astype(np.intp), buckets - 1)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    keep = [starts, ends]
+    for y in ys.T:
+        # Within each bucket (x is sorted, so buckets are contiguous), sort
+        # rows by y: the bucket's first row is its minimum, its last the maximum.
+        order = np.lexsort((y, bucket))
+        keep += [order[starts], order[ends]]
+    return np.unique(np.concatenate(keep))
+
+
+def decimate_line(df: pd.DataFrame, x_col: str | None, y_cols: list[str], width_px: int) -> pd.DataFrame:
+    """Rows of ``df`` needed to draw its line chart ``width_px`` pixels wide.
+
+    Returns ``df`` unchanged when it is below `LINE_POINTS_THRESHOLD`, when
+    x is not numeric and non-decreasing, or when the series contain NaNs
+    (gaps would not survive decimation).
+    """
+    if len(df) <= LINE_POINTS_THRESHOLD or not y_cols:
+        return df
+    x = numeric_x(df[x_col] if x_col else df.index)
+    if x is None or np.isnan(x).any() or np.any(np.diff(x) < 0):
+        return df
+    try:
+        ys = df[y_cols].to_numpy(dtype=float)
+    except (TypeError, ValueError):
+        return df
+    if np.isnan(ys).any():
+        return df
+    idx = m4_indices(x, ys, OVERSAMPLE * width_px)
+    return df if len(idx) >= len(df) else df.iloc[idx]
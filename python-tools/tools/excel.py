@@ -1,13 +1,100 @@
 """Excel read/write tools using openpyxl."""
 from __future__ import annotations
 
+import base64
+import itertools
+import json
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import numpy as np
 import openpyxl
+import pandas as pd
 from scipy.io import loadmat
 
+from tools import columnar
+from tools.xlsx_stream import XlsxStreamWriter, append_rows
+
+
+DEFAULT_PAGE_SIZE = 500
+
+
+def _iter_records(
+    ws: Any,
+    columns: list[str] | None = None,
+    offset: int = 0,
+    limit: int | None = None,
+) -> tuple[list[str], Iterator[dict[str, Any]]]:
+    """Stream a worksheet as row dicts without materializing the sheet.
+
+    Args:
+        ws: An openpyxl worksheet (typically read-only).
+        columns: Optional subset of header names to project.
+        offset: Number of data rows (after the header) to skip.
+        limit: Maximum number of data rows to yield.
+
+    Returns:
+        Tuple of (selected headers, iterator over row dicts).
+    """
+    head = ws.iter_rows(min_row=1, max_row=1, values_only=True)
+    header_row = next(head, None)
+    head.close()
+    if header_row is None:
+        return [], iter(())
+
+    headers = [str(h) if h is not None else f"col_{i}" for i, h in enumerate(header_row)]
+    if columns:
+        missing = [c for c in columns if c not in headers]
+        if missing:
+            raise ValueError(f"Unknown columns: {missing}. Available: {headers}")
+        indices = [headers.index(c) for c in columns]
+    else:
+        indices = list(range(len(headers)))
+    if not indices:
+        return [], iter(())
+
+    # Only parse the column span that covers the projection.
+    min_col = min(indices) + 1
+    max_col = max(indices) + 1
+    local = [i - min_col + 1 for i in indices]
+    names = [headers[i] for i in indices]
+
+    min_row = 2 + offset
+    max_row = min_row + limit - 1 if limit is not None else None
+    if max_row is not None and max_row < min_row:
+        return names, iter(())
+
+    def _gen() -> Iterator[dict[str, Any]]:
+        for row in ws.iter_rows(
+            min_row=min_row, max_row=max_row,
+            min_col=min_col, max_col=max_col, values_only=True,
+        ):
+            yield {n: (row[i] if i < len(row) else None) for n, i in zip(names, local)}
+
+    return names, _gen()
+
+
+def _file_fingerprint(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _encode_cursor(state: dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(token: str) -> dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        state = json.loads(raw)
+    except (ValueError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor token") from None
+    if not isinstance(state, dict) or "o" not in state:
+        raise ValueError("Invalid cursor token")
+    return state
+
 
 def excel_read(file_path: str, sheet: str | None = None) -> list[dict[str, Any]]:
     """Read an Excel file and return its contents as a list of row dicts.
@@ -19,59 +106,271 @@ def excel_read(file_path: str, sheet: str | None = None) -> list[dict[str, Any]]
     Returns:
         List of dicts where keys are column headers from the first row.
     """
+    table = columnar.sheet_table(file_path, sheet)
+    if table is not None:
+        return table.to_pylist()
+
     wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-    ws = wb[sheet] if sheet else wb.active
+    try:
+        ws = wb[sheet] if sheet else wb.active
+        _, records = _iter_records(ws)
+        return list(records)
+    finally:
+        wb.close()
 
-    rows = list(ws.iter_rows(values_only=True))
-    wb.close()
 
-    if not rows:
-        return []
+def excel_read_page(
+    file_path: str,
+    sheet: str | None = None,
+    offset: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    columns: list[str] | None = None,
+    cursor: str | None = None,
+) -> dict[str, Any]:
+    """Read one window of rows from an Excel sheet.
+
+    Rows are streamed from a read-only workbook, so memory is bounded by
+    ``limit`` rather than by the size of the sheet.
 
-    headers = [str(h) if h is not None else f"col_{i}" for i, h in enumerate(rows[0])]
-    return [dict(zip(headers, row)) for row in rows[1:]]
+    Args:
+        file_path: Path to the .xlsx file.
+        sheet: Optional sheet name. Defaults to the active sheet.
+        offset: Number of data rows to skip (the header row is not counted).
+        limit: Maximum number of rows to return.
+        columns: Optional list of column headers to include.
+        cursor: Token from a previous page's ``next_cursor``. When given, it
+            overrides ``sheet``, ``offset`` and ``columns``.
+
+    Returns:
+        Dict with 'sheet', 'columns', 'offset', 'rows' and 'next_cursor'
+        (None once the sheet is exhausted).
+    """
+    path = Path(file_path)
+    fingerprint = _file_fingerprint(path)
+
+    if cursor:
+        state = _decode_cursor(cursor)
+        if state.get("f") != fingerprint:
+            raise ValueError("Cursor is stale: the file has changed since it was issued")
+        sheet = state.get("s")
+        offset = int(state["o"])
+        columns = state.get("c")
+
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+
+    # Fetch one extra row to learn whether another page exists.
+    table = columnar.sheet_table(path, sheet)
+    if table is not None:
+        names = list(columns) if columns else table.column_names
+        missing = [c for c in names if c not in table.column_names]
+        if missing:
+            raise ValueError(f"Unknown columns: {missing}. Available: {table.column_names}")
+        rows = table.select(names).slice(offset, limit + 1).to_pylist()
+        title = sheet or columnar.active_sheet(path)
+    else:
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet] if sheet else wb.active
+            names, records = _iter_records(ws, columns, offset, limit + 1)
+            rows = list(records)
+            title = ws.title
+        finally:
+            wb.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor({
+            "s": title, "o": offset + limit, "c": columns, "f": fingerprint,
+        })
+
+    return {
+        "sheet": title,
+        "columns": names,
+        "offset": offset,
+        "rows": rows,
+        "next_cursor": next_cursor,
+    }
+
+
+def _clean_value(value: Any) -> Any:
+    """Map pandas/NumPy missing values to None so they become empty cells."""
+    if value is None or value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _scatter(row: list[Any], positions: list[int], width: int) -> list[Any]:
+    out: list[Any] = [None] * width
+    for pos, value in zip(positions, row):
+        out[pos] = value
+    return out
+
+
+def _tabulate(
+    data: Any,
+    columns: list[str] | None = None,
+    strict: bool = False,
+) -> tuple[list[str] | None, Iterator[list[Any]]]:
+    """Normalize supported inputs to (headers, iterator of row lists).
+
+    Accepts a pandas DataFrame, a pyarrow Table, or any iterable of row
+    dicts or row sequences. Headers are None for sequence rows without
+    ``columns``. Only the first row is consumed eagerly. With ``strict``,
+    dict rows with keys outside ``columns`` raise ValueError instead of
+    being dropped.
+    """
+    if isinstance(data, pd.DataFrame):
+        if columns and not strict:
+            data = data[columns]
+        headers = [str(c) for c in data.columns]
+        rows = ([_clean_value(v) for v in row] for row in data.itertuples(index=False, name=None))
+        return headers, rows
+
+    if hasattr(data, "to_batches") and hasattr(data, "column_names"):  # pyarrow.Table
+        def _arrow_rows() -> Iterator[list[Any]]:
+            for batch in data.to_batches():
+                yield from (list(r) for r in zip(*(col.to_pylist() for col in batch.columns)))
+        return list(data.column_names), _arrow_rows()
+
+    it = iter(data)
+    first = next(it, None)
+    if first is None:
+        raise ValueError("data must be non-empty")
+
+    if isinstance(first, Mapping):
+        headers = list(columns) if columns else list(first.keys())
+
+        allowed = set(headers)
+
+        def _dict_rows() -> Iterator[list[Any]]:
+            for row in itertools.chain([first], it):
+                if strict and not allowed.issuperset(row):
+                    unknown = [k for k in row if k not in allowed]
+                    raise ValueError(f"Unknown columns for sheet: {unknown}. Existing: {headers}")
+                yield [row.get(h) for h in headers]
+        return headers, _dict_rows()
+
+    return (list(columns) if columns else None), (list(r) for r in itertools.chain([first], it))
+
+
+def _sheet_headers(path: Path, sheet: str | None) -> list[str]:
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        ws = wb[sheet] if sheet else wb.worksheets[0]
+        head = ws.iter_rows(min_row=1, max_row=1, values_only=True)
+        row = next(head, None)
+        head.close()
+    finally:
+        wb.close()
+    if row is None or all(h is None for h in row):
+        return []
+    return [str(h) if h is not None else f"col_{i}" for i, h in enumerate(row)]
 
 
 def excel_write(
     file_path: str,
-    data: list[dict[str, Any]],
+    data: Any,
     sheet: str | None = None,
+    mode: str = "overwrite",
+    columns: list[str] | None = None,
 ) -> str:
     """Write data to an Excel file.
 
+    Rows are streamed, so ``data`` may be a generator and memory stays
+    bounded regardless of the number of rows.
+
     Args:
         file_path: Destination .xlsx path.
-        data: List of row dicts. Keys become column headers.
-        sheet: Optional sheet name.
+        data: Rows to write: a list (or any iterable) of row dicts or row
+            sequences, a pandas DataFrame or a pyarrow Table. Dict keys
+            become column headers.
+        sheet: Optional sheet name. In append mode, defaults to the first sheet.
+        mode: "overwrite" to create the file from scratch, or "append" to
+            add rows after the last row of an existing sheet without
+            loading the workbook. Appending to a missing file creates it.
+        columns: Optional header order. Required for sequence rows in
+            overwrite mode; in append mode, dict rows are matched to the
+            sheet's existing header row, or written under a new one (as in
+            overwrite mode) when the sheet has none.
 
     Returns:
         The path of the written file.
     """
-    if not data:
-        raise ValueError("data must be a non-empty list of dicts")
+    if mode not in ("overwrite", "append"):
+        raise ValueError(f"Unsupported mode: {mode}. Use 'overwrite' or 'append'.")
 
     path = Path(file_path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    if sheet:
-        ws.title = sheet
+    if mode == "append" and path.exists():
+        existing = _sheet_headers(path, sheet)
+        if not existing:
+            # Blank sheet: write the header row first, as overwrite mode does.
+            headers, rows = _tabulate(data, columns)
+            if headers is not None:
+                rows = itertools.chain([headers], rows)
+            append_rows(path, rows, sheet)
+            return str(path)
+        headers, rows = _tabulate(data, existing, strict=True)
+        if headers is not None and headers != existing:
+            # DataFrame/Table columns: place each one under its existing header.
+            unknown = [h for h in headers if h not in existing]
+            if unknown:
+                raise ValueError(f"Unknown columns for sheet: {unknown}. Existing: {existing}")
+            positions = [existing.index(h) for h in headers]
+            rows = (_scatter(row, positions, len(existing)) for row in rows)
+        append_rows(path, rows, sheet)
+        return str(path)
 
-    headers = list(data[0].keys())
+    headers, rows = _tabulate(data, columns)
+    if headers is None:
+        raise ValueError("columns is required when rows are sequences")
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet or "Sheet")
     ws.append(headers)
-    for row in data:
-        ws.append([row.get(h) for h in headers])
+    for row in rows:
+        ws.append(row)
 
     wb.save(path)
     wb.close()
     return str(path)
 
 
+EXCEL_MAX_ROWS = 1_048_576
+
+
+def _as_table(val: Any) -> np.ndarray:
+    """Shape a .mat variable as a 2-D array of rows.
+
+    Scalars become 1x1, vectors a single column, and arrays with more than
+    two dimensions are flattened to (first dim, rest).
+    """
+    arr = np.asarray(val)
+    if arr.ndim == 0:
+        return arr.reshape(1, 1)
+    if arr.ndim == 1:
+        return arr.reshape(-1, 1)
+    if arr.ndim > 2:
+        return arr.reshape(arr.shape[0], -1)
+    return arr
+
+
 def mat_to_excel(mat_file: str, output_path: str) -> str:
     """Convert a .mat file to .xlsx.
 
-    Each variable in the .mat file becomes a separate sheet.
+    Each variable in the .mat file becomes a separate sheet. Vectors are
+    written as a single column; variables longer than Excel's row limit
+    continue on sheets suffixed ``_2``, ``_3``, ... Numeric variables are
+    streamed in row blocks (see `tools.xlsx_stream`), so memory stays
+    bounded by one block rather than the whole workbook. NaN/Inf values,
+    which Excel cannot store, are left as empty cells.
 
     Args:
         mat_file: Path to the .mat file.
@@ -84,27 +383,31 @@ def mat_to_excel(mat_file: str, output_path: str) -> str:
     out = Path(output_path)
     out.parent.mkdir(parents=True, exist_ok=True)
 
-    wb = openpyxl.Workbook()
-    first = True
+    titles: set[str] = set()
 
-    for key, val in data.items():
-        if key.startswith("_"):
-            continue
+    def _unique_title(base: str) -> str:
+        title, n = base[:31], 1
+        while title.lower() in titles:
+            n += 1
+            suffix = f"_{n}"
+            title = base[:31 - len(suffix)] + suffix
+        titles.add(title.lower())
+        return title
 
-        ws = wb.active if first else wb.create_sheet(title=key[:31])
-        if first:
-            ws.title = key[:31]
-            first = False
+    with XlsxStreamWriter(out) as wb:
+        for key, val in data.items():
+            if key.startswith("_"):
+                continue
 
-        arr = np.atleast_2d(np.array(val))
-        for r_idx, row in enumerate(arr, 1):
-            for c_idx, cell in enumerate(row, 1):
-                ws.cell(row=r_idx, column=c_idx, value=float(cell) if np.isscalar(cell) else str(cell))
+            arr = _as_table(val)
+            for part, start in enumerate(range(0, max(arr.shape[0], 1), EXCEL_MAX_ROWS), 1):
+                base = key if part == 1 else f"{key[:31 - len(str(part)) - 1]}_{part}"
+                with wb.sheet(_unique_title(base)) as ws:
+                    ws.append_array(arr[start:start + EXCEL_MAX_ROWS])
 
-    if first:
-        # No data variables found
-        wb.active.title = "empty"
+        if not titles:
+            # No data variables found
+            with wb.sheet("empty"):
+                pass
 
-    wb.save(out)
-    wb.close()
     return str(out)
@@ -0,0 +1,204 @@
+"""Bounded, non-blocking execution of MCP tool calls.
+
+Tool handlers in server.py are coroutines that hand the actual work to one
+of three pools, so a slow call never blocks the event loop (and with it
+every other tool call):
+
+- "process": CPU-bound work (openpyxl, matplotlib, docx, scipy) runs in a
+  process pool so it does not hold the server's GIL.
+- "thread": short calls that rely on in-process state (the DataFrame
+  cache) or wait on a subprocess briefly run in a thread pool.
+- "matlab": MATLAB runs, which hold a thread for minutes while they wait on
+  the MATLAB process, get their own thread pool so they cannot starve the
+  "thread" tools.
+
+Each tool also has a concurrency limit (by default the size of its pool);
+calls over the limit queue on an asyncio semaphore, and queue depth and
+timings are reported by `metrics`.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable
+
+
+def _warm_worker() -> None:
+    """Import the heavy libraries once per worker process."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+    import openpyxl  # noqa: F401
+    import pandas  # noqa: F401
+
+
+def parse_limits(spec: str) -> dict[str, int]:
+    """Parse "tool=N,tool2=M" into a dict."""
+    limits: dict[str, int] = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        name, _, value = item.partition("=")
+        limits[name.strip()] = int(value)
+    return limits
+
+
+@dataclass
+class _ToolStats:
+    limit: int
+    semaphore: asyncio.Semaphore | None = None
+    queued: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    max_queued: int = 0
+    wait_seconds: float = 0.0
+    run_seconds: float = 0.0
+
+    def snapshot(self) -> dict[str, Any]:
+        done = self.completed + self.failed
+        return {
+            "limit": self.limit,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "max_queued": self.max_queued,
+            "avg_wait_ms": round(1000 * self.wait_seconds / done, 2) if done else 0.0,
+            "avg_run_ms": round(1000 * self.run_seconds / done, 2) if done else 0.0,
+        }
+
+
+class ToolExecutor:
+    """Dispatch tool calls to process/thread pools with per-tool limits."""
+
+    def __init__(
+        self,
+        process_workers: int | None = None,
+        thread_workers: int | None = None,
+        matlab_workers: int | None = None,
+        limits: dict[str, int] | None = None,
+        default_limit: int | None = None,
+    ):
+        cpus = os.cpu_count() or 1
+        self.process_workers = process_workers or min(4, cpus)
+        self.thread_workers = thread_workers or 8
+        self.matlab_workers = matlab_workers or 4
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._matlab_pool: ThreadPoolExecutor | None = None
+        self._stats: dict[str, _ToolStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> ToolExecutor:
+        """Build from MCP_PROCESS_WORKERS, MCP_THREAD_WORKERS, MCP_MATLAB_WORKERS
+        and MCP_TOOL_LIMITS."""
+        return cls(
+            process_workers=int(os.environ.get("MCP_PROCESS_WORKERS", "0")) or None,
+            thread_workers=int(os.environ.get("MCP_THREAD_WORKERS", "0")) or None,
+            matlab_workers=int(os.environ.get("MCP_MATLAB_WORKERS", "0")) or None,
+            limits=parse_limits(os.environ.get("MCP_TOOL_LIMITS", "")),
+        )
+
+    def _pool(self, kind: str) -> ProcessPoolExecutor | ThreadPoolExecutor:
+        with self._lock:
+            if kind == "process":
+                if self._process_pool is None:
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.process_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_warm_worker,
+                    )
+                return self._process_pool
+            if kind == "thread":
+                if self._thread_pool is None:
+                    self._thread_pool = ThreadPoolExecutor(
+                        max_workers=self.thread_workers, thread_name_prefix="mcp-tool",
+                    )
+                return self._thread_pool
+            if kind == "matlab":
+                if self._matlab_pool is None:
+                    self._matlab_pool = ThreadPoolExecutor(
+                        max_workers=self.matlab_workers, thread_name_prefix="mcp-matlab",
+                    )
+                return self._matlab_pool
+        raise ValueError(f"Unknown executor kind: {kind}")
+
+    def prewarm(self) -> None:
+        """Start the worker processes now rather than on the first call."""
+        pool = self._pool("process")
+        for future in [pool.submit(os.getpid) for _ in range(self.process_workers)]:
+            future.result()
+
+    def _tool_stats(self, tool: str, kind: str) -> _ToolStats:
+        stats = self._stats.get(tool)
+        if stats is None:
+            workers = {"process": self.process_workers, "matlab": self.matlab_workers}
+            default = self.default_limit or workers.get(kind, self.thread_workers)
+            stats = _ToolStats(limit=self.limits.get(tool, default))
+            self._stats[tool] = stats
+        if stats.semaphore is None:
+            stats.semaphore = asyncio.Semaphore(stats.limit)
+        return stats
+
+    async def run(self, tool: str, kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` for ``tool`` in the given pool.
+
+        Args:
+            tool: Tool name, used for the concurrency limit and metrics.
+            kind: "process", "thread" or "matlab".
+            fn: The function to call. For "process" it and its arguments
+                must be picklable (i.e. a module-level function).
+
+        Returns:
+            The function's return value.
+        """
+        stats = self._tool_stats(tool, kind)
+        pool = self._pool(kind)
+        loop = asyncio.get_running_loop()
+
+        queued_at = time.perf_counter()
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        try:
+            await stats.semaphore.acquire()
+        finally:
+            stats.queued -= 1
+        started = time.perf_counter()
+        stats.wait_seconds += started - queued_at
+        stats.running += 1
+        try:
+            result = await loop.run_in_executor(pool, partial(fn, *args, **kwargs))
+        except BaseException:
+            stats.failed += 1
+            raise
+        else:
+            stats.completed += 1
+            return result
+        finally:
+            stats.running -= 1
+            stats.run_seconds += time.perf_counter() - started
+            stats.semaphore.release()
+
+    def metrics(self) -> dict[str, Any]:
+        """Per-tool queue depth, concurrency and timing counters."""
+        return {
+            "process_workers": self.process_workers,
+            "thread_workers": self.thread_workers,
+            "matlab_workers": self.matlab_workers,
+            "tools": {name: s.snapshot() for name, s in sorted(self._stats.items())},
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for pool in (self._process_pool, self._thread_pool, self._matlab_pool):
+                if pool is not None:
+                    pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = self._thread_pool = self._matlab_pool = None
@@ -0,0 +1,152 @@
+"""Block until something changes in a directory, without busy polling.
+
+Uses inotify on Linux and kqueue on macOS/BSD, and falls back to a short
+poll interval elsewhere. `DirectoryWatcher.wake` interrupts a pending
+wait from another thread (e.g. when a watched process exits).
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+from pathlib import Path
+from typing import Any
+
+POLL_INTERVAL = 0.05
+
+# inotify(7) event masks
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+
+def _libc() -> Any:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1  # noqa: B018 — probe for the symbol
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class DirectoryWatcher:
+    """Context manager that waits for file events in one directory."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.backend = "poll"
+        self._wake_r, self._wake_w = os.pipe()
+        self._closed = False
+        self._lock = threading.Lock()
+        os.set_blocking(self._wake_r, False)
+        self._inotify_fd: int | None = None
+        self._kq: Any = None
+        self._kq_fds: dict[str, int] = {}
+
+        libc = _libc()
+        if libc is not None:
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+            mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+            if fd >= 0 and libc.inotify_add_watch(fd, os.fsencode(self.directory), mask) >= 0:
+                self._inotify_fd = fd
+                self.backend = "inotify"
+            elif fd >= 0:
+                os.close(fd)
+        elif hasattr(select, "kqueue"):
+            self._kq = select.kqueue()
+            self.backend = "kqueue"
+            self._kq_watch(self.directory)
+
+    # ── kqueue helpers ──────────────────────────────────────────────
+
+    def _kq_watch(self, path: Path) -> None:
+        key = str(path)
+        if key in self._kq_fds:
+            return
+        try:
+            fd = os.open(path, getattr(os, "O_EVTONLY", os.O_RDONLY))
+        except OSError:
+            return
+        self._kq_fds[key] = fd
+        event = select.kevent(
+            fd,
+            filter=select.KQ_FILTER_VNODE,
+            flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+            fflags=select.KQ_NOTE_WRITE | select.KQ_NOTE_EXTEND | select.KQ_NOTE_ATTRIB,
+        )
+        self._kq.control([event], 0, 0)
+
+    def watch_file(self, path: str | Path) -> None:
+        """Also report writes to an existing file (needed for kqueue only)."""
+        if self._kq is not None and Path(path).exists():
+            self._kq_watch(Path(path))
+
+    # ── Waiting ─────────────────────────────────────────────────────
+
+    def wake(self) -> None:
+        """Interrupt a pending `wait` from another thread."""
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                os.write(self._wake_w, b"\0")
+            except OSError:
+                pass
+
+    def wait(self, timeout: float | None) -> bool:
+        """Wait for a file event or a wake-up.
+
+        Returns:
+            True if something happened, False on timeout. With the polling
+            backend, returns after at most POLL_INTERVAL seconds.
+        """
+        fds = [self._wake_r]
+        if self._inotify_fd is not None:
+            fds.append(self._inotify_fd)
+        elif self._kq is not None:
+            fds.append(self._kq.fileno())
+        else:
+            timeout = POLL_INTERVAL if timeout is None else min(timeout, POLL_INTERVAL)
+
+        ready, _, _ = select.select(fds, [], [], timeout)
+        for fd in ready:
+            self._drain(fd)
+        return bool(ready) or self.backend == "poll"
+
+    def _drain(self, fd: int) -> None:
+        if self._kq is not None and fd == self._kq.fileno():
+            self._kq.control(None, 64, 0)
+            return
+        try:
+            while os.read(fd, 4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for fd in (self._wake_r, self._wake_w, self._inotify_fd, *self._kq_fds.values()):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        if self._kq is not None:
+            self._kq.close()
+
+    def __enter__(self) -> DirectoryWatcher:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,341 @@
+"""Background jobs for long-running tools.
+
+`submit` records a job in a SQLite table and runs it on a small thread
+pool, so the MCP request returns immediately; `status`, `result` and
+`cancel` look it up by id. MATLAB stdout is streamed into the job's
+progress tail while it runs.
+
+The table lives in JOBS_DB (default ``$PROJECT_ROOT/data/.cache/jobs.sqlite3``)
+and survives restarts: jobs that were queued or running when the server
+stopped are marked "interrupted" on startup. Each job records the server
+process that owns it, so several servers on one machine can share the
+table without marking each other's live jobs interrupted.
+"""
+from __future__ import annotations
+
+import atexit
+import collections
+import json
+import os
+import platform
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+PROGRESS_LINES = 50
+PROGRESS_FLUSH_INTERVAL = 0.5
+
+ACTIVE = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    owner TEXT
+)
+"""
+
+
+def _default_db() -> Path:
+    root = Path(os.environ.get("PROJECT_ROOT", "."))
+    return Path(os.environ.get("JOBS_DB", root / "data" / ".cache" / "jobs.sqlite3"))
+
+
+# ── Job table ────────────────────────────────────────────────────────
+
+class JobStore:
+    """SQLite-backed job table, safe to share between threads."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        if "owner" not in {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        # "<pid>:<instance>" of this store, recorded on every job it creates.
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+
+    def create(self, tool: str, params: dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, tool, params, status, created, owner) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, tool, json.dumps(params, ensure_ascii=False), time.time(), self.owner),
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False, default=str)
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        if job["result"] is not None:
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def mark_interrupted(self) -> int:
+        """Mark jobs left queued/running by a server that has stopped as interrupted.
+
+        Jobs owned by another live process are left alone. Jobs of an
+        earlier store in this process, or without an owner (tables from
+        before owners were recorded), count as stopped.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, owner FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchall()
+            orphaned = [row["id"] for row in rows if self._orphaned(row["owner"])]
+            if orphaned:
+                self._conn.execute(
+                    f"UPDATE jobs SET status = 'interrupted', finished = ? "
+                    f"WHERE id IN ({', '.join('?' * len(orphaned))})",
+                    (time.time(), *orphaned),
+                )
+        return len(orphaned)
+
+    def _orphaned(self, owner: str | None) -> bool:
+        if owner == self.owner:
+            return False
+        pid = owner.partition(":")[0] if owner else ""
+        if not pid.isdigit() or int(pid) == os.getpid():
+            return True
+        return not _pid_alive(int(pid))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this pid is running on this machine."""
+    if platform.system() == "Windows":
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows.
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        try:
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        finally:
+            kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ── Runners ──────────────────────────────────────────────────────────
+
+class JobContext:
+    """Passed to a runner: progress reporting and cancellation."""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.job_id = job_id
+        self.cancel = threading.Event()
+        self._store = store
+        self._tail: collections.deque[str] = collections.deque(maxlen=PROGRESS_LINES)
+        self._flushed = 0.0
+        self._lock = threading.Lock()
+
+    def progress(self, line: str) -> None:
+        """Append a line to the job's progress tail (flushed at most every 0.5 s)."""
+        with self._lock:
+            self._tail.append(line)
+            now = time.monotonic()
+            if now - self._flushed < PROGRESS_FLUSH_INTERVAL:
+                return
+            self._flushed = now
+            text = "\n".join(self._tail)
+        self._store.update(self.job_id, progress=text)
+
+    def flush(self) -> None:
+        with self._lock:
+            text = "\n".join(self._tail)
+        self._store.update(self.job_id, progress=text)
+
+
+Runner = Callable[[dict[str, Any], JobContext], Any]
+
+
+def _run_matlab(params: dict[str, Any], ctx: JobContext) -> Any:
+    from tools.matlab import matlab_run
+    return matlab_run(
+        params["script"], params.get("work_dir"), params.get("warm", True),
+        on_output=ctx.progress, cancel=ctx.cancel, cache=params.get("cache", False),
+    )
+
+
+def _run_matlab_gui(params: dict[str, Any], ctx: JobContext) -> Any:
+    from tools.matlab import matlab_run_with_gui
+    return matlab_run_with_gui(
+        params["script"], params.get("work_dir"), params.get("timeout"), cancel=ctx.cancel,
+    )
+
+
+def _convert_mat_to_excel(params: dict[str, Any], ctx: JobContext) -> Any:
+    from tools.excel import mat_to_excel
+    ctx.progress(f"Converting {params['mat_file']}")
+    return {"path": mat_to_excel(params["mat_file"], params["output_path"])}
+
+
+RUNNERS: dict[str, Runner] = {
+    "run_matlab": _run_matlab,
+    "run_matlab_gui": _run_matlab_gui,
+    "convert_mat_to_excel": _convert_mat_to_excel,
+}
+
+
+# ── Manager ──────────────────────────────────────────────────────────
+
+class JobManager:
+    """Runs submitted jobs in the background and tracks them in a JobStore."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        runners: dict[str, Runner] | None = None,
+        workers: int = 2,
+    ):
+        self.store = store
+        self.runners = dict(RUNNERS if runners is None else runners)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-job")
+        self._active: dict[str, tuple[JobContext, Future]] = {}
+        self._lock = threading.Lock()
+        self.interrupted = store.mark_interrupted()
+
+    def submit(self, tool: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Queue ``tool`` with ``params`` and return the new job record.
+
+        Raises:
+            ValueError: If ``tool`` cannot run as a job.
+        """
+        runner = self.runners.get(tool)
+        if runner is None:
+            raise ValueError(f"Unknown job tool: {tool}. Available: {sorted(self.runners)}")
+        job_id = self.store.create(tool, params)
+        ctx = JobContext(self.store, job_id)
+        with self._lock:
+            future = self._pool.submit(self._execute, runner, params, ctx)
+            self._active[job_id] = (ctx, future)
+        return self.status(job_id)
+
+    def _execute(self, runner: Runner, params: dict[str, Any], ctx: JobContext) -> None:
+        if ctx.cancel.is_set():
+            # Cancelled after the worker picked the job up but before it ran.
+            self.store.update(ctx.job_id, status="cancelled", finished=time.time())
+            with self._lock:
+                self._active.pop(ctx.job_id, None)
+            return
+        self.store.update(ctx.job_id, status="running", started=time.time())
+        try:
+            result = runner(params, ctx)
+        except Exception as e:
+            ctx.flush()
+            self.store.update(
+                ctx.job_id, status="failed", error=f"{type(e).__name__}: {e}", finished=time.time(),
+            )
+        else:
+            ctx.flush()
+            cancelled = ctx.cancel.is_set() or (isinstance(result, dict) and result.get("cancelled"))
+            self.store.update(
+                ctx.job_id,
+                status="cancelled" if cancelled else "succeeded",
+                result=result,
+                finished=time.time(),
+            )
+        finally:
+            with self._lock:
+                self._active.pop(ctx.job_id, None)
+
+    def _get(self, job_id: str) -> dict[str, Any]:
+        job = self.store.get(job_id)
+        if job is None:
+            raise KeyError(f"No such job: {job_id}")
+        return job
+
+    def status(self, job_id: str) -> dict[str, Any]:
+        """Job record without the result payload."""
+        job = self._get(job_id)
+        job.pop("result")
+        job["elapsed"] = round((job["finished"] or time.time()) - (job["started"] or job["created"]), 3)
+        return job
+
+    def result(self, job_id: str) -> dict[str, Any]:
+        """Full job record; 'result' is None until the job has finished."""
+        return self._get(job_id)
+
+    def cancel(self, job_id: str) -> dict[str, Any]:
+        """Request cancellation. Queued jobs never start; running jobs are stopped.
+
+        A job that has already been handed to a worker is marked cancelled
+        by that worker once it sees the request, so the returned status may
+        still be "queued" or "running" for a moment.
+        """
+        self._get(job_id)
+        with self._lock:
+            active = self._active.get(job_id)
+            if active is not None:
+                ctx, future = active
+                ctx.cancel.set()
+                if future.cancel():
+                    self.store.update(job_id, status="cancelled", finished=time.time())
+                    self._active.pop(job_id, None)
+        return self.status(job_id)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            active = list(self._active.values())
+        for ctx, _ in active:
+            ctx.cancel.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_manager: JobManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide job manager, creating it on first use.
+
+    Configured with JOBS_DB and JOBS_WORKERS (default 2).
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager(
+                JobStore(_default_db()), workers=int(os.environ.get("JOBS_WORKERS", "2")),
+            )
+            atexit.register(_manager.shutdown)
+        return _manager
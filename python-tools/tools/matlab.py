@@ -1,30 +1,114 @@
 """MATLAB tools with mock mode support."""
 from __future__ import annotations
 
+import atexit
 import json
 import os
 import platform
+import shlex
 import struct
 import subprocess
 import tempfile
+import threading
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+from tools.matlab_cache import ResultCache, snapshot
+from tools.matlab_pool import MatlabPool
 
 MOCK = os.environ.get("MATLAB_MOCK", "").lower() in ("true", "1", "yes")
 
+_engine = None
+_pool: MatlabPool | None = None
+_pool_lock = threading.Lock()
+_cache: ResultCache | None = None
+
 
 def _get_engine():
-    """Get MATLAB engine, or raise if not available and not in mock mode."""
+    """Get the shared MATLAB engine, or raise if not available and not in mock mode."""
+    global _engine
     if MOCK:
         return None
     try:
         import matlab.engine
-        return matlab.engine.start_matlab()
     except ImportError:
         raise RuntimeError(
             "MATLAB Engine for Python is not installed. "
             "Set MATLAB_MOCK=true to use mock mode."
         )
+    if _engine is None:
+        _engine = matlab.engine.start_matlab()
+    return _engine
+
+
+def _pool_command() -> list[str] | None:
+    """Command used to start a warm session, or None when pooling is unavailable.
+
+    MATLAB_POOL_COMMAND overrides the MATLAB executable, e.g. with a local
+    stand-in when MATLAB_MOCK is set.
+    """
+    override = os.environ.get("MATLAB_POOL_COMMAND")
+    if override:
+        return shlex.split(override)
+    if MOCK:
+        return None
+    return _find_matlab_executable() + ["-nosplash", "-nodesktop"]
+
+
+def _get_pool() -> MatlabPool | None:
+    """Return the process-wide warm session pool, creating it on first use.
+
+    Configured with MATLAB_POOL_SIZE (0 disables pooling; default 1, or 0 on
+    Windows where MATLAB does not read commands from stdin),
+    MATLAB_POOL_IDLE_TIMEOUT and MATLAB_POOL_HEALTH_INTERVAL (seconds).
+    """
+    global _pool
+    default_size = "0" if platform.system() == "Windows" else "1"
+    size = int(os.environ.get("MATLAB_POOL_SIZE", default_size))
+    if size <= 0:
+        return None
+
+    with _pool_lock:
+        if _pool is None:
+            command = _pool_command()
+            if command is None:
+                return None
+            _pool = MatlabPool(
+                command,
+                size=size,
+                idle_timeout=float(os.environ.get("MATLAB_POOL_IDLE_TIMEOUT", "1800")),
+                health_interval=float(os.environ.get("MATLAB_POOL_HEALTH_INTERVAL", "60")),
+            )
+            atexit.register(_pool.close)
+        return _pool
+
+
+def matlab_pool_stats() -> dict[str, Any] | None:
+    """Return warm pool statistics, or None if no pool has been started."""
+    return _pool.stats() if _pool is not None else None
+
+
+def _get_cache() -> ResultCache:
+    """Return the result cache for ``matlab_run(cache=True)``.
+
+    Stored in MATLAB_CACHE_DIR (default ``$PROJECT_ROOT/data/.cache/matlab``)
+    and bounded by MATLAB_CACHE_BYTES (default 1 GiB).
+    """
+    global _cache
+    with _pool_lock:
+        if _cache is None:
+            root = Path(os.environ.get("PROJECT_ROOT", "."))
+            _cache = ResultCache(
+                os.environ.get("MATLAB_CACHE_DIR", root / "data" / ".cache" / "matlab"),
+                max_bytes=int(os.environ.get("MATLAB_CACHE_BYTES", str(1 << 30))),
+            )
+        return _cache
+
+
+def matlab_cache_stats() -> dict[str, Any] | None:
+    """Return result cache statistics, or None if the cache has not been used."""
+    return _cache.stats() if _cache is not None else None
 
 
 # ── Open MATLAB GUI ──────────────────────────────────────────────────
@@ -150,61 +234,178 @@ def matlab_generate_script(
 
 # ── Script execution ─────────────────────────────────────────────────
 
-def matlab_run(script: str, work_dir: str | None = None) -> dict[str, Any]:
+def matlab_run(
+    script: str,
+    work_dir: str | None = None,
+    warm: bool = True,
+    on_output: Callable[[str], None] | None = None,
+    cancel: threading.Event | None = None,
+    cache: bool = False,
+) -> dict[str, Any]:
     """Run a MATLAB script and return the result.
 
     Uses the locally installed MATLAB via subprocess (no matlab.engine needed).
+    By default the script runs on a warm session from the shared pool (see
+    `_get_pool`); the workspace is reset after every call.
+
+    With ``cache``, a previous successful run of the same script with the
+    same referenced input files is replayed from the result cache (see
+    `tools.matlab_cache`): its stdout is returned and its output files are
+    copied into ``work_dir`` without starting MATLAB.
 
     Args:
         script: MATLAB script content or path to .m file.
         work_dir: Working directory for execution.
+        warm: Use a pooled MATLAB session instead of a cold `-batch` process.
+        on_output: Optional callback invoked with each line of stdout.
+        cancel: Optional event that stops MATLAB when set.
+        cache: Reuse (and store) results for identical script and inputs.
 
     Returns:
-        Dict with 'output' (stdout) and 'files' (created files).
+        Dict with 'output' (stdout) and 'files' (created files), plus
+        'cancelled' when the run was stopped and 'cached' when it was
+        served from the cache.
     """
     wd = Path(work_dir) if work_dir else Path(tempfile.mkdtemp())
     wd.mkdir(parents=True, exist_ok=True)
 
-    if MOCK:
+    if not cache:
+        return _run_script(script, wd, warm, on_output, cancel)
+
+    result_cache = _get_cache()
+    key = result_cache.key(script, wd)
+    stored = result_cache.get(key, wd)
+    if stored is not None:
+        if on_output is not None:
+            for line in stored["output"].splitlines():
+                on_output(line)
+        files = sorted(str(f) for f in wd.iterdir() if f.name != "mcp_run.m")
+        return {**stored, "files": files, "cached": True}
+
+    before = snapshot(wd)
+    result = _run_script(script, wd, warm, on_output, cancel)
+    succeeded = result.get("returncode", 0) == 0 and not result.get("errors") and not result.get("cancelled")
+    if succeeded:
+        after = snapshot(wd)
+        artifacts = sorted(
+            name for name, sig in after.items()
+            if name != "mcp_run.m" and before.get(name) != sig
+        )
+        stored = {k: v for k, v in result.items() if k not in ("files", "session")}
+        result_cache.put(key, stored, wd, artifacts)
+        # Files the run created are outputs, not inputs of the next run here.
+        result_cache.record_outputs(script, [name for name in artifacts if name not in before])
+    return {**result, "cached": False}
+
+
+def _run_script(
+    script: str,
+    wd: Path,
+    warm: bool,
+    on_output: Callable[[str], None] | None,
+    cancel: threading.Event | None,
+) -> dict[str, Any]:
+    """Run ``script`` in ``wd`` on a pooled session or a cold process."""
+    pool = _get_pool() if warm else None
+
+    if MOCK and pool is None:
         mat_path = wd / "results.mat"
         fig_path = wd / "figure.png"
         _write_mock_mat(mat_path)
         _write_mock_png(fig_path)
-        return {
-            "output": "[MOCK] Script executed successfully.\n"
-                      f"Created: {mat_path}, {fig_path}",
-            "files": [str(mat_path), str(fig_path)],
-        }
+        output = f"[MOCK] Script executed successfully.\nCreated: {mat_path}, {fig_path}"
+        if on_output is not None:
+            for line in output.splitlines():
+                on_output(line)
+        return {"output": output, "files": [str(mat_path), str(fig_path)]}
 
     # Write script to file (name must be a valid MATLAB identifier)
     script_path = wd / "mcp_run.m"
     script_path.write_text(script)
 
+    if pool is not None:
+        result = pool.run(wd.resolve(), timeout=600, on_output=on_output, cancel=cancel)
+        result["output"] = result["output"] or "MATLAB execution completed."
+        result["files"] = sorted(str(f) for f in wd.iterdir() if f.name != "mcp_run.m")
+        return result
+
     # Run via local MATLAB subprocess (headless / no GUI)
     matlab_base = _find_matlab_executable()
     matlab_cmd = f"cd('{wd}'); mcp_run"
     cmd = matlab_base + ["-nosplash", "-nodesktop", "-batch", matlab_cmd]
 
-    proc = subprocess.run(
-        cmd, capture_output=True, timeout=600,
+    output_text, error_text, returncode, cancelled = _run_streaming(
+        cmd, timeout=600, on_output=on_output, cancel=cancel,
     )
 
     files = sorted(str(f) for f in wd.iterdir() if f.name != "mcp_run.m")
 
-    output_text = proc.stdout.decode(errors="replace") if proc.stdout else ""
-    error_text = proc.stderr.decode(errors="replace") if proc.stderr else ""
-
     result: dict[str, Any] = {
         "output": output_text or "MATLAB execution completed.",
         "files": files,
-        "returncode": proc.returncode,
+        "returncode": returncode,
     }
     if error_text:
         result["errors"] = error_text
+    if cancelled:
+        result["cancelled"] = True
 
     return result
 
 
+def _run_streaming(
+    cmd: list[str],
+    timeout: float,
+    on_output: Callable[[str], None] | None = None,
+    cancel: threading.Event | None = None,
+) -> tuple[str, str, int, bool]:
+    """Run a command, passing stdout lines to ``on_output`` as they arrive.
+
+    Returns:
+        Tuple of (stdout, stderr, returncode, cancelled).
+
+    Raises:
+        subprocess.TimeoutExpired: If the command runs longer than ``timeout``.
+    """
+    proc = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, errors="replace",
+    )
+    stderr: list[str] = []
+    reader = threading.Thread(target=lambda: stderr.extend(proc.stderr), daemon=True)
+    reader.start()
+
+    stopped = {"timeout": False, "cancel": False}
+    finished = threading.Event()
+
+    def _watch() -> None:
+        deadline = time.monotonic() + timeout
+        while not finished.wait(0.2):
+            if cancel is not None and cancel.is_set():
+                stopped["cancel"] = True
+            elif time.monotonic() > deadline:
+                stopped["timeout"] = True
+            else:
+                continue
+            _stop_process(proc)
+            return
+    threading.Thread(target=_watch, daemon=True).start()
+
+    stdout: list[str] = []
+    try:
+        for line in proc.stdout:
+            stdout.append(line)
+            if on_output is not None:
+                on_output(line.rstrip("\n"))
+        proc.wait()
+    finally:
+        finished.set()
+    reader.join()
+
+    if stopped["timeout"]:
+        raise subprocess.TimeoutExpired(cmd, timeout, "".join(stdout), "".join(stderr))
+    return "".join(stdout), "".join(stderr), proc.returncode, stopped["cancel"]
+
+
 # ── Convergence check ────────────────────────────────────────────────
 
 def matlab_check_convergence(
@@ -331,21 +532,127 @@ def _find_matlab_executable() -> list[str]:
         raise FileNotFoundError("MATLAB not found in PATH.")
 
 
-def matlab_run_with_gui(script: str, work_dir: str | None = None) -> dict[str, Any]:
+def _read_result(result_file: Path) -> dict[str, Any] | None:
+    """Parse the result JSON if it is present and complete."""
+    try:
+        content = result_file.read_text()
+        if content.strip():
+            return json.loads(content)
+    except (json.JSONDecodeError, OSError):
+        pass
+    return None
+
+
+def _stop_process(proc: subprocess.Popen, grace: float = 5.0) -> None:
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def _await_gui_result(
+    proc: subprocess.Popen,
+    wd: Path,
+    result_file: Path,
+    timeout: float | None,
+    cancel: threading.Event | None = None,
+) -> dict[str, Any]:
+    """Wait for the result JSON, process exit, timeout or cancellation.
+
+    File events wake the wait immediately (inotify/kqueue, see
+    `tools.filewatch`), and a helper thread wakes it when MATLAB exits.
+    """
+    from tools.filewatch import DirectoryWatcher
+
+    def _files() -> list[str]:
+        return sorted(str(f) for f in wd.iterdir() if f.name != "mcp_run.m")
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    with DirectoryWatcher(wd) as watcher:
+        def _wait_exit() -> None:
+            proc.wait()
+            watcher.wake()
+        threading.Thread(target=_wait_exit, daemon=True).start()
+
+        if cancel is not None:
+            def _wait_cancel() -> None:
+                while not cancel.wait(1.0):
+                    if proc.poll() is not None:
+                        return
+                watcher.wake()
+            threading.Thread(target=_wait_cancel, daemon=True).start()
+
+        while True:
+            watcher.watch_file(result_file)
+            experiment_data = _read_result(result_file)
+            if experiment_data is not None:
+                return {
+                    "output": "MATLAB GUI execution completed.",
+                    "experiment_result": experiment_data,
+                    "files": _files(),
+                }
+
+            # MATLAB process exited without producing result JSON
+            if proc.poll() is not None:
+                stdout, stderr = proc.communicate()
+                output_text = stdout.decode(errors="replace") if stdout else ""
+                error_text = stderr.decode(errors="replace") if stderr else ""
+                return {
+                    "output": output_text or "MATLAB exited without result JSON.",
+                    "errors": error_text if error_text else None,
+                    "returncode": proc.returncode,
+                    "files": _files(),
+                }
+
+            if cancel is not None and cancel.is_set():
+                _stop_process(proc)
+                return {
+                    "output": "MATLAB GUI execution cancelled.",
+                    "cancelled": True,
+                    "returncode": proc.returncode,
+                    "files": _files(),
+                }
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                _stop_process(proc)
+                return {
+                    "output": f"MATLAB GUI execution timed out after {timeout} s.",
+                    "timed_out": True,
+                    "returncode": proc.returncode,
+                    "files": _files(),
+                }
+
+            watcher.wait(remaining)
+
+
+def matlab_run_with_gui(
+    script: str,
+    work_dir: str | None = None,
+    timeout: float | None = None,
+    cancel: threading.Event | None = None,
+) -> dict[str, Any]:
     """Run a MATLAB script via subprocess with GUI (figure windows visible).
 
-    Launches MATLAB GUI in the background and polls for experiment_result.json.
-    No timeout — waits until the result file appears or MATLAB exits.
+    Launches MATLAB GUI in the background and returns as soon as
+    experiment_result.json is written, MATLAB exits, the timeout expires or
+    ``cancel`` is set. On timeout or cancellation MATLAB is terminated.
 
     Args:
         script: MATLAB script content.
         work_dir: Working directory for execution.
+        timeout: Seconds to wait. Defaults to MATLAB_GUI_TIMEOUT (1800 s);
+            0 or a negative value waits indefinitely.
+        cancel: Optional event that aborts the run when set.
 
     Returns:
-        Dict with 'output' and 'files' (created files).
+        Dict with 'output' and 'files' (created files), plus 'timed_out'
+        or 'cancelled' when the run was stopped.
     """
-    import time
-
     wd = Path(work_dir) if work_dir else Path(tempfile.mkdtemp())
     wd.mkdir(parents=True, exist_ok=True)
 
@@ -360,6 +667,11 @@ def matlab_run_with_gui(script: str, work_dir: str | None = None) -> dict[str, A
             "files": [str(mat_path), str(fig_path)],
         }
 
+    if timeout is None:
+        timeout = float(os.environ.get("MATLAB_GUI_TIMEOUT", "1800"))
+    if timeout <= 0:
+        timeout = None
+
     script_path = wd / "mcp_run.m"
     script_path.write_text(script)
 
@@ -373,37 +685,7 @@ def matlab_run_with_gui(script: str, work_dir: str | None = None) -> dict[str, A
     cmd = matlab_base + ["-nosplash", "-r", matlab_cmd]
 
     proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-    # Poll for experiment_result.json — no timeout
-    while True:
-        if result_file.exists():
-            try:
-                content = result_file.read_text()
-                if content.strip():
-                    experiment_data = json.loads(content)
-                    files = sorted(str(f) for f in wd.iterdir() if f.name != "mcp_run.m")
-                    return {
-                        "output": "MATLAB GUI execution completed.",
-                        "experiment_result": experiment_data,
-                        "files": files,
-                    }
-            except (json.JSONDecodeError, OSError):
-                pass
-
-        # MATLAB process exited without producing result JSON
-        if proc.poll() is not None:
-            stdout, stderr = proc.communicate()
-            output_text = stdout.decode(errors="replace") if stdout else ""
-            error_text = stderr.decode(errors="replace") if stderr else ""
-            files = sorted(str(f) for f in wd.iterdir() if f.name != "mcp_run.m")
-            return {
-                "output": output_text or "MATLAB exited without result JSON.",
-                "errors": error_text if error_text else None,
-                "returncode": proc.returncode,
-                "files": files,
-            }
-
-        time.sleep(1)
+    return _await_gui_result(proc, wd, result_file, timeout, cancel)
 
 
 def _write_mock_mat(path: Path) -> None:
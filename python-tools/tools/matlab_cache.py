@@ -0,0 +1,194 @@
+"""Content-addressed cache for deterministic MATLAB script runs.
+
+An entry is keyed by the SHA-256 of the script text plus the contents of
+every existing file the script names in a string literal (e.g. the
+``input_mat`` of a generated analysis script), so editing either the
+script or an input invalidates it. Files an earlier run of the same script
+created (its ``save``/``saveas`` outputs) are not inputs and are left out,
+so rerunning in the same work_dir still hits. Entries hold the run's stdout and the
+files it created or modified, and are evicted least-recently-used once
+the cache exceeds its size budget.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+# MATLAB char ('...', quotes doubled) and string ("...") literals.
+_LITERAL_RE = re.compile(r"'((?:[^'\n]|'')+)'|\"((?:[^\"\n]|\"\")+)\"")
+
+_SCRIPT_NAME = "mcp_run.m"
+
+
+def _file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def referenced_files(script: str, work_dir: Path) -> list[Path]:
+    """Existing files named by string literals in ``script``.
+
+    Relative names are resolved against ``work_dir``.
+    """
+    found: dict[Path, None] = {}
+    for m in _LITERAL_RE.finditer(script):
+        text = (m.group(1) or "").replace("''", "'") or (m.group(2) or "").replace('""', '"')
+        if not text.strip() or len(text) > 4096:
+            continue
+        p = Path(text).expanduser()
+        p = p if p.is_absolute() else work_dir / p
+        try:
+            if p.is_file() and p.name != _SCRIPT_NAME:
+                found[p.resolve()] = None
+        except OSError:
+            continue
+    return sorted(found)
+
+
+def snapshot(work_dir: Path) -> dict[str, tuple[int, int]]:
+    """(mtime_ns, size) of each file in ``work_dir``, to detect outputs."""
+    files = {}
+    for f in work_dir.iterdir():
+        if f.is_file():
+            st = f.stat()
+            files[f.name] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+class ResultCache:
+    """On-disk LRU cache of MATLAB run results.
+
+    Each entry is a directory ``<key>/`` with ``result.json`` (stdout and
+    the artifact names) and ``files/`` (the artifacts). Recency is tracked
+    with the mtime of ``result.json``.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _outputs_path(self, script: str) -> Path:
+        return self.root / ".outputs" / f"{hashlib.sha256(script.encode()).hexdigest()}.json"
+
+    def outputs(self, script: str) -> set[str]:
+        """Names of the files earlier runs of ``script`` created in their work_dir."""
+        try:
+            return set(json.loads(self._outputs_path(script).read_text()))
+        except (OSError, json.JSONDecodeError):
+            return set()
+
+    def record_outputs(self, script: str, names: list[str]) -> None:
+        """Remember files a run of ``script`` created, so `key` skips them."""
+        path = self._outputs_path(script)
+        with self._lock:
+            known = self.outputs(script)
+            if known.issuperset(names):
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(sorted(known.union(names)), f, ensure_ascii=False)
+            os.replace(tmp, path)
+
+    def key(self, script: str, work_dir: Path) -> str:
+        h = hashlib.sha256(script.encode())
+        outputs = self.outputs(script)
+        for p in referenced_files(script, work_dir):
+            # Key on the name as written relative to work_dir, so the same
+            # inputs in a different temp directory still hit.
+            try:
+                name = str(p.relative_to(work_dir.resolve()))
+            except ValueError:
+                name = str(p)
+            if name in outputs:
+                continue
+            h.update(b"\0" + name.encode() + b"\0" + _file_digest(p).encode())
+        return h.hexdigest()
+
+    def get(self, key: str, work_dir: Path) -> dict[str, Any] | None:
+        """Restore a cached run's artifacts into ``work_dir``.
+
+        Returns:
+            The stored result dict, or None on a miss.
+        """
+        entry = self.root / key
+        meta_path = entry / "result.json"
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        for name in meta["artifacts"]:
+            shutil.copy2(entry / "files" / name, work_dir / name)
+        os.utime(meta_path)
+        self.hits += 1
+        return meta["result"]
+
+    def put(self, key: str, result: dict[str, Any], work_dir: Path, artifacts: list[str]) -> None:
+        """Store a successful run and evict old entries if over budget."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.root, prefix=".tmp-"))
+        try:
+            (staging / "files").mkdir()
+            for name in artifacts:
+                shutil.copy2(work_dir / name, staging / "files" / name)
+            meta = {"result": result, "artifacts": artifacts, "stored": time.time()}
+            (staging / "result.json").write_text(json.dumps(meta, ensure_ascii=False, default=str))
+            with self._lock:
+                entry = self.root / key
+                if entry.exists():
+                    shutil.rmtree(entry)
+                os.replace(staging, entry)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for entry in self.root.iterdir() if self.root.exists() else []:
+            meta_path = entry / "result.json"
+            if entry.name.startswith(".") or not meta_path.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.rglob("*") if f.is_file())
+            entries.append((meta_path.stat().st_mtime, size, entry))
+        return entries
+
+    def evict(self) -> int:
+        """Remove least-recently-used entries until under ``max_bytes``."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                removed += 1
+            return removed
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
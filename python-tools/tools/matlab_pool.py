@@ -0,0 +1,393 @@
+"""Pool of warm, long-lived MATLAB sessions.
+
+Each session is a MATLAB process started once with ``-nodesktop`` that
+reads commands from stdin. Scripts are sent to an idle session and output
+is collected until a per-call marker is printed, so the 15–30 s MATLAB
+startup is paid once per session instead of once per script.
+"""
+from __future__ import annotations
+
+import queue
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+_MARKER = "<<MCP_{kind}:{token}>>"
+
+
+def _matlab_str(value: str | Path) -> str:
+    """Quote a value as a MATLAB char literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class MatlabSession:
+    """A single MATLAB process driven over stdin/stdout."""
+
+    def __init__(self, command: list[str], startup_timeout: float = 300.0):
+        self.command = command
+        self.proc = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            errors="replace",
+        )
+        self.home = Path.cwd()
+        self.started = time.monotonic()
+        self.last_used = self.started
+        self.runs = 0
+        self._counter = 0
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        self._reader = threading.Thread(target=self._pump, daemon=True)
+        self._reader.start()
+
+        try:
+            self.execute("", timeout=startup_timeout)
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def pid(self) -> int:
+        return self.proc.pid
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _pump(self) -> None:
+        assert self.proc.stdout is not None
+        for line in self.proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def execute(
+        self,
+        command: str,
+        timeout: float | None = None,
+        on_output: Callable[[str], None] | None = None,
+    ) -> tuple[str, str | None]:
+        """Run a MATLAB command and wait for it to finish.
+
+        Args:
+            command: MATLAB statement(s) on a single line.
+            timeout: Seconds to wait before giving up.
+            on_output: Optional callback invoked with each output line.
+
+        Returns:
+            Tuple of (captured output, error report or None).
+
+        Raises:
+            subprocess.TimeoutExpired: If the command does not finish in time.
+            RuntimeError: If the MATLAB process exits mid-command.
+        """
+        self._counter += 1
+        done = _MARKER.format(kind="DONE", token=self._counter)
+        failed = _MARKER.format(kind="ERROR", token=self._counter)
+
+        line = (
+            f"try, {command}, catch mcp_err, "
+            f"disp({_matlab_str(failed)}); disp(getReport(mcp_err, 'basic')); end; "
+            f"disp({_matlab_str(done)})\n"
+        ) if command else f"disp({_matlab_str(done)})\n"
+
+        assert self.proc.stdin is not None
+        try:
+            self.proc.stdin.write(line)
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise RuntimeError(f"MATLAB session {self.pid} is not accepting input: {e}") from e
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        output: list[str] = []
+        error_at: int | None = None
+
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(self.command, timeout or 0)
+            try:
+                item = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(self.command, timeout or 0) from None
+            if item is None:
+                raise RuntimeError(
+                    f"MATLAB session {self.pid} exited with code {self.proc.poll()}"
+                )
+
+            text = item.rstrip("\n")
+            while text.startswith(">> "):
+                text = text[3:]
+            if done in text:
+                break
+            if failed in text:
+                error_at = len(output)
+                continue
+            output.append(text)
+            if on_output is not None:
+                on_output(text)
+
+        self.last_used = time.monotonic()
+        if error_at is None:
+            return "\n".join(output), None
+        return "\n".join(output[:error_at]), "\n".join(output[error_at:])
+
+    def reset(self, timeout: float | None = 60.0) -> None:
+        """Clear the workspace, figures and open files, and return home."""
+        self.execute(
+            f"clearvars -global; clear all; close all force; fclose('all'); "
+            f"cd({_matlab_str(self.home)})",
+            timeout=timeout,
+        )
+
+    def ping(self, timeout: float = 10.0) -> bool:
+        """Return True if the session answers a no-op command in time."""
+        if not self.alive():
+            return False
+        try:
+            self.execute("", timeout=timeout)
+        except (subprocess.TimeoutExpired, RuntimeError):
+            return False
+        return True
+
+    def close(self, timeout: float = 10.0, force: bool = False) -> None:
+        """Ask MATLAB to exit, killing it if it does not (or if ``force``)."""
+        if self.alive() and force:
+            self.proc.kill()
+            self.proc.wait()
+        elif self.alive():
+            try:
+                assert self.proc.stdin is not None
+                self.proc.stdin.write("exit\n")
+                self.proc.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+            try:
+                self.proc.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        for stream in (self.proc.stdin, self.proc.stdout):
+            if stream is not None:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+
+
+class MatlabPool:
+    """Bounded pool of warm MATLAB sessions.
+
+    Sessions are started lazily up to ``size``, health-checked before reuse,
+    reset after every call and closed once idle for ``idle_timeout`` seconds.
+    A daemon thread reaps idle sessions every ``health_interval`` seconds
+    (disabled when it is 0), so they are closed even if no new work arrives.
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        size: int = 1,
+        idle_timeout: float = 1800.0,
+        health_interval: float = 60.0,
+        startup_timeout: float = 300.0,
+    ):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.command = command
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.startup_timeout = startup_timeout
+
+        self._idle: list[MatlabSession] = []
+        self._busy = 0
+        self._starting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {"started": 0, "reused": 0, "evicted": 0, "failed": 0}
+        self._stop = threading.Event()
+        if health_interval > 0:
+            threading.Thread(target=self._reap, name="matlab-pool-reaper", daemon=True).start()
+
+    # ── Session management ──────────────────────────────────────────
+
+    def _evict_idle_locked(self) -> list[MatlabSession]:
+        now = time.monotonic()
+        keep, evict = [], []
+        for s in self._idle:
+            (evict if now - s.last_used > self.idle_timeout or not s.alive() else keep).append(s)
+        self._idle = keep
+        self._stats["evicted"] += len(evict)
+        return evict
+
+    def evict_idle(self) -> int:
+        """Close sessions that have been idle longer than ``idle_timeout``."""
+        with self._cond:
+            evicted = self._evict_idle_locked()
+        for s in evicted:
+            s.close()
+        return len(evicted)
+
+    def _reap(self) -> None:
+        while not self._stop.wait(self.health_interval):
+            self.evict_idle()
+
+    def _acquire(self, timeout: float | None) -> MatlabSession:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("MATLAB pool is closed")
+                stale = self._evict_idle_locked()
+                session = None
+                spawn = False
+                if self._idle:
+                    session = self._idle.pop()
+                    self._busy += 1
+                elif self._busy + self._starting < self.size:
+                    self._starting += 1
+                    spawn = True
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a free MATLAB session")
+                    self._cond.wait(remaining)
+            for s in stale:
+                s.close()
+
+            if spawn:
+                try:
+                    session = MatlabSession(self.command, self.startup_timeout)
+                except Exception:
+                    with self._cond:
+                        self._starting -= 1
+                        self._stats["failed"] += 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._starting -= 1
+                    self._busy += 1
+                    self._stats["started"] += 1
+                return session
+
+            if session is None:
+                continue
+
+            # Health check sessions that have been sitting idle for a while.
+            needs_check = time.monotonic() - session.last_used > self.health_interval
+            if session.alive() and (not needs_check or session.ping()):
+                with self._cond:
+                    self._stats["reused"] += 1
+                return session
+            self._release(session, healthy=False)
+
+    def _release(self, session: MatlabSession, healthy: bool) -> None:
+        with self._cond:
+            self._busy -= 1
+            keep = healthy and not self._closed and session.alive()
+            if keep:
+                self._idle.append(session)
+            elif not healthy:
+                self._stats["failed"] += 1
+            self._cond.notify()
+        if not keep:
+            session.close(force=not healthy)
+
+    # ── Public API ──────────────────────────────────────────────────
+
+    def run(
+        self,
+        work_dir: str | Path,
+        script_name: str = "mcp_run",
+        timeout: float | None = 600.0,
+        on_output: Callable[[str], None] | None = None,
+        cancel: threading.Event | None = None,
+    ) -> dict[str, Any]:
+        """Run ``script_name`` from ``work_dir`` on a warm session.
+
+        Args:
+            work_dir: Directory containing the script; used as cwd.
+            script_name: Script name without the .m extension.
+            timeout: Seconds to wait for the script (and for a free session).
+            on_output: Optional callback invoked with each output line.
+            cancel: Optional event that aborts the run when set. The
+                session is killed, since MATLAB cannot be interrupted
+                over stdin.
+
+        Returns:
+            Dict with 'output', 'returncode', 'session' and, on failure,
+            'errors'. A cancelled run has 'cancelled' set instead.
+        """
+        session = self._acquire(timeout)
+        healthy = False
+        finished = threading.Event()
+        lines: list[str] = []
+
+        def _collect(text: str) -> None:
+            lines.append(text)
+            if on_output is not None:
+                on_output(text)
+
+        if cancel is not None:
+            def _watch_cancel() -> None:
+                while not finished.wait(0.2):
+                    if cancel.is_set():
+                        session.close(force=True)
+                        return
+            threading.Thread(target=_watch_cancel, daemon=True).start()
+
+        try:
+            output, error = session.execute(
+                f"cd({_matlab_str(work_dir)}); clear({_matlab_str(script_name)}); {script_name}",
+                timeout=timeout,
+                on_output=_collect,
+            )
+            session.runs += 1
+            session.reset()
+            healthy = True
+        except RuntimeError:
+            if cancel is None or not cancel.is_set():
+                raise
+            return {
+                "output": "\n".join(lines),
+                "returncode": None,
+                "cancelled": True,
+                "session": {"pid": session.pid, "runs": session.runs},
+            }
+        finally:
+            finished.set()
+            self._release(session, healthy)
+
+        result: dict[str, Any] = {
+            "output": output,
+            "returncode": 0 if error is None else 1,
+            "session": {"pid": session.pid, "runs": session.runs},
+        }
+        if error is not None:
+            result["errors"] = error
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool occupancy and lifetime counters."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "busy": self._busy,
+                "starting": self._starting,
+                **self._stats,
+            }
+
+    def close(self) -> None:
+        """Close every idle session and refuse new work."""
+        with self._cond:
+            self._closed = True
+            self._stop.set()
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for s in idle:
+            s.close()
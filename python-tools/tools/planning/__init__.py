@@ -0,0 +1,9 @@
+"""Motion-planning building blocks shared by the RRT/RRT* experiment scripts.
+
+- `problem`: planning queries, stop budgets and results
+- `robots`, `obstacles`: robot models (planar and DH arms, point robot) and obstacle sets
+- `planners`, `anytime`: RRT and anytime RRT*
+- `harness`: benchmark scenarios; `runner`: multi-seed runs
+- `cspace`: cached configuration-space grids for low-DOF arms
+- `tree`, `spatial`, `kinematics`, `collision`, `recording`: lower-level pieces
+"""
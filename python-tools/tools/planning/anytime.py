@@ -0,0 +1,162 @@
+"""Anytime RRT*: keep improving a solution until a budget runs out.
+
+The experiment scripts run a fixed ``MAX_ITER`` and read the goal cost
+off the tree at the end, and since their rewires do not update the
+rewired node's descendants, that cost can be stale. `anytime_rrt_star`
+instead:
+
+- rewires with `ArrayTree.rewire`, which shifts the cost of the whole
+  subtree, so every cost-to-come matches its parent links;
+- keeps the best goal-connected cost up to date as nodes are added and
+  subtrees are rewired (a goal node is one within ``goal_tol`` of the
+  goal; its solution cost adds the terminal edge to the exact goal);
+- stops on a wall-time budget, an iteration budget, or a plateau (no
+  relative improvement above ``plateau_tol`` for ``plateau_iterations``
+  iterations after the first solution), whichever comes first;
+- records a cost-vs-time curve with one point per improvement.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+import numpy as np
+
+from tools.planning.problem import Budget, PlanResult, Problem
+from tools.planning.tree import ArrayTree
+
+
+def anytime_rrt_star(
+    problem: Problem,
+    budget: Budget,
+    rng: np.random.Generator,
+    step_size: float,
+    radius: float,
+    goal_bias: float = 0.1,
+    on_improve: Callable[[float, int, float], None] | None = None,
+) -> PlanResult:
+    """Run RRT* until ``budget`` is exhausted, tracking the best solution.
+
+    Args:
+        problem: Start, goal, sampler and collision check.
+        budget: Stop conditions.
+        rng: Source of all randomness (anything with ``random()``).
+        step_size: Maximum extension per iteration.
+        radius: Neighbour radius for choose-parent and rewire.
+        goal_bias: Probability of sampling the goal.
+        on_improve: Called with ``(elapsed, iteration, cost)`` on every
+            improvement.
+
+    Returns:
+        A `PlanResult`.
+    """
+    start_time = time.perf_counter()
+    goal = np.asarray(problem.goal, dtype=float)
+    p = problem.cost_exponent
+    tree = ArrayTree(len(goal))
+    tree.add(np.asarray(problem.start, dtype=float))
+
+    # Terminal cost to the exact goal for goal nodes, inf elsewhere.
+    terminal = np.full(1024, np.inf)
+    best_cost, best_node = np.inf, -1
+    first_iter = first_time = None
+    plateau_ref, plateau_iter = np.inf, 0
+    curve: list[tuple[float, int, float]] = []
+
+    def improve(nodes: np.ndarray, it: int) -> None:
+        nonlocal best_cost, best_node, first_iter, first_time, plateau_ref, plateau_iter
+        total = tree.cost[nodes] + terminal[nodes]
+        k = int(np.argmin(total))
+        if total[k] >= best_cost:
+            return
+        best_cost, best_node = float(total[k]), int(nodes[k])
+        elapsed = time.perf_counter() - start_time
+        if first_iter is None:
+            first_iter, first_time = it, elapsed
+        if best_cost < plateau_ref * (1 - budget.plateau_tol):
+            plateau_ref, plateau_iter = best_cost, it
+        curve.append((elapsed, it, best_cost))
+        if on_improve is not None:
+            on_improve(elapsed, it, best_cost)
+
+    it, stop_reason = 0, "iterations"
+    while True:
+        if budget.iterations is not None and it >= budget.iterations:
+            stop_reason = "iterations"
+            break
+        if budget.time is not None and time.perf_counter() - start_time >= budget.time:
+            stop_reason = "time"
+            break
+        if (
+            budget.plateau_iterations is not None
+            and first_iter is not None
+            and it - plateau_iter >= budget.plateau_iterations
+        ):
+            stop_reason = "plateau"
+            break
+        it += 1
+
+        q_rand = goal if rng.random() < goal_bias else problem.sample(rng)
+        nearest_idx, dist = tree.nearest(q_rand)
+        q_near = tree.coords[nearest_idx].copy()
+        if dist == 0:
+            continue
+        q_new = problem.steer(q_near, q_rand, dist, step_size)
+        if problem.edges_hit(q_near, q_new)[0]:
+            continue
+
+        # Choose parent: neighbours cheapest-first, one batched check.
+        neighbors = tree.within(q_new, radius)
+        edge_costs = tree.distances(neighbors, q_new) ** p
+        cost_via = tree.cost[neighbors] + edge_costs
+        best_parent = nearest_idx
+        min_cost = tree.cost[nearest_idx] + np.linalg.norm(q_new - q_near) ** p
+        order = np.argsort(cost_via, kind="stable")
+        cheaper = order[cost_via[order] < min_cost]
+        if len(cheaper):
+            free = ~problem.edges_hit(q_new, tree.coords[neighbors[cheaper]])
+            if free.any():
+                k = cheaper[np.argmax(free)]
+                best_parent, min_cost = int(neighbors[k]), cost_via[k]
+        new_idx = tree.add(q_new, best_parent, min_cost)
+
+        if new_idx == len(terminal):
+            terminal = np.concatenate([terminal, np.full(len(terminal), np.inf)])
+        d_goal = np.linalg.norm(q_new - goal)
+        if d_goal <= problem.goal_tol:
+            terminal[new_idx] = d_goal ** p
+            improve(np.array([new_idx]), it)
+
+        # Rewire, re-checking each cost since earlier rewires in this
+        # batch may already have improved a later candidate's subtree.
+        cost_via_new = min_cost + edge_costs
+        improved = cost_via_new < tree.cost[neighbors]
+        candidates = neighbors[improved]
+        if len(candidates):
+            free = ~problem.edges_hit(q_new, tree.coords[candidates])
+            for node, cost in zip(candidates[free], cost_via_new[improved][free]):
+                if cost < tree.cost[node]:
+                    changed = tree.rewire(int(node), new_idx, cost)
+                    if np.isfinite(terminal[changed]).any():
+                        improve(changed, it)
+
+    elapsed = time.perf_counter() - start_time
+    success = best_node >= 0
+    path = None
+    if success:
+        path = tree.path(best_node)
+        if terminal[best_node] > 0:
+            path = np.vstack([path, goal])
+    curve.append((elapsed, it, best_cost))
+    return PlanResult(
+        success=success,
+        cost=best_cost,
+        path=path,
+        iterations=it,
+        elapsed=elapsed,
+        stop_reason=stop_reason,
+        first_solution_iteration=first_iter,
+        first_solution_time=first_time,
+        curve=np.array(curve),
+        tree=tree,
+    )
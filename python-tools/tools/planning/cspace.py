@@ -0,0 +1,233 @@
+"""Precomputed configuration-space occupancy grids for low-DOF arms.
+
+The 2-link arm's configuration space is only 2-D, so instead of running
+forward kinematics for every sample of every edge, it can be rasterized
+once into a boolean grid (all cells in a few vectorized batches) and
+collision queries become array lookups. Grids are cached on disk, keyed
+by the arm geometry, the obstacles and the resolution, and can be
+exported as an image.
+
+A cell is marked occupied if *any* configuration near it collides, not
+just its centre: the capsules are inflated by the lever-arm bound of the
+cell's half-width plus half the lookup spacing (see `CapsuleModel`). Edge
+queries look up points at most one cell width apart, so every point of a
+free edge lies within the region certified by the cell of its nearest
+lookup, and a free answer is conservative. The price is that passages
+narrower than about a cell width are closed; raise the resolution if a
+query becomes unsolvable.
+"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from tools.planning.obstacles import Obstacles, spheres_of
+from tools.planning.robots import Arm, DHArm, PlanarArm, Robot
+
+_FORMAT_VERSION = 1
+_CHUNK = 1 << 16
+
+
+class CSpaceGrid:
+    """Boolean occupancy grid over a box of joint space.
+
+    Args:
+        occupied: Occupancy, shape ``resolution`` (one axis per joint);
+            cell ``i`` covers ``[low + i * width, low + (i + 1) * width)``.
+        low, high: Joint limits covered by the grid.
+    """
+
+    def __init__(self, occupied: np.ndarray, low: Sequence[float], high: Sequence[float]):
+        self.occupied = np.asarray(occupied, dtype=bool)
+        self.low = np.asarray(low, dtype=float)
+        self.high = np.asarray(high, dtype=float)
+        self.shape = np.array(self.occupied.shape)
+        self.width = (self.high - self.low) / self.shape
+        self.checks = 0
+
+    @property
+    def free_fraction(self) -> float:
+        return float(1 - self.occupied.mean())
+
+    @property
+    def lookup_spacing(self) -> float:
+        """Largest distance between consecutive lookups along an edge."""
+        return float(self.width.min())
+
+    @classmethod
+    def rasterize(cls, robot: Arm, obstacles: Obstacles | np.ndarray, resolution: int | Sequence[int] = 512) -> CSpaceGrid:
+        """Rasterize ``robot``'s configuration space within its joint limits.
+
+        Args:
+            robot: An arm with a `CapsuleModel`.
+            obstacles: Obstacle set.
+            resolution: Cells per joint (an int or one per joint).
+        """
+        shape = np.broadcast_to(resolution, (robot.dof,)).astype(int)
+        width = (robot.high - robot.low) / shape
+        half = width / 2 + width.min() / 2
+        model = robot.model
+        inflate = np.stack([half @ model.reach_start, half @ model.reach], axis=-1)
+
+        spheres = spheres_of(obstacles)
+        n_cells = int(np.prod(shape))
+        occupied = np.empty(n_cells, dtype=bool)
+        for start in range(0, n_cells, _CHUNK):
+            idx = np.arange(start, min(start + _CHUNK, n_cells))
+            cells = np.stack(np.unravel_index(idx, shape), axis=-1)
+            q = robot.low + (cells + 0.5) * width
+            occupied[idx] = model.config_hits(q, spheres, np.broadcast_to(inflate, (len(q),) + inflate.shape))
+        return cls(occupied.reshape(shape), robot.low, robot.high)
+
+    @classmethod
+    def cached(
+        cls,
+        robot: Arm,
+        obstacles: Obstacles | np.ndarray,
+        resolution: int | Sequence[int] = 512,
+        cache_dir: str | Path = "data/.cache/cspace",
+    ) -> CSpaceGrid:
+        """`rasterize`, reusing a grid stored under ``cache_dir`` if one exists."""
+        shape = np.broadcast_to(resolution, (robot.dof,)).astype(int)
+        path = Path(cache_dir) / f"{grid_key(robot, obstacles, shape)}.npz"
+        if path.exists():
+            return cls.load(path)
+        grid = cls.rasterize(robot, obstacles, shape)
+        grid.save(path)
+        return grid
+
+    def save(self, path: str | Path) -> Path:
+        """Write the grid (bit-packed) as a compressed .npz archive."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez_compressed(
+            tmp, bits=np.packbits(self.occupied), shape=self.shape, low=self.low, high=self.high,
+        )
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> CSpaceGrid:
+        with np.load(path) as data:
+            shape = tuple(data["shape"])
+            occupied = np.unpackbits(data["bits"], count=int(np.prod(shape))).reshape(shape)
+            return cls(occupied, data["low"], data["high"])
+
+    def cells(self, q: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Cell indices of configurations (..., dof), and whether each is inside the grid."""
+        q = np.asarray(q, dtype=float)
+        inside = np.all((q >= self.low) & (q <= self.high), axis=-1)
+        idx = np.floor((q - self.low) / self.width).astype(np.intp)
+        return np.clip(idx, 0, self.shape - 1), inside
+
+    def config_hits(self, q: np.ndarray) -> np.ndarray:
+        """True for each configuration (B, dof) in an occupied cell or outside the grid."""
+        q = np.atleast_2d(q)
+        self.checks += len(q)
+        idx, inside = self.cells(q)
+        return ~inside | self.occupied[tuple(idx.T)]
+
+    def edges_hit(self, q_from: np.ndarray, q_to: np.ndarray) -> np.ndarray:
+        """True for each edge ``q_from[i] -> q_to[i]`` that crosses an occupied cell."""
+        q_from, q_to = np.broadcast_arrays(np.atleast_2d(q_from), np.atleast_2d(q_to))
+        delta = q_to - q_from
+        n = np.ceil(np.linalg.norm(delta, axis=1) / self.lookup_spacing).astype(np.intp) + 1
+        offsets = np.concatenate([[0], np.cumsum(n)[:-1]])
+        edge = np.repeat(np.arange(len(n)), n)
+        t = (np.arange(n.sum()) - offsets[edge]) / np.maximum(n[edge] - 1, 1)
+        hits = self.config_hits(q_from[edge] + t[:, None] * delta[edge])
+        return np.logical_or.reduceat(hits, offsets)
+
+    def save_image(
+        self,
+        path: str | Path,
+        paths: Sequence[np.ndarray] = (),
+        points: dict[str, Sequence[float]] | None = None,
+        labels: Sequence[str] = ("$\\theta_1$ (rad)", "$\\theta_2$ (rad)"),
+        title: str = "Configuration space",
+        dpi: int = 200,
+    ) -> Path:
+        """Export a 2-D grid as an image, e.g. for a manuscript figure.
+
+        Args:
+            path: Output file; the format follows the suffix (.png, .pdf, .svg).
+            paths: Joint-space paths (N, 2) drawn on top.
+            points: Labelled configurations, e.g. ``{"start": q0, "goal": q1}``.
+            labels: Axis labels.
+            title: Figure title.
+            dpi: Resolution of raster formats.
+        """
+        if self.occupied.ndim != 2:
+            raise ValueError(f"can only draw 2-D grids, this one is {self.occupied.ndim}-D")
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(6, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.imshow(
+            self.occupied.T, origin="lower", cmap="Greys", vmin=0, vmax=1.6, interpolation="nearest",
+            extent=(self.low[0], self.high[0], self.low[1], self.high[1]),
+        )
+        for p in paths:
+            p = np.asarray(p)
+            ax.plot(p[:, 0], p[:, 1], "r-", linewidth=1.5)
+        for (name, q), style in zip((points or {}).items(), ("go", "rx", "bs", "m^")):
+            ax.plot(q[0], q[1], style, markersize=8, label=name)
+        if points:
+            ax.legend(loc="upper right")
+        ax.set_xlabel(labels[0])
+        ax.set_ylabel(labels[1])
+        ax.set_title(title)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(path, dpi=dpi, bbox_inches="tight")
+        return path
+
+
+def grid_key(robot: Arm, obstacles: Obstacles | np.ndarray, shape: Sequence[int]) -> str:
+    """Cache key of a grid: arm geometry, joint limits, obstacles and resolution."""
+    if isinstance(robot, PlanarArm):
+        geometry = [b"planar", robot.lengths.tobytes()]
+    elif isinstance(robot, DHArm):
+        geometry = [b"dh", robot.dh.tobytes()]
+    else:
+        raise TypeError(f"no cache key for {type(robot).__name__}")
+    h = hashlib.sha256()
+    for part in geometry + [
+        np.asarray(robot.model.radius, dtype=float).tobytes(),
+        robot.low.tobytes(),
+        robot.high.tobytes(),
+        np.ascontiguousarray(spheres_of(obstacles)).tobytes(),
+        np.asarray(shape, dtype=np.int64).tobytes(),
+        str(_FORMAT_VERSION).encode(),
+    ]:
+        h.update(part)
+        h.update(b"\0")
+    return h.hexdigest()[:24]
+
+
+class GridRobot(Robot):
+    """Robot whose collisions are looked up in a `CSpaceGrid`.
+
+    The obstacles are baked into the grid, so the ``obstacles`` argument of
+    the checks is ignored; pass ``None`` to `Problem.for_robot`.
+    """
+
+    def __init__(self, grid: CSpaceGrid):
+        super().__init__(grid.low, grid.high)
+        self.grid = grid
+
+    @property
+    def checks(self) -> int:
+        return self.grid.checks
+
+    def config_hits(self, q, obstacles=None):
+        return self.grid.config_hits(q)
+
+    def edges_hit(self, q_from, q_to, obstacles=None):
+        return self.grid.edges_hit(q_from, q_to)
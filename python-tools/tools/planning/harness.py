@@ -0,0 +1,154 @@
+"""Benchmark scenarios shared by the experiment scripts.
+
+A `Scenario` fixes a robot, an obstacle set and a query, plus the default
+planner, its parameters and budget. `run` plans one scenario and returns
+scalar metrics, so it is a target for `tools.planning.runner`:
+
+    python -m tools.planning.runner tools.planning.harness:run \\
+        --seeds 50 --param scenario=6dof --param planner=rrt
+
+The scenarios mirror the scripts: ``2dof`` is the planar 2-link arm of
+``robotarm_RRT_star_py_v02.py`` (with a reachable goal; the scripts' goal
+``(pi/2, pi/4)`` puts the elbow link inside an obstacle), ``6dof`` the
+PUMA-like arm of ``robotarm_6dof_rrt_star.py`` and ``map2d`` the point
+robot of ``rrt_simulation.py``.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field, replace
+from functools import partial
+from typing import Any, Callable
+
+import numpy as np
+
+from tools.planning.obstacles import Obstacles
+from tools.planning.planners import PLANNERS
+from tools.planning.problem import Budget, Problem
+from tools.planning.robots import DHArm, PlanarArm, PointRobot, Robot
+
+PUMA_DH = np.array([
+    [0.0, np.pi / 2, 0.5, 0.0],
+    [0.5, 0.0, 0.0, 0.0],
+    [0.1, np.pi / 2, 0.0, 0.0],
+    [0.0, -np.pi / 2, 0.4, 0.0],
+    [0.0, np.pi / 2, 0.0, 0.0],
+    [0.0, 0.0, 0.1, 0.0],
+])
+PUMA_LOW = np.array([-np.pi, -np.pi / 2, -np.pi, -np.pi, -np.pi, -np.pi])
+PUMA_HIGH = np.array([np.pi, np.pi / 2, np.pi, np.pi, np.pi, np.pi])
+
+
+@dataclass
+class Scenario:
+    """A planning benchmark.
+
+    Args:
+        robot: Builds a fresh robot (so check counters start at 0); a
+            picklable callable such as a class or ``functools.partial``.
+        obstacles: Obstacle set.
+        start, goal: Query configurations.
+        goal_tol: Nodes within this distance of ``goal`` reach it.
+        planner: Default planner, a key of `PLANNERS`.
+        params: Default keyword arguments per planner name.
+        budget: Default stop conditions.
+        cost_exponent: See `Problem`.
+    """
+
+    robot: Callable[[], Robot]
+    obstacles: Obstacles
+    start: np.ndarray
+    goal: np.ndarray
+    goal_tol: float
+    planner: str = "rrt_star"
+    params: dict[str, dict[str, Any]] = field(default_factory=dict)
+    budget: Budget = field(default_factory=lambda: Budget(iterations=1000))
+    cost_exponent: float = 1.0
+
+    def problem(self, robot: Robot) -> Problem:
+        return Problem.for_robot(robot, self.obstacles, self.start, self.goal, self.goal_tol, self.cost_exponent)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "2dof": Scenario(
+        robot=partial(PlanarArm, [1.0, 1.0], max_joint_step=0.02),
+        obstacles=Obstacles([(1.0, 1.0, 0.4), (-0.5, 1.5, 0.3), (0.5, -0.5, 0.3)]),
+        start=np.array([0.0, 0.0]),
+        goal=np.array([np.pi / 2, -np.pi / 4]),
+        goal_tol=0.15,
+        params={
+            "rrt": {"step_size": 0.15, "goal_bias": 0.1},
+            "rrt_star": {"step_size": 0.15, "radius": 0.6, "goal_bias": 0.1},
+        },
+        budget=Budget(iterations=2000),
+    ),
+    "6dof": Scenario(
+        robot=partial(DHArm, PUMA_DH, radius=0.05, max_joint_step=0.05, low=PUMA_LOW, high=PUMA_HIGH),
+        obstacles=Obstacles([(0.8, 0.5, 0.4, 0.2), (-0.5, 0.5, 0.6, 0.2)]),
+        start=np.zeros(6),
+        goal=np.array([np.pi / 2, np.pi / 4, -np.pi / 4, 0.0, np.pi / 4, 0.0]),
+        goal_tol=0.25,
+        params={
+            "rrt": {"step_size": 0.25, "goal_bias": 0.1},
+            "rrt_star": {"step_size": 0.25, "radius": 0.8, "goal_bias": 0.1},
+        },
+        budget=Budget(iterations=1500),
+        cost_exponent=2.0,
+    ),
+    "map2d": Scenario(
+        robot=partial(PointRobot, [0.0, 0.0], [100.0, 100.0]),
+        obstacles=Obstacles([(30, 30, 10), (70, 70, 15), (40, 80, 10), (80, 40, 10), (50, 50, 15)]),
+        start=np.array([5.0, 5.0]),
+        goal=np.array([95.0, 95.0]),
+        goal_tol=2.0,
+        planner="rrt",
+        params={
+            "rrt": {"step_size": 0.5, "goal_bias": 0.1},
+            "rrt_star": {"step_size": 0.5, "radius": 2.0, "goal_bias": 0.1},
+        },
+        budget=Budget(iterations=5000),
+    ),
+}
+
+
+def run(
+    rng: np.random.Generator,
+    scenario: str | Scenario = "2dof",
+    planner: str | None = None,
+    iterations: int | None = None,
+    time_budget: float | None = None,
+    **params: Any,
+) -> dict[str, Any]:
+    """Plan one scenario and return its metrics.
+
+    Args:
+        rng: Source of all randomness.
+        scenario: A `SCENARIOS` key or a `Scenario`.
+        planner: Planner name (default: the scenario's).
+        iterations, time_budget: Override the scenario's budget; setting
+            either replaces it.
+        **params: Override the planner's parameters.
+
+    Returns:
+        `PlanResult.metrics` plus the path and tree, the number of
+        collision checks, and iteration and check throughput.
+    """
+    spec = SCENARIOS[scenario] if isinstance(scenario, str) else scenario
+    name = planner or spec.planner
+    budget = spec.budget
+    if iterations is not None or time_budget is not None:
+        budget = replace(budget, iterations=iterations, time=time_budget)
+
+    robot = spec.robot()
+    start = time.perf_counter()
+    result = PLANNERS[name](spec.problem(robot), budget, rng, **{**spec.params.get(name, {}), **params})
+    wall = time.perf_counter() - start
+    return {
+        **result.metrics(),
+        "planner": name,
+        "checks": robot.checks,
+        "iterations_per_s": result.iterations / wall if wall > 0 else np.nan,
+        "checks_per_s": robot.checks / wall if wall > 0 else np.nan,
+        "path": result.path,
+        "tree": result.tree,
+    }
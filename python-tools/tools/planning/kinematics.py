@@ -0,0 +1,83 @@
+"""Batched forward kinematics for serial arms.
+
+All functions take a batch of joint configurations, shape (B, dof), and
+return one result per configuration, so a planner can evaluate every
+interpolation step of many edges in a single call.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def dh_link_transforms(q: np.ndarray, dh: np.ndarray) -> np.ndarray:
+    """Per-joint standard DH transforms.
+
+    Args:
+        q: Joint angles, shape (B, n) (or (n,) for a single configuration).
+        dh: DH table, shape (n, 4): ``[a, alpha, d, theta_offset]`` per joint.
+
+    Returns:
+        Array of shape (B, n, 4, 4): the transform of each link relative to
+        the previous one.
+    """
+    q = np.atleast_2d(np.asarray(q, dtype=float))
+    a, alpha, d, offset = (np.asarray(dh, dtype=float)[:, k] for k in range(4))
+    theta = q + offset
+    ct, st = np.cos(theta), np.sin(theta)
+    ca, sa = np.cos(alpha), np.sin(alpha)
+
+    A = np.zeros(q.shape + (4, 4))
+    A[..., 0, 0] = ct
+    A[..., 0, 1] = -st * ca
+    A[..., 0, 2] = st * sa
+    A[..., 0, 3] = a * ct
+    A[..., 1, 0] = st
+    A[..., 1, 1] = ct * ca
+    A[..., 1, 2] = -ct * sa
+    A[..., 1, 3] = a * st
+    A[..., 2, 1] = sa
+    A[..., 2, 2] = ca
+    A[..., 2, 3] = d
+    A[..., 3, 3] = 1.0
+    return A
+
+
+def dh_transforms(q: np.ndarray, dh: np.ndarray) -> np.ndarray:
+    """Base-to-link transforms of a DH chain.
+
+    Args:
+        q: Joint angles, shape (B, n).
+        dh: DH table, shape (n, 4).
+
+    Returns:
+        Array of shape (B, n, 4, 4); entry ``[:, i]`` is the pose of link i
+        (the product of the first i + 1 link transforms).
+    """
+    A = dh_link_transforms(q, dh)
+    T = np.empty_like(A)
+    T[:, 0] = A[:, 0]
+    for i in range(1, A.shape[1]):
+        T[:, i] = np.einsum("bij,bjk->bik", T[:, i - 1], A[:, i])
+    return T
+
+
+def dh_joint_positions(q: np.ndarray, dh: np.ndarray) -> np.ndarray:
+    """Base origin followed by each link's end point, shape (B, n + 1, 3)."""
+    T = dh_transforms(q, dh)
+    base = np.zeros((T.shape[0], 1, 3))
+    return np.concatenate([base, T[:, :, :3, 3]], axis=1)
+
+
+def planar_joint_positions(q: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Joint positions of a planar serial arm, shape (B, n + 1, 2).
+
+    Args:
+        q: Relative joint angles, shape (B, n).
+        lengths: Link lengths, shape (n,).
+    """
+    q = np.atleast_2d(np.asarray(q, dtype=float))
+    angles = np.cumsum(q, axis=1)
+    steps = np.stack([np.cos(angles), np.sin(angles)], axis=-1) * np.asarray(lengths)[:, None]
+    out = np.zeros((q.shape[0], q.shape[1] + 1, 2))
+    np.cumsum(steps, axis=1, out=out[:, 1:])
+    return out
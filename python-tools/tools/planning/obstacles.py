@@ -0,0 +1,65 @@
+"""Obstacle sets for the planners.
+
+Every scenario in the experiment scripts uses spheres (circles in 2-D), so
+an obstacle set is an (M, D + 1) array of centres and radii with a few
+helpers. Robot models accept either an `Obstacles` or the raw array.
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from tools.planning.collision import as_spheres
+
+
+class Obstacles:
+    """Spherical obstacles in D dimensions.
+
+    Args:
+        spheres: ``(x, y[, z], r)`` tuples or an (M, D + 1) array.
+        dim: Workspace dimension, required only when ``spheres`` is empty.
+    """
+
+    def __init__(self, spheres: Sequence[Sequence[float]] | np.ndarray, dim: int | None = None):
+        if len(spheres) == 0:
+            if dim is None:
+                raise ValueError("an empty obstacle set needs an explicit dim")
+            self.spheres = np.empty((0, dim + 1))
+        else:
+            self.spheres = as_spheres(spheres)
+        self.spheres.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.spheres)
+
+    def __repr__(self) -> str:
+        return f"Obstacles({len(self)} spheres, dim={self.dim})"
+
+    @property
+    def dim(self) -> int:
+        return self.spheres.shape[1] - 1
+
+    @property
+    def centers(self) -> np.ndarray:
+        return self.spheres[:, :-1]
+
+    @property
+    def radii(self) -> np.ndarray:
+        return self.spheres[:, -1]
+
+    def inflated(self, margin: float) -> Obstacles:
+        """The same obstacles with every radius grown by ``margin``."""
+        spheres = self.spheres.copy()
+        spheres[:, -1] += margin
+        return Obstacles(spheres, self.dim)
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        """True where a point (..., D) lies inside or on an obstacle."""
+        d = np.linalg.norm(np.asarray(points, dtype=float)[..., None, :] - self.centers, axis=-1)
+        return np.any(d <= self.radii, axis=-1)
+
+
+def spheres_of(obstacles: Obstacles | np.ndarray) -> np.ndarray:
+    """The (M, D + 1) array behind an obstacle set."""
+    return obstacles.spheres if isinstance(obstacles, Obstacles) else as_spheres(obstacles)
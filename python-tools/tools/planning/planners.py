@@ -0,0 +1,117 @@
+"""Sampling-based planners over a `Problem`.
+
+- `rrt`: plain RRT (``rrt_simulation.py``); by default it stops at the
+  first node that reaches the goal.
+- `anytime_rrt_star`: RRT* with cost propagation, used by the arm
+  scripts; with ``Budget(iterations=N)`` it is classic fixed-iteration RRT*.
+
+All planners share the signature ``planner(problem, budget, rng, **params)``
+and return a `PlanResult`, so the benchmark harness and the multi-seed
+runner can swap them by name through `PLANNERS`.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+import numpy as np
+
+from tools.planning.anytime import anytime_rrt_star
+from tools.planning.problem import Budget, PlanResult, Problem
+from tools.planning.tree import ArrayTree
+
+
+def rrt(
+    problem: Problem,
+    budget: Budget,
+    rng: np.random.Generator,
+    step_size: float,
+    goal_bias: float = 0.1,
+    stop_at_goal: bool = True,
+    on_edge: Callable[[int, np.ndarray, np.ndarray], None] | None = None,
+) -> PlanResult:
+    """Grow an RRT: extend the nearest node towards each sample.
+
+    Args:
+        problem: Start, goal, sampler and collision check.
+        budget: Stop conditions (the plateau limit is ignored).
+        rng: Source of all randomness.
+        step_size: Maximum extension per iteration.
+        goal_bias: Probability of sampling the goal.
+        stop_at_goal: Stop as soon as a node reaches the goal.
+        on_edge: Called with ``(iteration, q_from, q_to)`` for every new
+            edge, e.g. ``EdgeLog.add`` to record the tree's growth.
+
+    Returns:
+        A `PlanResult`. Iteration counts are 1-based, as in
+        `anytime_rrt_star`; ``on_edge`` gets the 0-based loop index.
+    """
+    start_time = time.perf_counter()
+    goal = np.asarray(problem.goal, dtype=float)
+    p = problem.cost_exponent
+    tree = ArrayTree(len(goal))
+    tree.add(np.asarray(problem.start, dtype=float))
+
+    best_cost, best_node, best_terminal = np.inf, -1, 0.0
+    first_iter = first_time = None
+    curve: list[tuple[float, int, float]] = []
+
+    it, stop_reason = 0, "iterations"
+    while True:
+        if budget.iterations is not None and it >= budget.iterations:
+            break
+        if budget.time is not None and time.perf_counter() - start_time >= budget.time:
+            stop_reason = "time"
+            break
+
+        i, it = it, it + 1
+
+        q_rand = goal if rng.random() < goal_bias else problem.sample(rng)
+        nearest_idx, dist = tree.nearest(q_rand)
+        if dist == 0:
+            continue
+        q_near = tree.coords[nearest_idx].copy()
+        q_new = problem.steer(q_near, q_rand, dist, step_size)
+        if problem.edges_hit(q_near, q_new)[0]:
+            continue
+        new_idx = tree.add(q_new, nearest_idx, tree.cost[nearest_idx] + np.linalg.norm(q_new - q_near) ** p)
+        if on_edge is not None:
+            on_edge(i, q_near, q_new)
+
+        d_goal = np.linalg.norm(q_new - goal)
+        if d_goal <= problem.goal_tol and tree.cost[new_idx] + d_goal ** p < best_cost:
+            best_terminal = d_goal ** p
+            best_cost, best_node = float(tree.cost[new_idx] + best_terminal), new_idx
+            elapsed = time.perf_counter() - start_time
+            if first_iter is None:
+                first_iter, first_time = it, elapsed
+            curve.append((elapsed, it, best_cost))
+            if stop_at_goal:
+                stop_reason = "goal"
+                break
+
+    elapsed = time.perf_counter() - start_time
+    path = None
+    if best_node >= 0:
+        path = tree.path(best_node)
+        if best_terminal > 0:
+            path = np.vstack([path, goal])
+    curve.append((elapsed, it, best_cost))
+    return PlanResult(
+        success=best_node >= 0,
+        cost=best_cost,
+        path=path,
+        iterations=it,
+        elapsed=elapsed,
+        stop_reason=stop_reason,
+        first_solution_iteration=first_iter,
+        first_solution_time=first_time,
+        curve=np.array(curve),
+        tree=tree,
+    )
+
+
+PLANNERS: dict[str, Callable[..., PlanResult]] = {
+    "rrt": rrt,
+    "rrt_star": anytime_rrt_star,
+}
@@ -0,0 +1,111 @@
+"""Planning queries, stop budgets and results shared by every planner."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import numpy as np
+
+from tools.planning.tree import ArrayTree
+
+
+@dataclass
+class Problem:
+    """A planning query in a Euclidean configuration space.
+
+    Args:
+        start: Start configuration.
+        goal: Goal configuration.
+        sample: Draws one random configuration from a Generator.
+        edges_hit: Batched edge check ``(q_from, q_to) -> (E,) bool``; either
+            side may be a single configuration.
+        goal_tol: Nodes within this distance of ``goal`` reach it.
+        low, high: Optional joint limits; steered configurations are clipped.
+        cost_exponent: Edge cost is ``distance ** cost_exponent`` (1 for
+            path length, 2 for the 6-DOF script's displacement energy).
+    """
+
+    start: np.ndarray
+    goal: np.ndarray
+    sample: Callable[[np.random.Generator], np.ndarray]
+    edges_hit: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    goal_tol: float
+    low: np.ndarray | None = None
+    high: np.ndarray | None = None
+    cost_exponent: float = 1.0
+
+    @classmethod
+    def for_robot(cls, robot, obstacles, start, goal, goal_tol: float, cost_exponent: float = 1.0) -> Problem:
+        """Query for a `tools.planning.robots` model among ``obstacles``.
+
+        Samples are uniform within the robot's limits, and steered
+        configurations are clipped to them.
+        """
+        return cls(
+            start=np.asarray(start, dtype=float),
+            goal=np.asarray(goal, dtype=float),
+            sample=robot.sample,
+            edges_hit=lambda q_from, q_to: robot.edges_hit(q_from, q_to, obstacles),
+            goal_tol=goal_tol,
+            low=robot.low,
+            high=robot.high,
+            cost_exponent=cost_exponent,
+        )
+
+    def steer(self, q_near: np.ndarray, q_rand: np.ndarray, dist: float, step_size: float) -> np.ndarray:
+        """Move from ``q_near`` towards ``q_rand`` (``dist`` away) by at most ``step_size``."""
+        q_new = q_near + (q_rand - q_near) * min(1.0, step_size / dist)
+        if self.low is not None or self.high is not None:
+            q_new = np.clip(q_new, self.low, self.high)
+        return q_new
+
+
+@dataclass
+class Budget:
+    """When to stop; a time or iteration limit must be set.
+
+    The plateau limit only counts once a first solution exists, so it cannot
+    bound a run on its own.
+    """
+
+    time: float | None = None
+    iterations: int | None = None
+    plateau_iterations: int | None = None
+    plateau_tol: float = 1e-3
+
+    def __post_init__(self):
+        if self.time is None and self.iterations is None:
+            raise ValueError("Budget needs a time or iteration limit")
+
+
+@dataclass
+class PlanResult:
+    """Outcome of a planner run.
+
+    ``curve`` has one row ``(elapsed, iteration, best_cost)`` per
+    improvement of the best solution, plus a final row at the stop.
+    """
+
+    success: bool
+    cost: float
+    path: np.ndarray | None
+    iterations: int
+    elapsed: float
+    stop_reason: str
+    first_solution_iteration: int | None
+    first_solution_time: float | None
+    curve: np.ndarray
+    tree: ArrayTree
+
+    def metrics(self) -> dict[str, Any]:
+        """Scalar summary, e.g. for `tools.planning.runner` tables."""
+        return {
+            "success": self.success,
+            "cost": self.cost,
+            "iterations": self.iterations,
+            "iterations_to_first": self.first_solution_iteration,
+            "time_to_first": self.first_solution_time,
+            "improvements": max(len(self.curve) - 1, 0),
+            "nodes": len(self.tree),
+            "stop_reason": self.stop_reason,
+        }
@@ -0,0 +1,244 @@
+"""Headless recording and parallel rendering of planner tree growth.
+
+Plotting every new edge with ``ax.plot`` and grabbing canvas frames inside
+the planning loop makes rendering dominate the run time and keeps every
+RGB frame in memory. Instead, the planner appends each edge to an
+`EdgeLog` (two float32 points and the iteration that added it), and frames
+are rendered afterwards from the log alone: contiguous runs of frames go
+to worker processes, each of which builds the static scene once and adds
+one ``LineCollection`` per frame for the edges grown since the previous
+one. Frames are written to a scratch
+directory and streamed into the GIF, so memory does not grow with the
+number of frames.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Sequence
+
+import numpy as np
+
+# ── Edge log ────────────────────────────────────────────────────────
+
+
+class EdgeLog:
+    """Append-only log of tree edges, one row per edge.
+
+    Args:
+        dim: Coordinates per point.
+        capacity: Initial number of edge slots (grown by doubling).
+    """
+
+    def __init__(self, dim: int = 2, capacity: int = 4096):
+        self.dim = dim
+        self._edges = np.empty((capacity, 2, dim), dtype=np.float32)
+        self._iterations = np.empty(capacity, dtype=np.int32)
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def edges(self) -> np.ndarray:
+        """Edge end points, shape (n, 2, dim)."""
+        return self._edges[: self._n]
+
+    @property
+    def iterations(self) -> np.ndarray:
+        """Iteration that added each edge (non-decreasing), shape (n,)."""
+        return self._iterations[: self._n]
+
+    @property
+    def nbytes(self) -> int:
+        return self._n * (2 * self.dim * 4 + 4)
+
+    def add(self, iteration: int, p_from: Sequence[float], p_to: Sequence[float]) -> None:
+        """Record the edge ``p_from -> p_to`` added at ``iteration``."""
+        if self._n == len(self._iterations):
+            self._edges = np.concatenate([self._edges, np.empty_like(self._edges)])
+            self._iterations = np.concatenate([self._iterations, np.empty_like(self._iterations)])
+        self._edges[self._n, 0] = p_from
+        self._edges[self._n, 1] = p_to
+        self._iterations[self._n] = iteration
+        self._n += 1
+
+    def upto(self, iteration: int) -> int:
+        """Number of edges added at or before ``iteration``."""
+        return int(np.searchsorted(self.iterations, iteration, side="right"))
+
+    def save(self, path: str | Path) -> Path:
+        """Write the log as a compressed .npz archive."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, edges=self.edges, iterations=self.iterations)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path) -> EdgeLog:
+        with np.load(path) as data:
+            edges, iterations = data["edges"], data["iterations"]
+        log = cls(edges.shape[-1], capacity=max(len(edges), 1))
+        log._edges[: len(edges)] = edges
+        log._iterations[: len(edges)] = iterations
+        log._n = len(edges)
+        return log
+
+
+# ── Rendering ───────────────────────────────────────────────────────
+
+
+@dataclass
+class Scene:
+    """Static background of a 2-D planning animation."""
+
+    xlim: tuple[float, float]
+    ylim: tuple[float, float]
+    circles: list[tuple[float, float, float]] = field(default_factory=list)
+    start: tuple[float, float] | None = None
+    goal: tuple[float, float] | None = None
+    title: str = ""
+    figsize: tuple[float, float] = (8, 8)
+    dpi: int = 100
+    edge_color: str = "b"
+    edge_width: float = 0.5
+
+
+def _figure(scene: Scene):
+    """Figure with the static scene, drawn without pyplot (no GUI backend)."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Circle
+
+    fig = Figure(figsize=scene.figsize, dpi=scene.dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    for ox, oy, r in scene.circles:
+        ax.add_patch(Circle((ox, oy), r, color="gray"))
+    if scene.start is not None:
+        ax.plot(*scene.start, "go", markersize=10, label="Start")
+    if scene.goal is not None:
+        ax.plot(*scene.goal, "rx", markersize=10, label="Goal")
+    ax.set_xlim(*scene.xlim)
+    ax.set_ylim(*scene.ylim)
+    ax.grid(True)
+    ax.set_title(scene.title)
+    return fig, ax
+
+
+def _add_edges(ax, scene: Scene, segments: np.ndarray) -> None:
+    from matplotlib.collections import LineCollection
+
+    if len(segments):
+        ax.add_collection(
+            LineCollection(segments, colors=scene.edge_color, linewidths=scene.edge_width),
+            autolim=False,
+        )
+
+
+def _rgb(fig) -> np.ndarray:
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+
+
+def render_final(log: EdgeLog, scene: Scene, path: np.ndarray | None = None, out: str | Path | None = None) -> np.ndarray:
+    """Render the whole tree (and an optional path); returns RGB, saves to ``out``."""
+    fig, ax = _figure(scene)
+    _add_edges(ax, scene, log.edges)
+    if path is not None:
+        ax.plot(path[:, 0], path[:, 1], "-r", linewidth=2, label="Path")
+    ax.legend()
+    if out is not None:
+        Path(out).parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(out)
+    return _rgb(fig)
+
+
+def _render_chunk(
+    edges: np.ndarray, counts: list[int], first: int, scene: Scene, out_dir: str
+) -> list[str]:
+    """Render frames ``first, first + 1, ...`` with ``counts[k]`` edges each."""
+    from PIL import Image
+
+    fig, ax = _figure(scene)
+    files, drawn = [], 0
+    for k, count in enumerate(counts):
+        _add_edges(ax, scene, edges[drawn:count])
+        drawn = count
+        name = os.path.join(out_dir, f"frame_{first + k:06d}.png")
+        Image.fromarray(_rgb(fig)).save(name, compress_level=1)
+        files.append(name)
+    return files
+
+
+def _chunks(n: int, parts: int) -> Iterator[range]:
+    bounds = np.linspace(0, n, parts + 1).astype(int)
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if hi > lo:
+            yield range(lo, hi)
+
+
+def render_animation(
+    log: EdgeLog,
+    scene: Scene,
+    frame_iterations: Sequence[int],
+    out: str | Path,
+    final: np.ndarray | None = None,
+    fps: float = 10,
+    workers: int | None = None,
+) -> Path:
+    """Render one frame per entry of ``frame_iterations`` and write a GIF.
+
+    Frame k shows every edge added at or before ``frame_iterations[k]``.
+
+    Args:
+        log: Recorded edges.
+        scene: Static background.
+        frame_iterations: Iteration of each frame, non-decreasing.
+        out: Output .gif path.
+        final: Optional RGB image appended as the last frame (e.g. the
+            result of `render_final`).
+        fps: Frames per second.
+        workers: Render processes (default: CPU count); 1 renders in-process.
+
+    Returns:
+        The output path.
+    """
+    from PIL import Image
+
+    if len(frame_iterations) == 0:
+        raise ValueError("render_animation needs at least one frame")
+    counts = [log.upto(it) for it in frame_iterations]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(counts)))
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(prefix="frames_") as tmp:
+        # Each chunk only needs the edges up to its last frame.
+        jobs = [
+            (log.edges[: counts[r[-1]]], counts[r.start : r.stop], r.start, scene, tmp)
+            for r in _chunks(len(counts), 2 * workers if workers > 1 else 1)
+        ]
+        if workers == 1:
+            files = [f for job in jobs for f in _render_chunk(*job)]
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                files = [f for chunk in pool.map(_render_chunk, *zip(*jobs)) for f in chunk]
+
+        def frames() -> Iterator:
+            for name in files[1:]:
+                with Image.open(name) as im:
+                    yield im.convert("RGB")
+            if final is not None:
+                yield Image.fromarray(final)
+
+        with Image.open(files[0]) as first:
+            first.convert("RGB").save(
+                out, save_all=True, append_images=frames(), duration=1000 / fps, loop=0,
+            )
+    return out
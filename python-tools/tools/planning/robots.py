@@ -0,0 +1,127 @@
+"""Robot models: configuration limits, sampling and collision checks.
+
+A planner asks a robot three things: where to sample (``low``/``high``),
+whether configurations collide with an obstacle set, and whether edges
+between configurations do. Arms check their links as capsules with
+adaptive edge subdivision (`CapsuleModel`); a point robot in a 2-D or
+3-D map checks the edge segment itself. Every model counts the
+configurations (or segments) it has checked in ``checks``.
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from tools.planning.collision import CapsuleModel, segment_sphere_distance
+from tools.planning.obstacles import Obstacles, spheres_of
+
+
+class Robot:
+    """Base class: uniform sampling inside per-joint limits."""
+
+    checks: int = 0
+
+    def __init__(self, low: Sequence[float], high: Sequence[float]):
+        self.low = np.asarray(low, dtype=float)
+        self.high = np.asarray(high, dtype=float)
+        self.dof = len(self.low)
+
+    def sample(self, rng: np.random.Generator) -> np.ndarray:
+        return self.low + (self.high - self.low) * rng.random(self.dof)
+
+    def config_hits(self, q: np.ndarray, obstacles: Obstacles | np.ndarray) -> np.ndarray:
+        """True for each configuration in ``q`` (B, dof) that collides."""
+        raise NotImplementedError
+
+    def edges_hit(self, q_from: np.ndarray, q_to: np.ndarray, obstacles: Obstacles | np.ndarray) -> np.ndarray:
+        """True for each edge ``q_from[i] -> q_to[i]`` that collides; (E,) bool."""
+        raise NotImplementedError
+
+
+class Arm(Robot):
+    """Serial arm whose links are capsules; see `CapsuleModel`."""
+
+    def __init__(self, model: CapsuleModel, low: Sequence[float], high: Sequence[float]):
+        super().__init__(low, high)
+        self.model = model
+
+    @property
+    def checks(self) -> int:
+        return self.model.checks
+
+    def joint_positions(self, q: np.ndarray) -> np.ndarray:
+        """Base and joint positions, shape (B, n + 1, D)."""
+        return self.model.joint_positions(np.atleast_2d(q))
+
+    def config_hits(self, q, obstacles):
+        return self.model.config_hits(q, spheres_of(obstacles))
+
+    def edges_hit(self, q_from, q_to, obstacles):
+        return self.model.edges_hit(q_from, q_to, spheres_of(obstacles))
+
+
+class PlanarArm(Arm):
+    """Planar serial arm (the 2-link scripts) with revolute joints.
+
+    Args:
+        lengths: Link lengths.
+        radius: Capsule radius of the links.
+        max_joint_step: Largest joint move (rad) between checked samples.
+        low, high: Joint limits (default ``±pi``).
+    """
+
+    def __init__(self, lengths: Sequence[float], radius: float = 0.0, max_joint_step: float = 0.05, low=None, high=None):
+        n = len(lengths)
+        self.lengths = np.asarray(lengths, dtype=float)
+        super().__init__(
+            CapsuleModel.planar(self.lengths, radius, max_joint_step),
+            np.full(n, -np.pi) if low is None else low,
+            np.full(n, np.pi) if high is None else high,
+        )
+
+
+class DHArm(Arm):
+    """Serial arm from a standard DH table ``[a, alpha, d, theta_offset]``.
+
+    Args:
+        dh: DH table, shape (n, 4).
+        radius: Capsule radius of the links.
+        max_joint_step: Largest joint move (rad) between checked samples.
+        low, high: Joint limits (default ``±pi``).
+    """
+
+    def __init__(self, dh: np.ndarray, radius: float = 0.0, max_joint_step: float = 0.05, low=None, high=None):
+        self.dh = np.asarray(dh, dtype=float)
+        n = len(self.dh)
+        super().__init__(
+            CapsuleModel.dh(self.dh, radius, max_joint_step),
+            np.full(n, -np.pi) if low is None else low,
+            np.full(n, np.pi) if high is None else high,
+        )
+
+
+class PointRobot(Robot):
+    """A point moving in a box-shaped map (``rrt_simulation.py``).
+
+    A configuration collides if it leaves the box or touches an obstacle;
+    an edge collides if its segment does (the box is convex, so checking
+    the endpoints suffices for the bounds).
+    """
+
+    def _outside(self, q: np.ndarray) -> np.ndarray:
+        return np.any((q < self.low) | (q > self.high), axis=-1)
+
+    def config_hits(self, q, obstacles):
+        q = np.atleast_2d(q)
+        self.checks += len(q)
+        spheres = spheres_of(obstacles)
+        d = np.linalg.norm(q[:, None, :] - spheres[:, :-1], axis=-1)
+        return self._outside(q) | np.any(d <= spheres[:, -1], axis=-1)
+
+    def edges_hit(self, q_from, q_to, obstacles):
+        q_from, q_to = np.broadcast_arrays(np.atleast_2d(q_from), np.atleast_2d(q_to))
+        self.checks += len(q_from)
+        spheres = spheres_of(obstacles)
+        d = segment_sphere_distance(q_from, q_to, spheres)
+        return self._outside(q_from) | self._outside(q_to) | np.any(d <= spheres[:, -1], axis=-1)
@@ -0,0 +1,200 @@
+"""Run a planner over many seeds in parallel and tabulate the results.
+
+A planner is a function ``plan(rng, **params) -> dict`` that draws all of
+its randomness from ``rng`` and returns scalar metrics (``success``,
+``cost``, ``iterations_to_first``, ...); non-scalar values such as the
+path are dropped from the table. Every run gets its own
+``numpy.random.Generator`` spawned from a single ``SeedSequence``, so a
+table is reproducible from the root seed and does not depend on how many
+workers produced it.
+
+Planners are named by a target string, ``package.module:function`` or
+``path/to/script.py:function``, so spawned worker processes can import
+them without pickling code.
+
+Usage:
+    python -m tools.planning.runner path/to/robotarm_6dof_rrt_star.py:plan \\
+        --seeds 100 --workers 8 --out data/outputs/6dof_seeds.xlsx \\
+        --param max_iter=1000
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Number
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+_loaded: dict[str, Callable] = {}
+
+
+def load_target(target: str) -> Callable:
+    """Resolve ``module:function`` or ``script.py:function`` to a callable."""
+    if target in _loaded:
+        return _loaded[target]
+    location, sep, name = target.rpartition(":")
+    if not sep:
+        raise ValueError(f"target must look like 'module:function', got {target!r}")
+    if location.endswith(".py"):
+        path = Path(location).resolve()
+        module_name = "_planner_" + hashlib.sha1(str(path).encode()).hexdigest()[:12]
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        if spec is None or spec.loader is None:
+            raise FileNotFoundError(f"cannot load planner script: {path}")
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(location)
+    fn = getattr(module, name)
+    _loaded[target] = fn
+    return fn
+
+
+def _run_one(target: str, run: int, seed_seq: np.random.SeedSequence, params: dict[str, Any]) -> dict[str, Any]:
+    """Execute one planner run (in a worker) and return its table row."""
+    plan = load_target(target)
+    rng = np.random.default_rng(seed_seq)
+    start = time.perf_counter()
+    try:
+        result = plan(rng, **params)
+        error = None
+    except Exception as e:
+        result, error = {}, f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - start
+
+    row: dict[str, Any] = {"run": run}
+    row.update({k: v for k, v in params.items() if isinstance(v, (Number, str, bool))})
+    for key, value in (result or {}).items():
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, (Number, str, bool)) or value is None:
+            row[key] = value
+    row["wall_time"] = wall
+    row["error"] = error
+    return row
+
+
+def run_seeds(
+    target: str,
+    n_seeds: int,
+    seed: int = 0,
+    params: dict[str, Any] | None = None,
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """Run ``target`` once per seed and collect one row per run.
+
+    Args:
+        target: Planner target, ``module:function`` or ``script.py:function``.
+        n_seeds: Number of independent runs.
+        seed: Root entropy of the ``SeedSequence``; run i always gets the
+            i-th spawned child.
+        params: Keyword arguments passed to every run (and recorded as
+            columns).
+        workers: Worker processes (default: CPU count). 1 runs in-process.
+
+    Returns:
+        DataFrame sorted by ``run`` with the planner's scalar metrics,
+        ``wall_time`` (seconds) and ``error`` (None on success).
+    """
+    location, _, name = target.rpartition(":")
+    if location.endswith(".py"):
+        target = f"{Path(location).resolve()}:{name}"
+    params = dict(params or {})
+    children = np.random.SeedSequence(seed).spawn(n_seeds)
+    workers = min(workers or os.cpu_count() or 1, max(n_seeds, 1))
+
+    if workers == 1:
+        rows = [_run_one(target, i, ss, params) for i, ss in enumerate(children)]
+    else:
+        # Spawned workers start clean (no inherited tree or plot state) and
+        # import the planner once each; runs are handed out in small chunks.
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            rows = list(pool.map(
+                _run_one,
+                [target] * n_seeds,
+                range(n_seeds),
+                children,
+                [params] * n_seeds,
+                chunksize=max(1, n_seeds // (4 * workers)),
+            ))
+
+    df = pd.DataFrame(rows).sort_values("run", ignore_index=True)
+    df.insert(1, "seed", seed)
+    return df
+
+
+def save_table(df: pd.DataFrame, path: str | Path) -> Path:
+    """Write a results table; the format follows the suffix (.xlsx, .parquet, .csv)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    suffix = path.suffix.lower()
+    if suffix == ".xlsx":
+        df.to_excel(path, index=False, sheet_name="runs")
+    elif suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    elif suffix == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f"unsupported results format: {suffix!r} (use .xlsx, .parquet or .csv)")
+    return path
+
+
+def summarize(df: pd.DataFrame) -> dict[str, Any]:
+    """Success rate and cost / time statistics of a results table."""
+    ok = df[df["success"].astype(bool)] if "success" in df else df
+    out: dict[str, Any] = {"runs": len(df), "successes": len(ok)}
+    for col in ("cost", "iterations_to_first", "wall_time"):
+        if col in ok and len(ok):
+            out[col] = {
+                "mean": float(ok[col].mean()),
+                "std": float(ok[col].std()) if len(ok) > 1 else 0.0,
+                "median": float(ok[col].median()),
+            }
+    return out
+
+
+def _parse_param(item: str) -> tuple[str, Any]:
+    key, _, value = item.partition("=")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("target", help="module:function or script.py:function")
+    parser.add_argument("--seeds", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0, help="root seed")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="results table (.xlsx, .parquet or .csv)")
+    parser.add_argument("--param", action="append", default=[], help="key=value passed to the planner")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    df = run_seeds(args.target, args.seeds, args.seed, dict(map(_parse_param, args.param)), args.workers)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(df)
+    summary["elapsed"] = elapsed
+    summary["speedup"] = float(df["wall_time"].sum() / elapsed)
+    print(json.dumps(summary, indent=2))
+    if args.out:
+        print(f"Saved {len(df)} runs to {save_table(df, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Incremental nearest-neighbour index for sampling-based planners.
+
+RRT-style planners interleave one insertion with one nearest (and, for
+RRT*, one radius) query per iteration, so a static KD-tree would have to be
+rebuilt every time. `SpatialIndex` uses the logarithmic method instead:
+points go into a small buffer that is scanned with NumPy, and a full buffer
+is merged with the existing static ``cKDTree`` levels of equal size into a
+single larger tree. Each point is rebuilt O(log n) times over the life of
+the index, and a query touches O(log n) trees.
+
+Dimensions can be periodic (e.g. revolute joints that wrap at ±pi) by
+passing ``period``; distances then use the shortest way around.
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+DEFAULT_LEAF_BUFFER = 64
+
+
+class SpatialIndex:
+    """Nearest and radius-neighbour queries over a growing point set.
+
+    Points are identified by their insertion order (0, 1, 2, ...).
+
+    Args:
+        dim: Number of coordinates per point.
+        period: Optional per-dimension period; 0 or None marks a dimension
+            as non-periodic. For example ``[2 * np.pi] * 2`` for a planar
+            arm whose joints wrap around.
+        low: Lower bound of each periodic dimension (default 0); periodic
+            coordinates are wrapped into ``[low, low + period)``.
+        buffer_size: Points held in the linear-scan buffer before they are
+            merged into a tree.
+        capacity: Initial number of point slots (grown by doubling).
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        period: Sequence[float | None] | None = None,
+        low: Sequence[float] | float | None = None,
+        buffer_size: int = DEFAULT_LEAF_BUFFER,
+        capacity: int = 1024,
+    ):
+        self.dim = dim
+        self.buffer_size = buffer_size
+        if period is None:
+            self._period = np.zeros(dim)
+        else:
+            self._period = np.array([p or 0.0 for p in period], dtype=float)
+            if self._period.shape != (dim,):
+                raise ValueError(f"period must have {dim} entries")
+        self._periodic = self._period > 0
+        self._low = np.broadcast_to(np.asarray(0.0 if low is None else low, dtype=float), (dim,)).copy()
+        self._boxsize = self._period if self._periodic.any() else None
+
+        self._points = np.empty((max(capacity, buffer_size), dim))
+        self._n = 0
+        self._buffer_start = 0
+        # Static levels: (tree, first index, count); indices are contiguous
+        # because levels are always merged in insertion order.
+        self._levels: list[tuple[cKDTree, int, int]] = []
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def points(self) -> np.ndarray:
+        """View of the inserted points, shape (n, dim)."""
+        return self._points[: self._n]
+
+    # ── Geometry helpers ────────────────────────────────────────────
+
+    def _wrap(self, x: np.ndarray) -> np.ndarray:
+        """Map coordinates into the tree frame: periodic dims in [0, period)."""
+        if self._boxsize is None:
+            return x
+        y = np.array(x, dtype=float, copy=True)
+        p = self._periodic
+        y[..., p] = np.mod(y[..., p] - self._low[p], self._period[p])
+        return y
+
+    def difference(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """``a - b``, taking the short way around periodic dimensions."""
+        d = np.asarray(a, dtype=float) - np.asarray(b, dtype=float)
+        if self._boxsize is not None:
+            p = self._periodic
+            half = self._period[p] / 2
+            d[..., p] = np.mod(d[..., p] + half, self._period[p]) - half
+        return d
+
+    def distance(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return np.linalg.norm(self.difference(a, b), axis=-1)
+
+    # ── Insertion ───────────────────────────────────────────────────
+
+    def insert(self, point: Sequence[float]) -> int:
+        """Add a point and return its index."""
+        if self._n == len(self._points):
+            grown = np.empty((2 * len(self._points), self.dim))
+            grown[: self._n] = self._points[: self._n]
+            self._points = grown
+        self._points[self._n] = point
+        self._n += 1
+        if self._n - self._buffer_start >= self.buffer_size:
+            self._flush()
+        return self._n - 1
+
+    def extend(self, points: np.ndarray) -> range:
+        """Add many points; returns their index range."""
+        start = self._n
+        for p in np.asarray(points, dtype=float).reshape(-1, self.dim):
+            self.insert(p)
+        return range(start, self._n)
+
+    def _flush(self) -> None:
+        """Merge the buffer with every trailing level of at most its size."""
+        start, count = self._buffer_start, self._n - self._buffer_start
+        while self._levels and self._levels[-1][2] <= count:
+            _, start, level_count = self._levels.pop()
+            count += level_count
+        if self._boxsize is None:
+            # Points are never modified once inserted, so the tree can
+            # reference the coordinate array instead of copying it.
+            tree = cKDTree(self._points[start : start + count], copy_data=False)
+        else:
+            tree = cKDTree(self._wrap(self._points[start : start + count]), boxsize=self._boxsize)
+        self._levels.append((tree, start, count))
+        self._buffer_start = self._n
+
+    # ── Queries ─────────────────────────────────────────────────────
+
+    def nearest(self, q: Sequence[float]) -> tuple[int, float]:
+        """Return ``(index, distance)`` of the point closest to ``q``.
+
+        Raises:
+            ValueError: If the index is empty.
+        """
+        if self._n == 0:
+            raise ValueError("nearest() on an empty SpatialIndex")
+        q = np.asarray(q, dtype=float)
+        best_i, best_d = -1, np.inf
+
+        if self._buffer_start < self._n:
+            d = self.distance(self._points[self._buffer_start : self._n], q)
+            j = int(np.argmin(d))
+            best_i, best_d = self._buffer_start + j, float(d[j])
+
+        qw = self._wrap(q)
+        for tree, start, _ in self._levels:
+            d, j = tree.query(qw, distance_upper_bound=best_d)
+            if d < best_d:
+                best_i, best_d = start + int(j), float(d)
+        return best_i, best_d
+
+    def within(self, q: Sequence[float], radius: float) -> np.ndarray:
+        """Indices of all points within ``radius`` of ``q``, in ascending order."""
+        q = np.asarray(q, dtype=float)
+        found: list[np.ndarray] = []
+        qw = self._wrap(q)
+        for tree, start, _ in self._levels:
+            hits = tree.query_ball_point(qw, radius)
+            if hits:
+                found.append(start + np.asarray(hits, dtype=np.intp))
+        if self._buffer_start < self._n:
+            d = self.distance(self._points[self._buffer_start : self._n], q)
+            found.append(self._buffer_start + np.flatnonzero(d <= radius))
+        if not found:
+            return np.empty(0, dtype=np.intp)
+        return np.sort(np.concatenate(found))
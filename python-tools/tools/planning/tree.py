@@ -0,0 +1,196 @@
+"""Array-backed search tree for RRT-family planners.
+
+Replaces per-node ``Node`` objects (a Python object, a dict and a small
+NumPy array each, several hundred bytes per node) with flat arrays: node
+coordinates live in the tree's `SpatialIndex`, parents in an int32 array
+(-1 for the root) and costs-to-come in a float64 array. A 6-DOF node then
+costs 60 bytes, and neighbour costs, rewiring and goal checks are NumPy
+operations over index arrays.
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from tools.planning.spatial import SpatialIndex
+
+NO_PARENT = -1
+
+
+def _doubled(a: np.ndarray, fill) -> np.ndarray:
+    return np.concatenate([a, np.full(len(a), fill, dtype=a.dtype)])
+
+
+class ArrayTree:
+    """Growable tree of configurations with parent links and costs.
+
+    Args:
+        dim: Configuration-space dimension.
+        capacity: Initial number of node slots (grown by doubling).
+        period: Optional per-dimension period for wrap-around joints; see
+            `SpatialIndex`.
+        low: Lower bound of periodic dimensions.
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        capacity: int = 1024,
+        period: Sequence[float | None] | None = None,
+        low: Sequence[float] | float | None = None,
+    ):
+        self.dim = dim
+        self.index = SpatialIndex(dim, period=period, low=low, capacity=capacity)
+        self._parent = np.full(capacity, NO_PARENT, dtype=np.int32)
+        self._cost = np.zeros(capacity, dtype=np.float64)
+        self._first_child = np.full(capacity, NO_PARENT, dtype=np.int32)
+        self._next_sibling = np.full(capacity, NO_PARENT, dtype=np.int32)
+        self._prev_sibling = np.full(capacity, NO_PARENT, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    # ── Array views ─────────────────────────────────────────────────
+
+    @property
+    def coords(self) -> np.ndarray:
+        """Node coordinates, shape (n, dim)."""
+        return self.index.points
+
+    @property
+    def parent(self) -> np.ndarray:
+        """Parent index of each node (NO_PARENT for the root), writable view."""
+        return self._parent[: len(self)]
+
+    @property
+    def cost(self) -> np.ndarray:
+        """Cost-to-come of each node, writable view."""
+        return self._cost[: len(self)]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in node coordinates, parents, costs and child links.
+
+        The index's KD-tree levels hold roughly one more copy of the
+        coordinates plus an index array.
+        """
+        return len(self) * (self.dim * 8 + 4 + 8 + 3 * 4)
+
+    # ── Building ────────────────────────────────────────────────────
+
+    def add(self, coord: Sequence[float], parent: int = NO_PARENT, cost: float = 0.0) -> int:
+        """Append a node and return its index."""
+        i = len(self)
+        if i == len(self._parent):
+            self._parent = _doubled(self._parent, NO_PARENT)
+            self._cost = _doubled(self._cost, 0.0)
+            self._first_child = _doubled(self._first_child, NO_PARENT)
+            self._next_sibling = _doubled(self._next_sibling, NO_PARENT)
+            self._prev_sibling = _doubled(self._prev_sibling, NO_PARENT)
+        self._parent[i] = parent
+        self._cost[i] = cost
+        self._link(i, parent)
+        return self.index.insert(coord)
+
+    def _link(self, node: int, parent: int) -> None:
+        """Prepend ``node`` to ``parent``'s child list."""
+        self._prev_sibling[node] = NO_PARENT
+        if parent == NO_PARENT:
+            self._next_sibling[node] = NO_PARENT
+            return
+        head = self._first_child[parent]
+        self._next_sibling[node] = head
+        if head != NO_PARENT:
+            self._prev_sibling[head] = node
+        self._first_child[parent] = node
+
+    def _unlink(self, node: int) -> None:
+        """Remove ``node`` from its parent's child list."""
+        prev, nxt = self._prev_sibling[node], self._next_sibling[node]
+        if prev != NO_PARENT:
+            self._next_sibling[prev] = nxt
+        elif self._parent[node] != NO_PARENT:
+            self._first_child[self._parent[node]] = nxt
+        if nxt != NO_PARENT:
+            self._prev_sibling[nxt] = prev
+
+    def set_parent(self, nodes: np.ndarray | int, parent: int, cost: np.ndarray | float) -> None:
+        """Re-attach ``nodes`` to ``parent`` with new costs-to-come.
+
+        Descendants keep their costs; use `rewire` to shift them too.
+        """
+        for node in np.atleast_1d(nodes):
+            self._unlink(node)
+            self._parent[node] = parent
+            self._link(node, parent)
+        self._cost[nodes] = cost
+
+    def rewire(self, node: int, parent: int, cost: float) -> np.ndarray:
+        """Re-attach ``node`` to ``parent`` and propagate the cost change.
+
+        Every descendant's cost-to-come shifts by the same amount as
+        ``node``'s, so costs stay consistent with the parent links.
+
+        Returns:
+            Indices whose cost changed: ``node`` followed by its descendants.
+        """
+        delta = cost - self._cost[node]
+        self.set_parent(node, parent, cost)
+        sub = self.subtree(node)
+        self._cost[sub[1:]] += delta
+        return sub
+
+    # ── Queries ─────────────────────────────────────────────────────
+
+    def children(self, node: int) -> np.ndarray:
+        """Direct children of ``node`` (most recently attached first)."""
+        out = []
+        child = self._first_child[node]
+        while child != NO_PARENT:
+            out.append(child)
+            child = self._next_sibling[child]
+        return np.array(out, dtype=np.intp)
+
+    def subtree(self, node: int) -> np.ndarray:
+        """``node`` and all of its descendants, in depth-first order."""
+        first, nxt = self._first_child, self._next_sibling
+        out, stack = [], [node]
+        while stack:
+            n = stack.pop()
+            out.append(n)
+            child = first[n]
+            while child != NO_PARENT:
+                stack.append(child)
+                child = nxt[child]
+        return np.array(out, dtype=np.intp)
+
+    def nearest(self, q: Sequence[float]) -> tuple[int, float]:
+        """``(index, distance)`` of the node closest to ``q``."""
+        return self.index.nearest(q)
+
+    def within(self, q: Sequence[float], radius: float) -> np.ndarray:
+        """Indices of nodes within ``radius`` of ``q``, ascending."""
+        return self.index.within(q, radius)
+
+    def distances(self, nodes: np.ndarray, q: Sequence[float]) -> np.ndarray:
+        """Distance from each of ``nodes`` to ``q`` (wrap-aware)."""
+        return self.index.distance(self.coords[nodes], q)
+
+    def path_indices(self, node: int) -> np.ndarray:
+        """Node indices from the root to ``node``."""
+        out = []
+        parent = self._parent
+        while node != NO_PARENT:
+            out.append(node)
+            node = int(parent[node])
+        return np.array(out[::-1], dtype=np.intp)
+
+    def path(self, node: int) -> np.ndarray:
+        """Coordinates from the root to ``node``, shape (k, dim)."""
+        return self.coords[self.path_indices(node)]
+
+    def edges(self) -> np.ndarray:
+        """Every (parent, child) coordinate pair, shape (n - 1, 2, dim)."""
+        child = np.flatnonzero(self.parent != NO_PARENT)
+        return np.stack([self.coords[self.parent[child]], self.coords[child]], axis=1)
@@ -0,0 +1,328 @@
+"""Structured, cacheable queries over data files, and bounded result rendering.
+
+`pandas_analyze` evaluates an arbitrary expression string on every call.
+A `QueryPlan` is the structured alternative: a fixed pipeline
+
+    filter -> select -> groupby/agg -> sort -> head
+
+described by plain JSON values, validated when it is compiled, and
+identified by a normalized key (so ``groupby="g"`` and ``groupby=["g"]``
+are the same plan). Plans are compiled once per key, and results can be
+memoized per (file fingerprint, plan key) by the caller (see
+`tools.analysis.pandas_query`). On CSV files too large to load, plans run
+through the out-of-core evaluator in `tools.chunked`.
+
+`render` turns any result into text one page at a time, so a query that
+returns millions of rows yields a bounded response with a pointer to the
+next page rather than the whole frame.
+"""
+from __future__ import annotations
+
+import ast
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from tools import chunked
+
+AGG_FUNCS = (*chunked.REDUCTIONS, "median", "nunique")
+MAX_ROWS = int(os.environ.get("ANALYSIS_MAX_ROWS", "200"))
+MAX_CHARS = int(os.environ.get("ANALYSIS_MAX_CHARS", "100000"))
+
+_BACKTICKED = re.compile(r"`[^`]*`")
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """A validated query; build one with `compile_query`.
+
+    Attributes:
+        filter: `DataFrame.query` expression selecting rows.
+        select: Columns to keep (group keys are kept automatically).
+        groupby: Group keys.
+        agg: Aggregation: a function name, a list of them, or a dict
+            mapping columns to either.
+        sort: Sort keys; a ``-`` prefix sorts descending.
+        head: Keep the first ``head`` rows of the result.
+        key: Normalized JSON form of the plan, for caching.
+    """
+
+    filter: str | None
+    select: tuple[str, ...] | None
+    groupby: tuple[str, ...] | None
+    agg: str | tuple[str, ...] | tuple[tuple[str, str | tuple[str, ...]], ...] | None
+    sort: tuple[str, ...] | None
+    head: int | None
+    key: str
+
+    def _agg_arg(self) -> str | list[str] | dict[str, str | list[str]]:
+        if isinstance(self.agg, str):
+            return self.agg
+        if self.agg and isinstance(self.agg[0], tuple):
+            return {col: f if isinstance(f, str) else list(f) for col, f in self.agg}
+        return list(self.agg)
+
+    def _funcs(self) -> list[str]:
+        spec = self._agg_arg()
+        if isinstance(spec, dict):
+            return [f for fs in spec.values() for f in ([fs] if isinstance(fs, str) else fs)]
+        return [spec] if isinstance(spec, str) else spec
+
+    def execute(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Run the plan on an in-memory frame."""
+        if self.filter:
+            df = df.query(self.filter)
+        keys = list(self.groupby or ())
+        if self.select:
+            _check_columns(df, [*keys, *self.select])
+            df = df[keys + [c for c in self.select if c not in keys]]
+        if self.agg is not None:
+            spec = self._agg_arg()
+            if isinstance(spec, dict):
+                _check_columns(df, list(spec))
+                values = df
+            elif self.select or spec == "count":
+                values = df.drop(columns=keys)
+            else:
+                values = df.drop(columns=keys).select_dtypes(["number", "bool"])
+            if keys:
+                grouped = df.groupby(keys)
+                out = (grouped.agg(spec) if isinstance(spec, dict) else grouped[list(values.columns)].agg(spec))
+            else:
+                out = values.agg(spec)
+            df = self._frame(out)
+        return self._finish(df)
+
+    def run_chunked(
+        self,
+        path: str | Path,
+        chunksize: int | None = None,
+        offset: int = 0,
+        limit: int | None = None,
+    ) -> tuple[pd.DataFrame | chunked.Page, list[str]]:
+        """Run the plan by streaming a CSV file (see `tools.chunked`).
+
+        Aggregations return the whole (small) result. Row results return a
+        `chunked.Page` of ``limit`` rows (default `MAX_ROWS`) from
+        ``offset``; sorted rows keep only the rows that can reach that page.
+
+        Raises:
+            chunked.UnsupportedQuery: For aggregations that cannot be merged
+                across chunks (median, nunique) or a dict ``agg`` without
+                ``groupby``.
+        """
+        offset, limit = page_window(offset, limit)
+        steps = [chunked.Step("query", self.filter)] if self.filter else []
+        keys = list(self.groupby or ())
+        if self.agg is not None:
+            unsupported = sorted(set(self._funcs()) - set(chunked.REDUCTIONS))
+            if unsupported:
+                raise chunked.UnsupportedQuery(f"{', '.join(unsupported)} cannot be computed out of core")
+            spec = self._agg_arg()
+            selection = [c for c in self.select if c not in keys] if self.select else None
+            if keys:
+                plan = chunked.ChunkedQuery(steps, "groupby", {"keys": keys, "selection": selection, "funcs": spec})
+            elif isinstance(spec, dict):
+                raise chunked.UnsupportedQuery("a per-column agg without groupby cannot be computed out of core")
+            else:
+                if selection:
+                    steps.append(chunked.Step("columns", selection))
+                plan = chunked.ChunkedQuery(steps, "reduce", {"funcs": spec})
+            result, notes = plan.run(path, chunksize)
+            return self._finish(self._frame(result)), notes
+        if self.select:
+            steps.append(chunked.Step("columns", list(self.select)))
+        if self.sort:
+            by, ascending = self._sort_keys()
+            plan = chunked.ChunkedQuery(steps, "top", {"by": by, "ascending": ascending, "n": self.head})
+        else:
+            plan = chunked.ChunkedQuery(steps, "rows" if self.head is None else "head", {"n": self.head})
+        return plan.run(path, chunksize, offset, limit)
+
+    def _sort_keys(self) -> tuple[list[str], list[bool]]:
+        return [s.lstrip("-") for s in self.sort], [not s.startswith("-") for s in self.sort]
+
+    def _frame(self, out: pd.DataFrame | pd.Series) -> pd.DataFrame:
+        """Aggregation output as a frame with flat ``col_func`` column names."""
+        if isinstance(out, pd.Series):
+            out = out.to_frame(self.agg if isinstance(self.agg, str) and self.groupby is None else None)
+        if isinstance(out.columns, pd.MultiIndex):
+            out.columns = [f"{col}_{func}" for col, func in out.columns]
+        return out
+
+    def _finish(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.sort:
+            by, ascending = self._sort_keys()
+            missing = [c for c in by if c not in df.columns and c not in (df.index.names or [])]
+            if missing:
+                raise ValueError(f"Unknown sort keys {missing}; available: {list(df.columns)}")
+            df = df.sort_values(by, ascending=ascending, kind="stable")
+        if self.head is not None:
+            df = df.head(self.head)
+        return df
+
+
+def compile_query(
+    filter: str | None = None,
+    select: str | list[str] | None = None,
+    groupby: str | list[str] | None = None,
+    agg: str | list[str] | dict[str, str | list[str]] | None = None,
+    sort: str | list[str] | None = None,
+    head: int | None = None,
+) -> QueryPlan:
+    """Validate and normalize a structured query; compiled plans are cached.
+
+    Args:
+        filter: `DataFrame.query` expression, e.g. ``"speed > 0.5 and trial == 3"``.
+        select: Column or columns to keep.
+        groupby: Column or columns to group by (requires ``agg``).
+        agg: One of `AGG_FUNCS`, a list of them, or ``{column: func(s)}``.
+        sort: Column or columns to sort the result by; ``"-col"`` sorts
+            descending. After ``groupby``, group keys and ``col_func``
+            aggregate names can be used.
+        head: Number of result rows to keep.
+
+    Raises:
+        ValueError: If any part of the query is malformed.
+    """
+    spec = {
+        "filter": check_filter(filter),
+        "select": _names("select", select),
+        "groupby": _names("groupby", groupby),
+        "agg": _agg(agg),
+        "sort": _names("sort", sort),
+        "head": head,
+    }
+    if head is not None and (not isinstance(head, int) or isinstance(head, bool) or head < 0):
+        raise ValueError(f"head must be a non-negative integer, got {head!r}")
+    if spec["groupby"] and spec["agg"] is None:
+        raise ValueError("groupby needs agg")
+    return _compile(json.dumps(spec, sort_keys=True))
+
+
+@lru_cache(maxsize=256)
+def _compile(key: str) -> QueryPlan:
+    spec = json.loads(key)
+
+    def frozen(value: Any) -> Any:
+        if isinstance(value, dict):
+            return tuple((k, frozen(v)) for k, v in value.items())
+        if isinstance(value, list):
+            return tuple(frozen(v) for v in value)
+        return value
+
+    return QueryPlan(**{k: frozen(v) for k, v in spec.items()}, key=key)
+
+
+def _names(name: str, value: str | list[str] | None) -> list[str] | None:
+    if value is None:
+        return None
+    names = [value] if isinstance(value, str) else value
+    if not isinstance(names, (list, tuple)) or not names or not all(isinstance(n, str) and n for n in names):
+        raise ValueError(f"{name} must be a column name or a non-empty list of them, got {value!r}")
+    return list(names)
+
+
+def _agg(agg: Any) -> str | list[str] | dict[str, str | list[str]] | None:
+    if agg is None:
+        return None
+    if isinstance(agg, dict):
+        if not agg:
+            raise ValueError("agg must not be empty")
+        return {str(col): _agg_funcs(funcs) for col, funcs in sorted(agg.items())}
+    return _agg_funcs(agg)
+
+
+def _agg_funcs(funcs: Any) -> str | list[str]:
+    names = [funcs] if isinstance(funcs, str) else funcs
+    if not isinstance(names, (list, tuple)) or not names or any(f not in AGG_FUNCS for f in names):
+        raise ValueError(f"agg functions must be among {', '.join(AGG_FUNCS)}; got {funcs!r}")
+    return funcs if isinstance(funcs, str) else list(funcs)
+
+
+def check_filter(expr: str | None) -> str | None:
+    """Check a `DataFrame.query` expression's syntax; reject local-variable
+    (``@``) and dunder references.
+
+    Every tool that passes a caller's filter to `DataFrame.query` runs it
+    through this check first.
+
+    Returns:
+        The stripped expression, or None if ``expr`` is None.
+
+    Raises:
+        ValueError: If the expression is empty, invalid or not allowed.
+    """
+    if expr is None:
+        return None
+    if not isinstance(expr, str) or not expr.strip():
+        raise ValueError(f"filter must be a non-empty string, got {expr!r}")
+    if "@" in _BACKTICKED.sub("", expr):
+        raise ValueError("filter cannot reference variables with @")
+    tree = _parse(_BACKTICKED.sub("_col", expr.strip()))
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Attribute, ast.Name)) and "__" in getattr(node, "attr", getattr(node, "id", "")):
+            raise ValueError(f"filter cannot use dunder names: {expr!r}")
+    return expr.strip()
+
+
+def _parse(expr: str) -> ast.AST:
+    try:
+        return ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"invalid filter {expr!r}: {e.msg}") from e
+
+
+def _check_columns(df: pd.DataFrame, columns: list[str]) -> None:
+    missing = [c for c in columns if c not in df.columns]
+    if missing:
+        raise ValueError(f"Unknown columns {missing}; available: {list(df.columns)}")
+
+
+def page_window(offset: int = 0, limit: int | None = None) -> tuple[int, int]:
+    """Validate a page request; ``limit`` defaults to `MAX_ROWS`.
+
+    Raises:
+        ValueError: If ``offset`` is negative or ``limit`` is not positive.
+    """
+    limit = MAX_ROWS if limit is None else limit
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    return offset, limit
+
+
+def render(result: Any, offset: int = 0, limit: int | None = None, max_chars: int | None = None) -> str:
+    """One page of a query result as text.
+
+    Frames and series show rows ``offset`` to ``offset + limit`` (default
+    `MAX_ROWS`) followed by a ``[rows a-b of n ...]`` line when there are
+    more; a `chunked.Page` is already that window. Any text is cut at
+    ``max_chars`` (default `MAX_CHARS`).
+    """
+    offset, limit = page_window(offset, limit)
+    max_chars = MAX_CHARS if max_chars is None else max_chars
+    footer = []
+    if isinstance(result, (pd.DataFrame, pd.Series, chunked.Page)):
+        if isinstance(result, chunked.Page):
+            total, offset, page = result.total, result.offset, result.rows.iloc[:limit]
+        else:
+            total, page = len(result), result.iloc[offset:offset + limit]
+        text = page.to_string()
+        if len(page) < total:
+            shown = f"rows {offset}-{offset + len(page) - 1}" if len(page) else f"no rows at offset {offset}"
+            more = f"; pass offset={offset + limit} for more" if offset + limit < total else ""
+            footer.append(f"[{shown} of {total}{more}]")
+    else:
+        text = str(result)
+    if len(text) > max_chars:
+        footer.insert(0, f"[output truncated at {max_chars} of {len(text)} characters]")
+        text = text[:max_chars]
+    return "\n".join([text, *footer])
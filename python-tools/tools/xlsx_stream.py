@@ -0,0 +1,353 @@
+"""Streaming XLSX writing: bulk numeric export and in-place row append.
+
+openpyxl creates a Python object per cell even in write-only mode, which
+dominates the cost of exporting long numeric arrays. `XlsxStreamWriter`
+emits the SpreadsheetML for each sheet straight into the zip archive,
+formatting whole blocks of rows at a time, so memory is bounded by one
+block. `append_rows` adds rows to an existing sheet by streaming its XML
+through, without parsing or loading the workbook.
+"""
+from __future__ import annotations
+
+import os
+import posixpath
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+from openpyxl.utils import get_column_letter
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_DECL = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_ILLEGAL_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_NON_FINITE = re.compile(r"<c><v>(?:nan|inf|-inf)</v></c>")
+
+BLOCK_ROWS = 16_384
+
+
+def cell_xml(value: Any, ref: str | None = None) -> str:
+    """Serialize one cell value as an XLSX ``<c>`` element.
+
+    Dates and times are written as ISO-8601 text, since a typed date would
+    need a number format in the workbook's styles part.
+    """
+    r = f' r="{ref}"' if ref else ""
+    if value is None:
+        return f"<c{r}/>"
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c{r} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        v = float(value) if isinstance(value, (float, np.floating)) else int(value)
+        if isinstance(v, float) and not np.isfinite(v):
+            return f"<c{r}/>"
+        return f"<c{r}><v>{v!r}</v></c>"
+    if isinstance(value, (datetime, date, time)):
+        value = value.isoformat()
+    text = _ILLEGAL_XML.sub("", str(value))
+    return f'<c{r} t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _numeric_rows_xml(block: np.ndarray) -> str:
+    template = "<row>" + "<c><v>{!r}</v></c>" * block.shape[1] + "</row>"
+    xml = "".join(template.format(*row) for row in block.tolist())
+    if not np.isfinite(block).all():
+        # Excel has no NaN/Inf; leave those cells empty.
+        xml = _NON_FINITE.sub("<c/>", xml)
+    return xml
+
+
+class SheetStream:
+    """Writable handle for one worksheet; obtain it from `XlsxStreamWriter.sheet`."""
+
+    def __init__(self, handle: Any):
+        self._handle = handle
+        self.rows = 0
+
+    def append(self, row: Iterable[Any]) -> None:
+        """Append one row of arbitrary values."""
+        self._handle.write(("<row>" + "".join(cell_xml(v) for v in row) + "</row>").encode())
+        self.rows += 1
+
+    def append_array(self, arr: np.ndarray) -> None:
+        """Append every row of a 2-D array, formatting numeric blocks in bulk."""
+        if arr.ndim != 2:
+            raise ValueError("append_array expects a 2-D array")
+        if arr.dtype.kind not in "biuf":
+            for row in arr:
+                self.append(row)
+            return
+        for start in range(0, arr.shape[0], BLOCK_ROWS):
+            block = arr[start:start + BLOCK_ROWS].astype(float)
+            self._handle.write(_numeric_rows_xml(block).encode())
+            self.rows += block.shape[0]
+
+    def __enter__(self) -> SheetStream:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._handle.write(b"</sheetData></worksheet>")
+        self._handle.close()
+
+
+class XlsxStreamWriter:
+    """Write an .xlsx workbook one sheet at a time.
+
+    Example:
+        with XlsxStreamWriter(path) as wb:
+            with wb.sheet("trace") as ws:
+                ws.append_array(arr)
+    """
+
+    def __init__(self, path: str | Path, compresslevel: int = 1):
+        self.path = Path(path)
+        self._zf = zipfile.ZipFile(self.path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        self._titles: list[str] = []
+
+    def sheet(self, title: str) -> SheetStream:
+        """Start a new worksheet. Only one sheet may be open at a time."""
+        if len(title) > 31:
+            raise ValueError(f"Sheet title exceeds 31 characters: {title!r}")
+        if title.lower() in (t.lower() for t in self._titles):
+            raise ValueError(f"Duplicate sheet title: {title!r}")
+        self._titles.append(title)
+        handle = self._zf.open(f"xl/worksheets/sheet{len(self._titles)}.xml", "w", force_zip64=True)
+        handle.write(f'{_XML_DECL}<worksheet xmlns="{_NS_MAIN}"><sheetData>'.encode())
+        return SheetStream(handle)
+
+    @property
+    def titles(self) -> list[str]:
+        return list(self._titles)
+
+    def close(self) -> None:
+        """Write the workbook parts and finish the archive."""
+        if not self._titles:
+            with self.sheet("Sheet"):
+                pass
+
+        n = len(self._titles)
+        sheets = "".join(
+            f'<sheet name={quoteattr(t)} sheetId="{i}" r:id="rId{i}"/>'
+            for i, t in enumerate(self._titles, 1)
+        )
+        sheet_rels = "".join(
+            f'<Relationship Id="rId{i}" '
+            f'Type="{_NS_REL}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, n + 1)
+        )
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, n + 1)
+        )
+
+        self._zf.writestr("[Content_Types].xml", (
+            f'{_XML_DECL}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            f"{overrides}</Types>"
+        ))
+        self._zf.writestr("_rels/.rels", (
+            f'{_XML_DECL}<Relationships xmlns="{_NS_PKG_REL}">'
+            f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+            "</Relationships>"
+        ))
+        self._zf.writestr("xl/workbook.xml", (
+            f'{_XML_DECL}<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}">'
+            f"<sheets>{sheets}</sheets></workbook>"
+        ))
+        self._zf.writestr("xl/_rels/workbook.xml.rels", (
+            f'{_XML_DECL}<Relationships xmlns="{_NS_PKG_REL}">{sheet_rels}</Relationships>'
+        ))
+        self._zf.close()
+
+    def __enter__(self) -> XlsxStreamWriter:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+# ── Append to an existing sheet ──────────────────────────────────────
+
+# A <row> without r="N" is the row after the previous one. Cells with a
+# value, inline string or formula count as content; rows with none (e.g.
+# formatting only) do not.
+_ROW_TAG = re.compile(rb"<row\b([^>]*)>")
+_ROW_NUM = re.compile(rb"\sr=\"(\d+)\"")
+_ROW_OR_CONTENT = re.compile(rb"<row\b([^>]*)>|<(?:v|is)>|<f\b")
+_DIMENSION = re.compile(rb"<dimension\b[^>]*/>")
+_SHEET_DATA_END = re.compile(rb"</sheetData>|<sheetData\s*/>")
+_CHUNK = 1 << 20
+
+
+def _sheet_part(zf: zipfile.ZipFile, sheet: str | None) -> str:
+    """Resolve a sheet name (or the first sheet) to its zip member name."""
+    ns = {"m": _NS_MAIN}
+    wb = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    sheets = wb.findall("m:sheets/m:sheet", ns)
+    if not sheets:
+        raise ValueError("Workbook has no sheets")
+    if sheet is None:
+        match = sheets[0]
+    else:
+        match = next((el for el in sheets if el.get("name") == sheet), None)
+        if match is None:
+            names = [el.get("name") for el in sheets]
+            raise ValueError(f"Sheet {sheet!r} not found. Available: {names}")
+    rid = match.get(f"{{{_NS_REL}}}id")
+
+    rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels:
+        if rel.get("Id") == rid:
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join("xl", target))
+    raise ValueError(f"No relationship for sheet {sheet!r}")
+
+
+def _scan_chunks(src: Any) -> Iterable[bytes]:
+    """Yield the stream in pieces that always end just before a tag start."""
+    buf = b""
+    while True:
+        chunk = src.read(_CHUNK)
+        if not chunk:
+            if buf:
+                yield buf
+            return
+        buf += chunk
+        cut = buf.rfind(b"<")
+        if cut > 0:
+            yield buf[:cut]
+            buf = buf[cut:]
+
+
+def _row_number(attrs: bytes, previous: int) -> int:
+    m = _ROW_NUM.search(attrs)
+    return int(m.group(1)) if m else previous + 1
+
+
+def _last_row(zf: zipfile.ZipFile, part: str) -> int:
+    """Return the number of the last row with content in a sheet's XML."""
+    row = last = 0
+    with zf.open(part) as src:
+        for piece in _scan_chunks(src):
+            end = _SHEET_DATA_END.search(piece)
+            for m in _ROW_OR_CONTENT.finditer(piece, 0, end.start() if end else len(piece)):
+                if m.group(1) is not None:
+                    row = _row_number(m.group(1), row)
+                else:
+                    last = row
+            if end:
+                break
+    return last
+
+
+def append_rows(
+    path: str | Path,
+    rows: Iterable[Sequence[Any]],
+    sheet: str | None = None,
+) -> int:
+    """Append rows after the last row with content of an existing sheet.
+
+    The archive is rewritten member by member into a temporary file: the
+    target sheet's XML is streamed through with new ``<row>`` elements
+    inserted before ``</sheetData>``, and every other part is copied
+    unchanged. Memory use is bounded by the chunk size, independent of the
+    workbook size. Shared strings and styles are not touched; new text
+    cells are written as inline strings. Trailing rows without content
+    (formatting only) are replaced by the new rows, and the optional
+    ``<dimension>`` element is dropped rather than recomputed.
+
+    Args:
+        path: Existing .xlsx file.
+        rows: Rows of cell values, in column order starting at column A.
+        sheet: Sheet name. Defaults to the first sheet.
+
+    Returns:
+        The number of rows appended.
+    """
+    path = Path(path)
+    with zipfile.ZipFile(path) as zin:
+        part = _sheet_part(zin, sheet)
+        last_row = _last_row(zin, part)
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".xlsx.tmp")
+        os.close(fd)
+        appended = 0
+        try:
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zout:
+                for info in zin.infolist():
+                    with zin.open(info) as src, zout.open(info, "w", force_zip64=True) as dst:
+                        if info.filename == part:
+                            appended = _copy_with_rows(src, dst, rows, last_row)
+                        else:
+                            shutil.copyfileobj(src, dst, _CHUNK)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return appended
+
+
+def _copy_with_rows(src: Any, dst: Any, rows: Iterable[Sequence[Any]], last_row: int) -> int:
+    in_header = True
+    state = "copy"  # then "skip" (trailing rows without content), then "done"
+    r = 0
+
+    for piece in _scan_chunks(src):
+        if in_header:
+            # <dimension> precedes <sheetData>; it would understate the range.
+            piece = _DIMENSION.sub(b"", piece, count=1)
+            in_header = b"<sheetData" not in piece
+        if state == "done":
+            dst.write(piece)
+            continue
+        m = _SHEET_DATA_END.search(piece)
+        stop = m.start() if m else len(piece)
+        if state == "copy":
+            for row in _ROW_TAG.finditer(piece, 0, stop):
+                r = _row_number(row.group(1), r)
+                if r > last_row:
+                    dst.write(piece[:row.start()])
+                    state = "skip"
+                    break
+            else:
+                dst.write(piece[:stop])
+        if m is None:
+            continue
+
+        if m.group(0) != b"</sheetData>":
+            dst.write(b"<sheetData>")
+        r = last_row
+        block: list[str] = []
+        for row in rows:
+            r += 1
+            cells = "".join(
+                cell_xml(v, f"{get_column_letter(c)}{r}")
+                for c, v in enumerate(row, 1) if v is not None
+            )
+            block.append(f'<row r="{r}">{cells}</row>')
+            if len(block) >= BLOCK_ROWS:
+                dst.write("".join(block).encode())
+                block.clear()
+        dst.write("".join(block).encode())
+        dst.write(b"</sheetData>")
+        dst.write(piece[m.end():])
+        state = "done"
+
+    if state != "done":
+        raise ValueError("Sheet XML has no <sheetData> element")
+    return r - last_row